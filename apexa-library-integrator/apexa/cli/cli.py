@@ -3,6 +3,7 @@
 import logging
 
 from apexa.cli.utils import click_group, click_option, click_pass_context
+from apexa.common.log import setup_logging
 from apexa.common.util import get_logger
 
 LOG = get_logger(__name__)
@@ -24,9 +25,10 @@ def cli_command(ctx, debug: bool):
 
 def cli():
     """Start CLI interface."""
+    setup_logging()
     try:
         cli_command()  # pylint: disable=E1120
     except KeyboardInterrupt as err:
-        LOG.debug(f"{err}")
+        LOG.debug("%s", err)
     except Exception as err:
-        LOG.exception(f"{err}")
+        LOG.exception("%s", err)
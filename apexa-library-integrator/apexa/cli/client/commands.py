@@ -1,22 +1,70 @@
 """Apexa CLI commands."""
 
+import json
+import signal
+
+from pandas import read_csv
+
 from apexa.cli.cli import cli_command
 from apexa.cli.utils import (
     CustomCommand,
+    CustomGroup,
     click_echo,
+    click_echo_json,
     click_option,
     click_option_choice,
     click_promt,
+    click_validator,
+)
+from apexa.common.browser import browser_pool
+from apexa.common.controller import (
+    browser_controller,
+    daemon_controller,
+    scraper_controller,
 )
-from apexa.common.controller import scraper_controller
-from apexa.common.util import metadata_entry_points
+from apexa.common.deadline import deadlines, parse_budgets
+from apexa.common.fingerprints import fingerprint_index
+from apexa.common.history import format_report, report, run_history
+from apexa.common.lookup import LookupIndex, serve_lookups
+from apexa.common.plugins import scraper_plugins
+from apexa.common.profiling import PROFILE_MODES
+from apexa.common.scheduler import RevisitStore
+from apexa.common.snapshots import snapshot_records, snapshot_store
+from apexa.common.util import json_dumps
+from apexa.common.writers import parse_output_types, save_to_file
 from apexa.config import config
-
-SCRAPPER_ENTRY_POINT_GROUP = "apexa-library-integrator.source"
-SCRAPPER_SOURCES = {
-    e.name: e for e in metadata_entry_points().select(group=SCRAPPER_ENTRY_POINT_GROUP)
-}
-RABBIT_CREDS = ["RABBIT_HOST", "RABBIT_PORT", "RABBIT_USER", "RABBIT_PASSWORD"]
+from apexa.config.default import (
+    BENCH_BASELINE_FILE,
+    BENCH_REPEAT,
+    BENCH_THRESHOLD,
+    BROWSER_ADDRESS,
+    BROWSER_MAX_RSS,
+    BROWSER_PORT,
+    CASSETTE_DIR,
+    DAEMON_DEFAULT_CRON,
+    DAEMON_DEFAULT_JITTER,
+    DAEMON_HOST,
+    DAEMON_PORT,
+    DISPATCH_PREFETCH,
+    DISPATCH_WAIT,
+    FINGERPRINT_DIR,
+    HISTORY_FILE,
+    HISTORY_WINDOW,
+    HISTORY_Z_SCORE,
+    LOAD_CARDINALITY,
+    LOAD_EXTRA_DATES,
+    LOAD_SIZES,
+    LOOKUP_HOST,
+    LOOKUP_PORT,
+    OUTPUT_TYPES,
+    RABBIT_SETTINGS,
+    REVISIT_STATE_FILE,
+    SCHEDULE_FILE,
+    SNAPSHOT_DIR,
+)
+from apexa.dispatch.coordinator import Coordinator
+from apexa.dispatch.worker import Worker
+from apexa.perf import benchmark, load
 
 
 @cli_command.command(cls=CustomCommand)
@@ -24,7 +72,7 @@ RABBIT_CREDS = ["RABBIT_HOST", "RABBIT_PORT", "RABBIT_USER", "RABBIT_PASSWORD"]
     "--scrappers",
     help_message="Scraper names to be run",
     show_default=True,
-    type=click_option_choice(SCRAPPER_SOURCES.keys(), case_sensitive=False),
+    type=click_option_choice(scraper_plugins.names(), case_sensitive=False),
 )
 @click_option(
     "--test",
@@ -36,23 +84,830 @@ RABBIT_CREDS = ["RABBIT_HOST", "RABBIT_PORT", "RABBIT_USER", "RABBIT_PASSWORD"]
 @click_option(
     "--output-type",
     default="csv",
-    help_message="Output file type",
+    help_message=f"Output file types, comma separated: {', '.join(OUTPUT_TYPES)}",
+    show_default=True,
+    callback=click_validator(parse_output_types),
+)
+@click_option(
+    "--record/--replay",
+    default=None,
+    help_message="Record fetched pages to cassettes, or replay them without a browser",
+)
+@click_option(
+    "--cassette-dir",
+    default=CASSETTE_DIR,
+    help_message="Directory holding recorded pages",
     show_default=True,
-    type=click_option_choice(["JSON", "CSV"], case_sensitive=False),
 )
-def scrape(scrappers: str, test: bool, output_type: str):
+@click_option(
+    "--metrics-out",
+    default=None,
+    help_message="Write a per-stage timing summary of the run to this file",
+)
+@click_option(
+    "--metrics-format",
+    default="json",
+    help_message="Run metrics file format",
+    show_default=True,
+    type=click_option_choice(["json", "prometheus"], case_sensitive=False),
+)
+@click_option(
+    "--profile",
+    default=None,
+    help_message="Profile each scraper and report its hot spots",
+    type=click_option_choice(PROFILE_MODES, case_sensitive=False),
+)
+@click_option(
+    "--profile-dir",
+    default=".",
+    help_message="Directory for profile files",
+    show_default=True,
+)
+@click_option(
+    "--timeout",
+    default=None,
+    type=float,
+    help_message="Time budget of each scraper in seconds, 0 disables it",
+)
+@click_option(
+    "--stage-timeouts",
+    default=None,
+    help_message="Stage budgets in seconds, e.g. navigation=60,readiness=10,publish=30",
+    callback=click_validator(parse_budgets, convert=True),
+)
+@click_option(
+    "--browser-address",
+    default=BROWSER_ADDRESS,
+    help_message="host:port of a running Chrome to use, see 'browser start'",
+)
+@click_option(
+    "--use-cache/--no-cache",
+    default=None,
+    help_message="Reuse data a recent run cached, by default only for --test runs",
+)
+@click_option(
+    "--resume",
+    default=None,
+    help_message="Run id of an interrupted run to finish",
+)
+def scrape(
+    scrappers: str,
+    test: bool,
+    output_type: str,
+    record: bool,
+    cassette_dir: str,
+    metrics_out: str,
+    metrics_format: str,
+    profile: str,
+    profile_dir: str,
+    timeout: float,
+    stage_timeouts: dict,
+    browser_address: str,
+    use_cache: bool,
+    resume: str,
+):
     """Run scrappers."""
     click_echo("Running scrappers", color="green")
     scrappers = scrappers.split(",") if scrappers else []
-    scraper_controller.run_scrappers(scrappers, test, output_type)
-    click_echo("Done!", color="green")
+    run_id = scraper_controller.run_scrappers(
+        scrappers,
+        test,
+        output_type,
+        record=record,
+        cassette_dir=cassette_dir,
+        metrics_out=metrics_out,
+        metrics_format=metrics_format,
+        profile=profile,
+        profile_dir=profile_dir,
+        timeout=timeout,
+        stage_timeouts=stage_timeouts,
+        browser_address=browser_address,
+        use_cache=use_cache,
+        resume=resume,
+    )
+    click_echo(f"Done! Run id: {run_id}", color="green")
+
+
+@cli_command.command(cls=CustomCommand)
+@click_option(
+    "--scrappers",
+    help_message="Scraper names to be scheduled, all by default",
+    show_default=True,
+    type=click_option_choice(scraper_plugins.names(), case_sensitive=False),
+)
+@click_option(
+    "--schedule-file",
+    default=SCHEDULE_FILE,
+    help_message="JSON file with per-scraper cron and jitter",
+    show_default=True,
+)
+@click_option(
+    "--cron",
+    default=DAEMON_DEFAULT_CRON,
+    help_message="Default cron schedule of scrapers",
+    show_default=True,
+)
+@click_option(
+    "--jitter",
+    default=DAEMON_DEFAULT_JITTER,
+    type=int,
+    help_message="Default random delay of scheduled runs, in seconds",
+    show_default=True,
+)
+@click_option(
+    "--adaptive",
+    is_flag=True,
+    default=False,
+    help_message="Adapt revisit intervals to how often each source changes",
+    show_default=True,
+)
+@click_option(
+    "--host",
+    default=DAEMON_HOST,
+    help_message="Control endpoint address",
+    show_default=True,
+)
+@click_option(
+    "--port",
+    default=DAEMON_PORT,
+    type=int,
+    help_message="Control endpoint port",
+    show_default=True,
+)
+@click_option(
+    "--test",
+    is_flag=True,
+    default=False,
+    help_message="Save results to files instead of publishing them",
+    show_default=True,
+)
+@click_option(
+    "--output-type",
+    default="csv",
+    help_message=f"Output file types, comma separated: {', '.join(OUTPUT_TYPES)}",
+    show_default=True,
+    callback=click_validator(parse_output_types),
+)
+@click_option(
+    "--timeout",
+    default=None,
+    type=float,
+    help_message="Time budget of each scraper in seconds, 0 disables it",
+)
+@click_option(
+    "--stage-timeouts",
+    default=None,
+    help_message="Stage budgets in seconds, e.g. navigation=60,readiness=10,publish=30",
+    callback=click_validator(parse_budgets, convert=True),
+)
+@click_option(
+    "--browser-address",
+    default=BROWSER_ADDRESS,
+    help_message="host:port of a running Chrome to use, see 'browser start'",
+)
+def serve(
+    scrappers: str,
+    schedule_file: str,
+    cron: str,
+    jitter: int,
+    adaptive: bool,
+    host: str,
+    port: int,
+    test: bool,
+    output_type: str,
+    timeout: float,
+    stage_timeouts: dict,
+    browser_address: str,
+):
+    """Run scrapers on schedules in a long running process."""
+    deadlines.configure(timeout, stage_timeouts)
+    if browser_address:
+        browser_pool.attach(browser_address)
+    names = scrappers.split(",") if scrappers else scraper_plugins.names()
+    revisit_store = RevisitStore(REVISIT_STATE_FILE)
+    schedules = daemon_controller.load_schedules(
+        names, schedule_file, cron, jitter, adaptive, revisit_store
+    )
+    click_echo(f"Serving {len(schedules)} scrappers", color="green")
+    daemon = daemon_controller.ScraperDaemon(
+        schedules,
+        test=test,
+        output_type=output_type,
+        host=host,
+        port=port,
+        revisit_store=revisit_store,
+    )
+    daemon.run_forever()
+
+
+@cli_command.group(cls=CustomGroup)
+def browser():
+    """Manage a long lived browser shared by scraper runs."""
+
+
+@browser.command(cls=CustomCommand)
+@click_option(
+    "--port",
+    default=BROWSER_PORT,
+    type=int,
+    help_message="Remote debugging port",
+    show_default=True,
+)
+@click_option(
+    "--max-rss",
+    default=BROWSER_MAX_RSS // 2**20,
+    type=int,
+    help_message="Memory in MiB beyond which the browser is restarted",
+    show_default=True,
+)
+def start(port: int, max_rss: int):
+    """Start a supervised headless Chrome in the background."""
+    status = browser_controller.start_supervisor(port, max_rss * 2**20)
+    click_echo(f"Browser {status.get('browser')} at {status['address']}", "green")
+    click_echo(f"export APEXA_BROWSER_ADDRESS={status['address']}", "green")
+
+
+@browser.command(cls=CustomCommand)
+def stop():
+    """Stop the supervised browser."""
+    if browser_controller.stop_supervisor():
+        click_echo("Browser stopped", color="green")
+    else:
+        click_echo("No browser running", color="yellow")
+
+
+@browser.command(cls=CustomCommand)
+def status():
+    """Show the supervised browser."""
+    state = browser_controller.browser_status()
+    if not state:
+        click_echo("No browser running", color="yellow")
+        return
+    click_echo_json(state)
+
+
+@cli_command.command(cls=CustomCommand)
+@click_option(
+    "--scrappers",
+    help_message="Scraper names to be dispatched",
+    show_default=True,
+    type=click_option_choice(scraper_plugins.names(), case_sensitive=False),
+)
+@click_option(
+    "--test",
+    is_flag=True,
+    default=False,
+    help_message="Workers save results to files instead of publishing them",
+    show_default=True,
+)
+@click_option(
+    "--output-type",
+    default="csv",
+    help_message=f"Output file types, comma separated: {', '.join(OUTPUT_TYPES)}",
+    show_default=True,
+    callback=click_validator(parse_output_types),
+)
+@click_option(
+    "--wait",
+    default=DISPATCH_WAIT,
+    type=float,
+    help_message="Seconds to wait for workers, 0 to return once jobs are queued",
+    show_default=True,
+)
+def dispatch(scrappers: str, test: bool, output_type: str, wait: float):
+    """Queue scrapers as jobs for 'apexa worker' processes."""
+    scrappers = scrappers.split(",") if scrappers else []
+    coordinator = Coordinator()
+    try:
+        jobs = coordinator.dispatch(scrappers, test, output_type)
+        click_echo(f"Queued {len(jobs)} scrape jobs", color="green")
+        if wait:
+            click_echo_json(coordinator.collect(jobs, wait))
+    finally:
+        coordinator.close()
+
+
+@cli_command.command(cls=CustomCommand)
+@click_option(
+    "--prefetch",
+    default=DISPATCH_PREFETCH,
+    type=int,
+    help_message="Jobs run at the same time",
+    show_default=True,
+)
+@click_option(
+    "--worker-id",
+    default=None,
+    help_message="Name reported with job statuses, host and pid by default",
+)
+@click_option(
+    "--timeout",
+    default=None,
+    type=float,
+    help_message="Time budget of each scraper in seconds, 0 disables it",
+)
+@click_option(
+    "--stage-timeouts",
+    default=None,
+    help_message="Stage budgets in seconds, e.g. navigation=60,readiness=10,publish=30",
+    callback=click_validator(parse_budgets, convert=True),
+)
+@click_option(
+    "--browser-address",
+    default=BROWSER_ADDRESS,
+    help_message="host:port of a running Chrome to use, see 'browser start'",
+)
+def worker(
+    prefetch: int,
+    worker_id: str,
+    timeout: float,
+    stage_timeouts: dict,
+    browser_address: str,
+):
+    """Run scrape jobs queued by 'apexa dispatch'."""
+    deadlines.configure(timeout, stage_timeouts)
+    if browser_address:
+        browser_pool.attach(browser_address)
+    job_worker = Worker(prefetch=prefetch, worker_id=worker_id)
+    signal.signal(signal.SIGTERM, lambda *_: job_worker.stop())
+    click_echo(f"Worker {job_worker.worker_id} waiting for jobs", color="green")
+    try:
+        job_worker.run()
+    except KeyboardInterrupt:
+        job_worker.stop()
+
+
+@cli_command.group(cls=CustomGroup)
+def perf():
+    """Measure the performance of scraper pipelines."""
+
+
+@perf.command(cls=CustomCommand)
+@click_option(
+    "--scrappers",
+    help_message="Scraper names to benchmark, all with a fixture by default",
+    show_default=True,
+    type=click_option_choice(scraper_plugins.names(), case_sensitive=False),
+)
+@click_option(
+    "--repeat",
+    default=BENCH_REPEAT,
+    type=int,
+    help_message="Timed runs per scraper",
+    show_default=True,
+)
+@click_option(
+    "--baseline",
+    default=BENCH_BASELINE_FILE,
+    help_message="Results to compare against",
+    show_default=True,
+)
+@click_option(
+    "--threshold",
+    default=BENCH_THRESHOLD,
+    type=float,
+    help_message="Allowed slowdown or memory growth, 0.25 for 25%",
+    show_default=True,
+)
+@click_option(
+    "--save-baseline",
+    is_flag=True,
+    default=False,
+    help_message="Keep these results as the new baseline",
+    show_default=True,
+)
+def bench(
+    scrappers: str, repeat: int, baseline: str, threshold: float, save_baseline: bool
+):
+    """Benchmark scrapers offline from saved pages, failing on regressions."""
+    scrappers = scrappers.split(",") if scrappers else []
+    results = benchmark.run_benchmarks(scrappers, repeat)
+    for line in benchmark.format_results(results):
+        click_echo(line, color="white")
+
+    previous = benchmark.load_baseline(baseline)
+    if save_baseline:
+        benchmark.save_baseline(results, baseline)
+        click_echo(f"Saved baseline to {baseline}", color="green")
+    if previous is None:
+        click_echo("No baseline to compare against", color="yellow")
+        return
+
+    regressions = benchmark.compare(results, previous, threshold)
+    for regression in regressions:
+        click_echo(
+            f"{regression['scraper']} {regression['stage']} {regression['metric']}: "
+            f"{regression['baseline']:.6g} -> {regression['current']:.6g}",
+            color="red",
+        )
+    if not regressions:
+        click_echo("No regressions", color="green")
+    elif not save_baseline:
+        raise SystemExit(1)
+
+
+@perf.command(cls=CustomCommand, name="load")
+@click_option(
+    "--rows",
+    default=",".join(str(rows) for rows in LOAD_SIZES),
+    help_message="Comma separated feed sizes",
+    show_default=True,
+)
+@click_option(
+    "--extra-dates",
+    default=LOAD_EXTRA_DATES,
+    type=int,
+    help_message="Extra date columns per row",
+    show_default=True,
+)
+@click_option(
+    "--cardinality",
+    default=LOAD_CARDINALITY,
+    type=int,
+    help_message="Distinct product names",
+    show_default=True,
+)
+@click_option(
+    "--no-publish",
+    is_flag=True,
+    default=False,
+    help_message="Stop after encoding",
+    show_default=True,
+)
+@click_option(
+    "--output",
+    default=None,
+    help_message="Also write the results to this JSON file",
+)
+def load_feeds(
+    rows: str, extra_dates: int, cardinality: int, no_publish: bool, output: str
+):
+    """Measure format, encode and publish on synthetic feeds of growing size."""
+    sizes = [int(size) for size in rows.split(",")]
+    results = load.run_load(sizes, extra_dates, cardinality, publish=not no_publish)
+    for line in load.format_load(results):
+        click_echo(line, color="white")
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            file.write(json_dumps(results, indent=2))
+
+
+@perf.command(cls=CustomCommand, name="report")
+@click_option(
+    "--scrapper",
+    default=None,
+    help_message="Only report this scraper",
+)
+@click_option(
+    "--window",
+    default=HISTORY_WINDOW,
+    type=int,
+    help_message="Earlier runs forming the baseline",
+    show_default=True,
+)
+@click_option(
+    "--z-score",
+    default=HISTORY_Z_SCORE,
+    type=float,
+    help_message="Deviations above the baseline flagged as a regression",
+    show_default=True,
+)
+@click_option(
+    "--history-file",
+    default=HISTORY_FILE,
+    help_message="Run history file",
+    show_default=True,
+)
+@click_option(
+    "--report-format",
+    default="table",
+    help_message="Report format",
+    show_default=True,
+    type=click_option_choice(["table", "json"], case_sensitive=False),
+)
+@click_option(
+    "--check",
+    is_flag=True,
+    default=False,
+    help_message="Exit with an error when anything regressed",
+    show_default=True,
+)
+def history_report(
+    scrapper: str,
+    window: int,
+    z_score: float,
+    history_file: str,
+    report_format: str,
+    check: bool,
+):
+    """Show run metric trends and flag regressions against recent runs."""
+    run_history.configure(file_name=history_file)
+    entries = report(run_history, scrapper, window, z_score)
+    if report_format.lower() == "json":
+        click_echo_json(entries)
+    elif not entries:
+        click_echo("No runs recorded yet", color="yellow")
+    else:
+        for line in format_report(entries):
+            color = "red" if line.endswith("REGRESSION") else "white"
+            click_echo(line, color=color)
+    if check and any(entry["regression"] for entry in entries):
+        raise SystemExit(1)
+
+
+@cli_command.group(cls=CustomGroup)
+def snapshots():
+    """Query the formatted output kept from earlier runs."""
+
+
+@snapshots.command(cls=CustomCommand)
+@click_option(
+    "--scrapper",
+    required=True,
+    help_message="Scraper name",
+)
+@click_option(
+    "--snapshot-dir",
+    default=SNAPSHOT_DIR,
+    help_message="Snapshot store directory",
+    show_default=True,
+)
+def latest(scrapper: str, snapshot_dir: str):
+    """Show the newest snapshot of a scraper."""
+    snapshot_store.configure(directory=snapshot_dir)
+    frame = snapshot_store.latest(scrapper)
+    if frame is None:
+        click_echo(f"No snapshots of {scrapper}", color="yellow")
+        raise SystemExit(1)
+    click_echo_json(snapshot_records(frame))
+
+
+@snapshots.command(cls=CustomCommand, name="history")
+@click_option(
+    "--scrapper",
+    required=True,
+    help_message="Scraper name",
+)
+@click_option(
+    "--name",
+    required=True,
+    help_message="originalName of the product",
+)
+@click_option(
+    "--version",
+    default=None,
+    help_message="originalVersion of the product, all versions by default",
+)
+@click_option(
+    "--all-runs",
+    is_flag=True,
+    default=False,
+    help_message="Show every run, not only those where something changed",
+    show_default=True,
+)
+@click_option(
+    "--snapshot-dir",
+    default=SNAPSHOT_DIR,
+    help_message="Snapshot store directory",
+    show_default=True,
+)
+def product_history(
+    scrapper: str, name: str, version: str, all_runs: bool, snapshot_dir: str
+):
+    """Show how the EOL data of a product changed across runs."""
+    snapshot_store.configure(directory=snapshot_dir)
+    frame = snapshot_store.history(scrapper, name, version, changes_only=not all_runs)
+    click_echo_json(snapshot_records(frame))
+
+
+@snapshots.command(cls=CustomCommand)
+@click_option(
+    "--scrapper",
+    default=None,
+    help_message="Scraper name, all by default",
+)
+@click_option(
+    "--snapshot-dir",
+    default=SNAPSHOT_DIR,
+    help_message="Snapshot store directory",
+    show_default=True,
+)
+def compact(scrapper: str, snapshot_dir: str):
+    """Merge the runs of old days into one file per day, as appends also do."""
+    snapshot_store.configure(directory=snapshot_dir)
+    merged = snapshot_store.compact(scrapper)
+    click_echo(f"Merged {merged} snapshots", color="green")
+
+
+@snapshots.command(cls=CustomCommand)
+@click_option(
+    "--scrapper",
+    required=True,
+    help_message="Scraper name",
+)
+@click_option(
+    "--file",
+    required=True,
+    help_message="JSON file of records of the EOL post feed",
+)
+@click_option(
+    "--fingerprint-dir",
+    default=FINGERPRINT_DIR,
+    help_message="Fingerprint index directory",
+    show_default=True,
+)
+def diff(scrapper: str, file: str, fingerprint_dir: str):
+    """Count records never sent, changed or unchanged since earlier runs."""
+    fingerprint_index.configure(directory=fingerprint_dir)
+    with open(file, encoding="utf-8") as records_file:
+        records = json.load(records_file)
+    click_echo_json(fingerprint_index.diff(scrapper, records))
+
+
+@cli_command.group(cls=CustomGroup)
+def lookup():
+    """Check products against the latest scraped EOL data."""
+
+
+def lookup_index(snapshot_dir: str) -> LookupIndex:
+    """Build the lookup index from the latest snapshots.
+
+    :param snapshot_dir: snapshot store directory
+    :returns lookup index
+    """
+    snapshot_store.configure(directory=snapshot_dir)
+    index = LookupIndex.from_snapshots(snapshot_store)
+    if not len(index):
+        click_echo(
+            f"No snapshots in {snapshot_dir}, run a scrape first", color="yellow"
+        )
+    return index
+
+
+@lookup.command(cls=CustomCommand)
+@click_option(
+    "--name",
+    required=True,
+    help_message="Product name",
+)
+@click_option(
+    "--version",
+    required=True,
+    help_message="Installed version, e.g. 10.0.5",
+)
+@click_option(
+    "--on",
+    default=None,
+    help_message="Day to check the EOL date against, today by default",
+)
+@click_option(
+    "--snapshot-dir",
+    default=SNAPSHOT_DIR,
+    help_message="Snapshot store directory",
+    show_default=True,
+)
+def product(name: str, version: str, on: str, snapshot_dir: str):
+    """Show the EOL data covering a product version."""
+    result = lookup_index(snapshot_dir).lookup(name, version, on)
+    if result is None:
+        click_echo(f"No EOL data for {name} {version}", color="yellow")
+        raise SystemExit(1)
+    click_echo_json(result)
+
+
+@lookup.command(cls=CustomCommand)
+@click_option(
+    "--name",
+    required=True,
+    help_message="Product name",
+)
+@click_option(
+    "--versions",
+    default=None,
+    help_message="Version family like 10.x or range like 9..11.x, all by default",
+)
+@click_option(
+    "--on",
+    default=None,
+    help_message="Day to check EOL dates against, today by default",
+)
+@click_option(
+    "--snapshot-dir",
+    default=SNAPSHOT_DIR,
+    help_message="Snapshot store directory",
+    show_default=True,
+)
+def search(name: str, versions: str, on: str, snapshot_dir: str):
+    """Show the EOL data of every version of a product within a pattern."""
+    click_echo_json(lookup_index(snapshot_dir).search(name, versions, on))
+
+
+@lookup.command(cls=CustomCommand)
+@click_option(
+    "--file",
+    required=True,
+    help_message="Inventory CSV file",
+)
+@click_option(
+    "--name-column",
+    default="name",
+    help_message="Inventory column holding product names",
+    show_default=True,
+)
+@click_option(
+    "--version-column",
+    default="version",
+    help_message="Inventory column holding versions",
+    show_default=True,
+)
+@click_option(
+    "--output",
+    default="inventory_eol",
+    help_message="Output file name, without extension",
+    show_default=True,
+)
+@click_option(
+    "--output-type",
+    default="csv",
+    help_message=f"Output file types, comma separated: {', '.join(OUTPUT_TYPES)}",
+    show_default=True,
+    callback=click_validator(parse_output_types),
+)
+@click_option(
+    "--on",
+    default=None,
+    help_message="Day to check EOL dates against, today by default",
+)
+@click_option(
+    "--snapshot-dir",
+    default=SNAPSHOT_DIR,
+    help_message="Snapshot store directory",
+    show_default=True,
+)
+def inventory(
+    file: str,
+    name_column: str,
+    version_column: str,
+    output: str,
+    output_type: str,
+    on: str,
+    snapshot_dir: str,
+):
+    """Look up every row of an inventory file at once."""
+    rows = read_csv(file, dtype=str, keep_default_na=False)
+    index = lookup_index(snapshot_dir)
+    found = index.lookup_frame(rows[name_column], rows[version_column], on)
+    rows = rows.join(found.add_prefix("matched_"))
+    for path in save_to_file(rows, output, output_type):
+        click_echo(f"Wrote {path}", color="green")
+    matched = int(found["originalVersion"].notna().sum())
+    past_eol = int(found["eol"].eq(True).sum())
+    click_echo(
+        f"{len(rows)} rows, {matched} with EOL data, {past_eol} past end of life",
+        color="white",
+    )
+
+
+@lookup.command(cls=CustomCommand, name="serve")
+@click_option(
+    "--host",
+    default=LOOKUP_HOST,
+    help_message="Address to listen on",
+    show_default=True,
+)
+@click_option(
+    "--port",
+    default=LOOKUP_PORT,
+    type=int,
+    help_message="Port to listen on",
+    show_default=True,
+)
+@click_option(
+    "--snapshot-dir",
+    default=SNAPSHOT_DIR,
+    help_message="Snapshot store directory",
+    show_default=True,
+)
+def serve_lookup(host: str, port: int, snapshot_dir: str):
+    """Answer lookups over a local read-only HTTP endpoint."""
+    server = serve_lookups(lookup_index(snapshot_dir), host, port)
+    click_echo(
+        f"Serving lookups on http://{host}:{server.server_port}, Ctrl+C to stop",
+        color="green",
+    )
+    try:
+        signal.pause()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
 
 
 @cli_command.command(cls=CustomCommand)
 @click_option(
     "--property",
     help_message="Set individual rabbit credentials",
-    type=click_option_choice(RABBIT_CREDS, case_sensitive=True),
+    type=click_option_choice(RABBIT_SETTINGS, case_sensitive=True),
 )
 def setup_rabbit(property):
     """Set up credentials for rabbitmq."""
@@ -60,6 +915,6 @@ def setup_rabbit(property):
         input_value = click_promt(f"Enter {property}")
         config.set_cache(property, input_value)
     else:
-        for cred in RABBIT_CREDS:
+        for cred in RABBIT_SETTINGS:
             input_value = click_promt(f"Enter {cred}")
             config.set_cache(cred, input_value)
@@ -1,6 +1,6 @@
 """CLI Utilities."""
 
-from typing import Iterable, Union
+from typing import Callable, Iterable, Union
 
 import click
 from click import Context, HelpFormatter
@@ -28,6 +28,24 @@ def click_option(name: str, help_message: str, **kwargs):
     return click.option(name, help=help_message, **kwargs)
 
 
+def click_validator(parse: Callable, convert: bool = False) -> Callable:
+    """Return an option callback rejecting values parse fails on.
+
+    :param parse: function raising ValueError for invalid option values
+    :param convert: pass on what parse returns instead of the value
+    :returns callback keeping valid values as given, or parsed if convert
+    """
+
+    def callback(ctx, param, value):
+        try:
+            parsed = parse(value)
+        except ValueError as err:
+            raise click.BadParameter(str(err), ctx=ctx, param=param) from err
+        return parsed if convert else value
+
+    return callback
+
+
 def click_pass_context() -> Context:
     """Return a click context."""
     return click.pass_context
@@ -0,0 +1,399 @@
+"""Pool of warm Chrome drivers shared by scrapers."""
+
+import os
+import signal
+import threading
+
+from selenium import webdriver
+
+from apexa.common._typings import WEBDRIVER
+from apexa.common.util import get_logger, init_chrome_web_driver
+from apexa.config.default import BROWSER_ADDRESS
+
+LOG = get_logger(__name__)
+
+# URL patterns of resources scrapers never read, by resource type
+RESOURCE_PATTERNS = {
+    "image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico"],
+    "font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "media": ["*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav"],
+    "stylesheet": ["*.css"],
+}
+# Analytics, ads and tag managers found on vendor marketing pages
+TRACKER_DOMAINS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "facebook.net",
+    "connect.facebook.com",
+    "hotjar.com",
+    "clarity.ms",
+    "hs-scripts.com",
+    "hs-analytics.net",
+    "hsforms.net",
+    "bat.bing.com",
+    "snap.licdn.com",
+    "ads.linkedin.com",
+    "segment.com",
+    "optimizely.com",
+    "nr-data.net",
+    "zdassets.com",
+    "intercom.io",
+    "drift.com",
+]
+LEAN_ARGUMENTS = [
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-dev-shm-usage",
+    "--blink-settings=imagesEnabled=false",
+    "--mute-audio",
+    "--no-first-run",
+]
+# Resources and bytes fetched for the current page, and the JS heap size
+PAGE_WEIGHT_SCRIPT = """
+const entries = performance.getEntriesByType("navigation")
+    .concat(performance.getEntriesByType("resource"));
+return {
+    resources: entries.length,
+    bytes: entries.reduce((total, entry) => total + (entry.transferSize || 0), 0),
+    heap: performance.memory ? performance.memory.usedJSHeapSize : 0,
+};
+"""
+
+
+class BrowserProfile:
+    """How Chrome is started for a scraper and what it may download."""
+
+    def __init__(
+        self,
+        name: str,
+        page_load_strategy: str = "eager",
+        arguments: tuple = tuple(LEAN_ARGUMENTS),
+        blocked_types: tuple = ("image", "font", "media"),
+        blocked_domains: tuple = tuple(TRACKER_DOMAINS),
+    ):
+        self.name = name
+        self.page_load_strategy = page_load_strategy
+        self.arguments = tuple(arguments)
+        self.blocked_types = tuple(blocked_types)
+        self.blocked_domains = tuple(blocked_domains)
+
+    @property
+    def key(self) -> tuple:
+        """Identity of the profile, browsers are only shared within a key."""
+        return (
+            self.page_load_strategy,
+            self.arguments,
+            self.blocked_types,
+            self.blocked_domains,
+        )
+
+    def blocked_urls(self) -> list:
+        """Return the URL patterns Chrome must not fetch.
+
+        :returns list of wildcard URL patterns
+        """
+        patterns = [
+            pattern
+            for resource_type in self.blocked_types
+            for pattern in RESOURCE_PATTERNS[resource_type]
+        ]
+        patterns.extend(f"*{domain}*" for domain in self.blocked_domains)
+        return patterns
+
+    def chrome_options(self) -> webdriver.ChromeOptions:
+        """Return the Chrome options of the profile.
+
+        :returns Chrome options
+        """
+        options = webdriver.ChromeOptions()
+        options.page_load_strategy = self.page_load_strategy
+        for argument in self.arguments:
+            options.add_argument(argument)
+        if "image" in self.blocked_types:
+            options.add_experimental_option(
+                "prefs", {"profile.managed_default_content_settings.images": 2}
+            )
+        return options
+
+    def apply(self, driver: WEBDRIVER):
+        """Block the unwanted requests of a started browser.
+
+        :param driver: Chrome driver
+        """
+        blocked_urls = self.blocked_urls()
+        if blocked_urls:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+
+
+# Defaults of every scraper, reads tables and text without the page furniture
+LEAN_PROFILE = BrowserProfile("lean")
+# Stock Chrome, for pages that break without their images or scripts
+FULL_PROFILE = BrowserProfile(
+    "full",
+    page_load_strategy="normal",
+    arguments=(),
+    blocked_types=(),
+    blocked_domains=(),
+)
+
+
+def start_browser(profile: BrowserProfile = LEAN_PROFILE) -> WEBDRIVER:
+    """Start Chrome with a browser profile.
+
+    :param profile: browser profile
+    :returns Chrome driver
+    """
+    driver = init_chrome_web_driver(profile.chrome_options())
+    try:
+        profile.apply(driver)
+    except Exception as err:
+        LOG.warning("Unable to block requests in profile '%s': %s", profile.name, err)
+    return driver
+
+
+def attach_browser(address: str, profile: BrowserProfile = LEAN_PROFILE) -> WEBDRIVER:
+    """Drive a new tab of an already running Chrome.
+
+    :param address: host:port of the Chrome remote debugging endpoint
+    :param profile: browser profile, its launch flags are ignored
+    :returns Chrome driver
+    """
+    driver = init_chrome_web_driver(profile.chrome_options(), debugger_address=address)
+    # Own tab, so runs sharing the browser never read each other's pages
+    driver.switch_to.new_window("tab")
+    try:
+        profile.apply(driver)
+    except Exception as err:
+        LOG.warning("Unable to block requests in profile '%s': %s", profile.name, err)
+    return driver
+
+
+def page_weight(driver) -> dict:
+    """Measure what the current page made the browser download.
+
+    :param driver: driver on a loaded page
+    :returns resources, bytes and heap, None without a browser
+    """
+    try:
+        return driver.execute_script(PAGE_WEIGHT_SCRIPT)
+    except Exception as err:
+        LOG.debug("Unable to measure page weight: %s", err)
+        return None
+
+
+def unwrap_driver(driver):
+    """Return the driver behind a recording wrapper.
+
+    :param driver: driver, possibly wrapped
+    :returns underlying driver
+    """
+    return getattr(driver, "wrapped_driver", driver)
+
+
+def driver_is_alive(driver: WEBDRIVER) -> bool:
+    """Check whether a driver still controls a live browser.
+
+    :param driver: Chrome driver
+    :returns True if the browser responds
+    """
+    try:
+        _ = driver.window_handles
+        return True
+    except Exception:
+        return False
+
+
+def descendant_pids(pid: int) -> list:
+    """Return the pids of every process started by pid, read from /proc.
+
+    :param pid: parent process id
+    :returns descendant pids, empty where /proc is not available
+    """
+    children: dict = {}
+    try:
+        entries = [entry for entry in os.listdir("/proc") if entry.isdigit()]
+    except OSError:
+        return []
+    for entry in entries:
+        try:
+            with open(f"/proc/{entry}/stat", encoding="utf-8") as file:
+                # The command name may hold spaces, fields resume after ")"
+                parent = int(file.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+
+    found, pending = [], [pid]
+    while pending:
+        for child in children.get(pending.pop(), []):
+            found.append(child)
+            pending.append(child)
+    return found
+
+
+def kill_driver(driver):
+    """Kill a driver's browser without talking to it, for hung browsers.
+
+    :param driver: driver, possibly wrapped
+    """
+    driver = unwrap_driver(driver)
+    process = getattr(getattr(driver, "service", None), "process", None)
+    if process is None:
+        driver.quit()
+        return
+    for pid in descendant_pids(process.pid) + [process.pid]:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+class BrowserPool:
+    """Keeps released Chrome drivers warm for the next scraper.
+
+    Drivers are only handed out again to scrapers of the same browser
+    profile. Disabled by default, in which case every scraper gets a fresh
+    browser that is quit when the scraper is done. When attached to a running
+    browser, every scraper gets its own tab of it instead.
+    """
+
+    def __init__(self, max_idle: int = 1):
+        self.enabled = False
+        self.max_idle = max_idle
+        self.debugger_address = BROWSER_ADDRESS
+        self.idle: dict = {}
+        self.leased: dict = {}
+        self.attached: set = set()
+        self._lock = threading.Lock()
+
+    def attach(self, address: str):
+        """Use tabs of the browser listening on address instead of new browsers.
+
+        :param address: host:port of the Chrome remote debugging endpoint
+        """
+        self.debugger_address = address
+        if address:
+            LOG.info("Attaching scrapers to the browser at %s", address)
+
+    def enable(self, max_idle: int = 1):
+        """Keep up to max_idle released drivers running per browser profile.
+
+        :param max_idle: number of drivers to keep warm
+        """
+        self.enabled = True
+        self.max_idle = max_idle
+
+    @property
+    def idle_count(self) -> int:
+        """Number of warm drivers across profiles."""
+        with self._lock:
+            return sum(len(drivers) for drivers in self.idle.values())
+
+    def acquire(self, profile: BrowserProfile = LEAN_PROFILE) -> WEBDRIVER:
+        """Return a warm driver of the profile, or start a new one.
+
+        :param profile: browser profile
+        :returns Chrome driver
+        """
+        if self.debugger_address:
+            driver = attach_browser(self.debugger_address, profile)
+            self.attached.add(id(driver))
+            return driver
+
+        while self.enabled:
+            with self._lock:
+                idle = self.idle.get(profile.key)
+                driver = idle.pop() if idle else None
+            if driver is None:
+                break
+            if driver_is_alive(driver):
+                self.leased[id(driver)] = profile.key
+                return driver
+            self._quit(driver)
+
+        driver = start_browser(profile)
+        if self.enabled:
+            self.leased[id(driver)] = profile.key
+        return driver
+
+    def release(self, driver):
+        """Return a driver to the pool, quitting it if it cannot be reused.
+
+        :param driver: driver obtained from acquire, or any other driver
+        """
+        driver = unwrap_driver(driver)
+        if id(driver) in self.attached:
+            self.attached.discard(id(driver))
+            self._detach(driver)
+            return
+
+        key = self.leased.pop(id(driver), None)
+        if key is None:
+            self._quit(driver)
+            return
+
+        with self._lock:
+            keep = len(self.idle.get(key, [])) < self.max_idle
+        if keep and self._reset(driver):
+            with self._lock:
+                self.idle.setdefault(key, []).append(driver)
+        else:
+            self._quit(driver)
+
+    def close(self):
+        """Quit every idle driver and disable the pool."""
+        self.enabled = False
+        with self._lock:
+            idle, self.idle = self.idle, {}
+        for drivers in idle.values():
+            for driver in drivers:
+                self._quit(driver)
+
+    @staticmethod
+    def _reset(driver: WEBDRIVER) -> bool:
+        """Bring a driver back to a single blank tab without cookies.
+
+        :param driver: Chrome driver
+        :returns True if the driver can be reused
+        """
+        try:
+            for handle in driver.window_handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(driver.window_handles[0])
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except Exception as err:
+            LOG.warning("Discarding browser that could not be reset: %s", err)
+            return False
+
+    @staticmethod
+    def _detach(driver: WEBDRIVER):
+        """Close the tab of an attached driver, leaving the browser running.
+
+        :param driver: attached Chrome driver
+        """
+        try:
+            driver.close()
+        except Exception as err:
+            LOG.debug("Error while closing tab: %s", err)
+        BrowserPool._quit(driver)
+
+    @staticmethod
+    def _quit(driver):
+        """Quit a driver, ignoring browsers that already died.
+
+        :param driver: driver to quit
+        """
+        try:
+            driver.quit()
+        except Exception as err:
+            LOG.debug("Error while quitting browser: %s", err)
+
+
+browser_pool = BrowserPool()
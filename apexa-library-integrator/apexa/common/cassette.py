@@ -0,0 +1,207 @@
+"""Record and replay fetched pages for offline scraper runs."""
+
+import gzip
+import json
+import os
+import re
+from hashlib import sha1
+from typing import Optional
+
+from apexa.common.util import get_logger
+from apexa.config.default import CASSETTE_DIR
+
+LOG = get_logger(__name__)
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class CassetteNotFound(Exception):
+    """Raised when a replayed URL was never recorded."""
+
+    def __init__(self, url: str, directory: str):
+        self.message = f"No recording of {url} in {directory}"
+        super().__init__(self.message)
+
+
+class Cassette:
+    """Directory of gzip compressed responses of a single scraper."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path_for(self, url: str) -> str:
+        """Return the file holding the recording of an URL.
+
+        :param url: fetched url
+        :returns recording file path
+        """
+        return f"{self.directory}/{sha1(url.encode('utf-8')).hexdigest()}.json.gz"
+
+    def save(
+        self,
+        url: str,
+        page_source: str,
+        status: Optional[int] = None,
+        headers: Optional[dict] = None,
+    ):
+        """Record a response.
+
+        :param url: fetched url
+        :param page_source: page source as seen by the scraper
+        :param status: HTTP status code, if known
+        :param headers: HTTP response headers, if known
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        recording = {
+            "url": url,
+            "status": status,
+            "headers": dict(headers or {}),
+            "page_source": page_source,
+        }
+        with gzip.open(self.path_for(url), "wt", encoding="utf-8") as file:
+            json.dump(recording, file)
+
+    def load(self, url: str) -> dict:
+        """Load a recorded response.
+
+        :param url: fetched url
+        :returns recorded response
+        :raises CassetteNotFound: if the url was not recorded
+        """
+        try:
+            with gzip.open(self.path_for(url), "rt", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError as err:
+            raise CassetteNotFound(url, self.directory) from err
+
+
+class RecordingDriver:
+    """Driver wrapper saving every page source read by a scraper.
+
+    Pages may change after navigation, so sources are saved when read, but
+    a source read again unchanged is not saved again.
+    """
+
+    def __init__(self, driver, cassette: Cassette):
+        self.wrapped_driver = driver
+        self._cassette = cassette
+        self._url = None
+        self._saved = None
+
+    def __getattr__(self, name: str):
+        return getattr(self.wrapped_driver, name)
+
+    def get(self, url: str):
+        """Navigate to url.
+
+        :param url: url to visit
+        """
+        self._url = url
+        self.wrapped_driver.get(url)
+
+    @property
+    def page_source(self) -> str:
+        """Return and record the current page source."""
+        page_source = self.wrapped_driver.page_source
+        url = self._url or self.wrapped_driver.current_url
+        if self._saved != (url, page_source):
+            self._cassette.save(
+                url,
+                page_source,
+                getattr(self.wrapped_driver, "status_code", None),
+                getattr(self.wrapped_driver, "headers", None),
+            )
+            self._saved = (url, page_source)
+        return page_source
+
+
+class ReplayDriver:
+    """Browserless driver serving recorded page sources."""
+
+    renders_javascript = False
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+        self.current_url = None
+        self.page_source = ""
+        self.status_code = None
+        self.headers = {}
+        self.window_handles = ["replay"]
+        self.current_window_handle = "replay"
+
+    def get(self, url: str):
+        """Load the recording of url.
+
+        :param url: url to visit
+        """
+        recording = self.cassette.load(url)
+        self.current_url = recording["url"]
+        self.page_source = recording["page_source"]
+        self.status_code = recording["status"]
+        self.headers = recording["headers"]
+
+    def execute_script(self, *args):  # pylint: disable=W0613
+        """Scripts cannot run against recordings."""
+        return None
+
+    def close(self):
+        """Nothing to close."""
+
+    def quit(self):
+        """Nothing to quit."""
+
+
+class CassetteRecorder:
+    """Recording mode shared by all scrapers of a run."""
+
+    def __init__(self):
+        self.mode: Optional[str] = None
+        self.directory = CASSETTE_DIR
+
+    def configure(self, mode: Optional[str], directory: str = CASSETTE_DIR):
+        """Set the recording mode.
+
+        :param mode: "record", "replay" or None to disable
+        :param directory: cassette base directory
+        """
+        self.mode = mode
+        self.directory = directory
+        if mode:
+            LOG.info("Cassette mode '%s' using %s", mode, directory)
+
+    @property
+    def replaying(self) -> bool:
+        """Whether pages are served from cassettes."""
+        return self.mode == REPLAY
+
+    def cassette(self, scraper_name: str) -> Cassette:
+        """Return the cassette of a scraper.
+
+        :param scraper_name: scraper name
+        :returns scraper cassette
+        """
+        folder = re.sub(r"[^\w.-]", "_", str(scraper_name))
+        return Cassette(f"{self.directory}/{folder}")
+
+    def replay_driver(self, scraper_name: str) -> ReplayDriver:
+        """Return a driver replaying the cassette of a scraper.
+
+        :param scraper_name: scraper name
+        :returns replay driver
+        """
+        return ReplayDriver(self.cassette(scraper_name))
+
+    def wrap(self, driver, scraper_name: str):
+        """Wrap driver to record page sources when recording.
+
+        :param driver: driver to wrap
+        :param scraper_name: scraper name
+        :returns recording driver or the driver itself
+        """
+        if self.mode != RECORD:
+            return driver
+        return RecordingDriver(driver, self.cassette(scraper_name))
+
+
+recorder = CassetteRecorder()
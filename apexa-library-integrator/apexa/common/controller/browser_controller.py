@@ -0,0 +1,364 @@
+"""Supervisor of a long lived headless Chrome shared by CLI runs."""
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import Optional
+
+import requests
+
+from apexa.common.browser import LEAN_ARGUMENTS, descendant_pids
+from apexa.common.log import setup_logging
+from apexa.common.util import get_isoformated_date, get_logger
+from apexa.config.default import (
+    BROWSER_CHECK_INTERVAL,
+    BROWSER_MAX_RSS,
+    BROWSER_PID_FILE,
+    BROWSER_PORT,
+    BROWSER_PROFILE_DIR,
+    BROWSER_STATE_FILE,
+    CHROME_BINARY,
+)
+
+LOG = get_logger(__name__)
+
+CHROME_CANDIDATES = [
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser",
+    "chrome",
+]
+# Seconds to wait for a started supervisor to bring Chrome up
+STARTUP_TIMEOUT = 20
+# Seconds Chrome gets to exit before it is killed
+SHUTDOWN_TIMEOUT = 10
+# Back to back restarts after which Chrome is considered broken
+MAX_RAPID_RESTARTS = 5
+
+
+class BrowserSupervisorException(Exception):
+    """Raised when the supervised browser cannot be managed."""
+
+    def __init__(self, message="browser supervisor error"):
+        self.message = message
+        super().__init__(self.message)
+
+
+def find_chrome() -> str:
+    """Return the Chrome executable to supervise.
+
+    :returns path of the Chrome executable
+    """
+    for candidate in [CHROME_BINARY] + CHROME_CANDIDATES:
+        path = candidate and shutil.which(candidate)
+        if path:
+            return path
+    raise BrowserSupervisorException(
+        "Chrome not found, set CHROME_BINARY to its executable"
+    )
+
+
+def process_alive(pid: Optional[int]) -> bool:
+    """Check whether a process is running.
+
+    :param pid: process id
+    :returns True if the process exists
+    """
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def process_rss(pid: int) -> int:
+    """Return the resident memory of a process and its children from /proc.
+
+    :param pid: process id
+    :returns resident set size in bytes, 0 where /proc is not available
+    """
+    total = 0
+    for member in [pid] + descendant_pids(pid):
+        try:
+            with open(f"/proc/{member}/status", encoding="utf-8") as file:
+                for line in file:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except (OSError, ValueError):
+            continue
+    return total
+
+
+def read_state(state_file: str = BROWSER_STATE_FILE) -> dict:
+    """Read the state published by the supervisor.
+
+    :param state_file: supervisor state file
+    :returns supervisor state, empty if it is not running
+    """
+    try:
+        with open(state_file, encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+class BrowserSupervisor:
+    """Keeps one headless Chrome running, restarting it on crash or bloat."""
+
+    def __init__(
+        self,
+        port: int = BROWSER_PORT,
+        max_rss: int = BROWSER_MAX_RSS,
+        check_interval: float = BROWSER_CHECK_INTERVAL,
+        state_file: str = BROWSER_STATE_FILE,
+        pid_file: str = BROWSER_PID_FILE,
+        profile_dir: str = BROWSER_PROFILE_DIR,
+    ):
+        self.port = port
+        self.max_rss = max_rss
+        self.check_interval = check_interval
+        self.state_file = state_file
+        self.pid_file = pid_file
+        self.profile_dir = profile_dir
+        self.process = None
+        self.restarts = 0
+        self.rapid_restarts = 0
+        self.last_restart = None
+        self.started = None
+        self._stop = threading.Event()
+
+    @property
+    def address(self) -> str:
+        """Remote debugging address of the browser."""
+        return f"127.0.0.1:{self.port}"
+
+    def launch(self):
+        """Start Chrome with remote debugging enabled."""
+        os.makedirs(self.profile_dir, exist_ok=True)
+        command = [
+            find_chrome(),
+            "--headless=new",
+            f"--remote-debugging-port={self.port}",
+            "--remote-debugging-address=127.0.0.1",
+            f"--user-data-dir={self.profile_dir}",
+            *LEAN_ARGUMENTS,
+            "about:blank",
+        ]
+        self.process = subprocess.Popen(
+            command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        self.started = get_isoformated_date()
+        LOG.info("Started Chrome %s on %s", self.process.pid, self.address)
+
+    def terminate(self):
+        """Stop Chrome and every process it started."""
+        if self.process is None:
+            return
+        children = descendant_pids(self.process.pid)
+        self.process.terminate()
+        try:
+            self.process.wait(SHUTDOWN_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        for pid in children:
+            if process_alive(pid):
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except OSError:
+                    pass
+        self.process = None
+
+    def check(self) -> Optional[str]:
+        """Look for a reason to restart Chrome.
+
+        :returns reason, None while Chrome is healthy
+        """
+        code = self.process.poll()
+        if code is not None:
+            return f"Chrome exited with code {code}"
+        rss = process_rss(self.process.pid)
+        if self.max_rss and rss > self.max_rss:
+            return f"Chrome uses {rss // 2**20} MiB, over {self.max_rss // 2**20} MiB"
+        return None
+
+    def restart(self, reason: str):
+        """Replace Chrome with a fresh instance.
+
+        :param reason: why Chrome is restarted
+        """
+        LOG.warning("Restarting browser: %s", reason)
+        now = time.monotonic()
+        if self.last_restart and now - self.last_restart < self.check_interval * 2:
+            self.rapid_restarts += 1
+        else:
+            self.rapid_restarts = 0
+        if self.rapid_restarts >= MAX_RAPID_RESTARTS:
+            raise BrowserSupervisorException(f"Chrome keeps failing: {reason}")
+
+        self.last_restart = now
+        self.restarts += 1
+        self.terminate()
+        self.launch()
+
+    def state(self) -> dict:
+        """Return the supervisor state.
+
+        :returns JSON serializable state
+        """
+        running = self.process is not None and self.process.poll() is None
+        return {
+            "pid": os.getpid(),
+            "chrome_pid": self.process.pid if running else None,
+            "address": self.address,
+            "started": self.started,
+            "restarts": self.restarts,
+            "rss": process_rss(self.process.pid) if running else 0,
+            "max_rss": self.max_rss,
+        }
+
+    def write_state(self):
+        """Publish the state for "apexa browser status" and scraper runs."""
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as file:
+            json.dump(self.state(), file)
+        os.replace(tmp_file, self.state_file)
+
+    def run(self):
+        """Supervise Chrome until SIGTERM or SIGINT."""
+        signal.signal(signal.SIGTERM, lambda *_: self._stop.set())
+        signal.signal(signal.SIGINT, lambda *_: self._stop.set())
+        os.makedirs(os.path.dirname(self.pid_file), exist_ok=True)
+        with open(self.pid_file, "w", encoding="utf-8") as file:
+            file.write(str(os.getpid()))
+
+        try:
+            self.launch()
+            self.write_state()
+            while not self._stop.wait(self.check_interval):
+                reason = self.check()
+                if reason:
+                    self.restart(reason)
+                self.write_state()
+        finally:
+            self.terminate()
+            for file_name in (self.state_file, self.pid_file):
+                try:
+                    os.remove(file_name)
+                except FileNotFoundError:
+                    pass
+            LOG.info("Browser supervisor stopped")
+
+
+def supervisor_pid(pid_file: str = BROWSER_PID_FILE) -> Optional[int]:
+    """Return the pid of the running supervisor.
+
+    :param pid_file: supervisor pid file
+    :returns pid, None if no supervisor is running
+    """
+    try:
+        with open(pid_file, encoding="utf-8") as file:
+            pid = int(file.read().strip())
+    except (OSError, ValueError):
+        return None
+    return pid if process_alive(pid) else None
+
+
+def start_supervisor(port: int = BROWSER_PORT, max_rss: int = BROWSER_MAX_RSS) -> dict:
+    """Start the supervisor in the background, unless it already runs.
+
+    :param port: remote debugging port
+    :param max_rss: memory in bytes beyond which Chrome is restarted
+    :returns supervisor state
+    """
+    if supervisor_pid():
+        return browser_status()
+
+    command = [
+        sys.executable,
+        "-m",
+        __name__,
+        "--port",
+        str(port),
+        "--max-rss",
+        str(max_rss),
+    ]
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise BrowserSupervisorException(
+                f"Browser supervisor exited with code {process.returncode}"
+            )
+        status = browser_status()
+        if status.get("browser"):
+            return status
+        time.sleep(0.5)
+    raise BrowserSupervisorException(
+        f"Browser did not come up within {STARTUP_TIMEOUT}s"
+    )
+
+
+def stop_supervisor() -> bool:
+    """Stop the supervisor and its browser.
+
+    :returns False if no supervisor was running
+    """
+    pid = supervisor_pid()
+    if pid is None:
+        return False
+    os.kill(pid, signal.SIGTERM)
+    deadline = time.monotonic() + SHUTDOWN_TIMEOUT * 2
+    while process_alive(pid) and time.monotonic() < deadline:
+        time.sleep(0.2)
+    return True
+
+
+def browser_status() -> dict:
+    """Return the state of the supervised browser.
+
+    :returns supervisor state with the browser version, empty if not running
+    """
+    if supervisor_pid() is None:
+        return {}
+    state = read_state()
+    if state.get("address"):
+        try:
+            response = requests.get(
+                f"http://{state['address']}/json/version", timeout=2
+            )
+            state["browser"] = response.json().get("Browser")
+        except (requests.RequestException, ValueError):
+            state["browser"] = None
+    return state
+
+
+def main():
+    """Run the supervisor in the foreground, started by start_supervisor."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=BROWSER_PORT)
+    parser.add_argument("--max-rss", type=int, default=BROWSER_MAX_RSS)
+    args = parser.parse_args()
+    setup_logging()
+    BrowserSupervisor(port=args.port, max_rss=args.max_rss).run()
+
+
+if __name__ == "__main__":
+    main()
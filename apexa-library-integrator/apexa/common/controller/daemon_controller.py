@@ -0,0 +1,348 @@
+"""Long running scraper daemon with warm resources."""
+
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from apexa.common._typings import DATAFRAME
+from apexa.common.browser import browser_pool
+from apexa.common.controller import scraper_controller
+from apexa.common.deadline import DeadlineExceeded
+from apexa.common.governor import governor
+from apexa.common.log import set_log_context
+from apexa.common.metrics import metrics
+from apexa.common.plugins import scraper_plugins
+from apexa.common.publisher.publisher import broker_session
+from apexa.common.result_cache import result_cache
+from apexa.common.scheduler import (
+    AdaptiveRevisit,
+    RevisitStore,
+    ScraperSchedule,
+    content_hash,
+)
+from apexa.common.util import (
+    generate_uuid,
+    get_isoformated_date,
+    get_logger,
+    json_dumps,
+)
+from apexa.config.default import (
+    DAEMON_DEFAULT_CRON,
+    DAEMON_DEFAULT_JITTER,
+    DAEMON_HOST,
+    DAEMON_PORT,
+    REVISIT_MAX_INTERVAL,
+    REVISIT_MIN_INTERVAL,
+    REVISIT_STATE_FILE,
+)
+
+LOG = get_logger(__name__)
+
+# Longest idle wait, so broker heartbeats are serviced in time
+MAX_IDLE_SECONDS = 30
+
+
+def load_schedules(
+    scrappers: list,
+    schedule_file: str = None,
+    cron: str = DAEMON_DEFAULT_CRON,
+    jitter: int = DAEMON_DEFAULT_JITTER,
+    adaptive: bool = False,
+    revisit_store: RevisitStore = None,
+) -> list[ScraperSchedule]:
+    """Build scraper schedules from defaults and an optional schedule file.
+
+    The schedule file maps scraper names to their own settings::
+
+        {"scrapers": {
+            "idera": {"cron": "0 3 * * 1", "jitter": 600},
+            "7-zip": {"adaptive": {"min_interval": 3600, "max_interval": 604800}}
+        }}
+
+    Adaptive scrapers use the cron expression for their first run only.
+
+    :param scrappers: names of scrapers to schedule
+    :param schedule_file: JSON schedule file
+    :param cron: default cron expression
+    :param jitter: default jitter in seconds
+    :param adaptive: adapt revisit intervals of scrapers by default
+    :param revisit_store: store holding adaptive revisit state
+    :returns list of scraper schedules
+    """
+    revisit_states = revisit_store.load() if revisit_store else {}
+    overrides = {}
+    if schedule_file:
+        try:
+            with open(schedule_file, encoding="utf-8") as file:
+                overrides = json.load(file).get("scrapers", {})
+        except FileNotFoundError:
+            LOG.info("No schedule file at %s, using defaults", schedule_file)
+
+    schedules = []
+    for name in scrappers:
+        settings = overrides.get(name, {})
+        revisit = None
+        revisit_settings = settings.get("adaptive", adaptive)
+        if revisit_settings:
+            bounds = revisit_settings if isinstance(revisit_settings, dict) else {}
+            revisit = AdaptiveRevisit(
+                bounds.get("min_interval", REVISIT_MIN_INTERVAL),
+                bounds.get("max_interval", REVISIT_MAX_INTERVAL),
+                revisit_states.get(name),
+            )
+        schedules.append(
+            ScraperSchedule(
+                name,
+                settings.get("cron", cron),
+                settings.get("jitter", jitter),
+                revisit,
+            )
+        )
+    return schedules
+
+
+class ScraperDaemon:
+    """Runs every scraper on its own schedule in a single warm process."""
+
+    def __init__(
+        self,
+        schedules: list[ScraperSchedule],
+        test: bool = False,
+        output_type: str = "csv",
+        host: str = DAEMON_HOST,
+        port: int = DAEMON_PORT,
+        revisit_store: RevisitStore = None,
+    ):
+        self.revisit_store = revisit_store or RevisitStore(REVISIT_STATE_FILE)
+        self.schedules = {schedule.name: schedule for schedule in schedules}
+        self.test = test
+        self.output_type = output_type
+        self.host = host
+        self.port = port
+        self.api_classes: dict = {}
+        self.started = None
+        self.server = None
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Load plugins, warm shared resources and start the control endpoint."""
+        sources = scraper_plugins.sources()
+        for name in list(self.schedules):
+            entry_point = sources.get(name)
+            if entry_point is None:
+                LOG.warning("Scrapper '%s' is not available, not scheduling it", name)
+                self.schedules.pop(name)
+                continue
+            self.api_classes[name] = entry_point.load()
+
+        run_id = generate_uuid()
+        set_log_context(run_id=run_id)
+        metrics.configure(enabled=True, run_id=run_id)
+        # Scheduled runs exist to see fresh data
+        result_cache.configure(enabled=False)
+        browser_pool.enable()
+        if not self.test:
+            broker_session.open()
+
+        now = datetime.now()
+        for schedule in self.schedules.values():
+            schedule.plan(now)
+
+        self.server = ThreadingHTTPServer((self.host, self.port), ControlHandler)
+        self.server.daemon_controller = self
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.started = get_isoformated_date()
+        LOG.info("Scraper daemon listening on http://%s:%s", self.host, self.port)
+
+    def run_forever(self):
+        """Run scheduled scrapers until stopped."""
+        self.start()
+        try:
+            while not self._stop.is_set():
+                self.run_due()
+                broker_session.process_events()
+                self._wakeup.wait(self.seconds_until_next())
+                self._wakeup.clear()
+        finally:
+            self.shutdown()
+
+    def run_due(self):
+        """Run every scraper whose next run time has passed."""
+        now = datetime.now()
+        with self._lock:
+            due = [s for s in self.schedules.values() if s.is_due(now)]
+        for schedule in sorted(due, key=lambda s: s.next_run):
+            if self._stop.is_set():
+                break
+            self.run_one(schedule)
+
+    def run_one(self, schedule: ScraperSchedule):
+        """Run a scraper and plan its next run.
+
+        :param schedule: schedule of the scraper to run
+        """
+        started = time.perf_counter()
+        schedule.last_started = get_isoformated_date()
+        try:
+            with metrics.scope(schedule.name):
+                eol_data = scraper_controller.run_scrapper(
+                    self.api_classes[schedule.name],
+                    schedule.name,
+                    self.test,
+                    self.output_type,
+                )
+                if schedule.revisit is not None:
+                    self.observe_change(schedule, eol_data)
+            schedule.last_status = "ok"
+        except DeadlineExceeded as err:
+            LOG.error("Scheduled run timed out: %s", err)
+            schedule.last_status = f"timeout: {err.stage}"
+        except Exception as err:
+            LOG.exception("Scheduled run of '%s' failed: %s", schedule.name, err)
+            schedule.last_status = f"error: {err}"
+
+        with self._lock:
+            schedule.runs += 1
+            schedule.last_duration = time.perf_counter() - started
+            schedule.plan(datetime.now())
+
+    def observe_change(self, schedule: ScraperSchedule, eol_data):
+        """Adapt the revisit interval of a scraper to its latest content.
+
+        :param schedule: schedule of the scraper that ran
+        :param eol_data: scraped data, as returned by run_scrapper
+        """
+        if isinstance(eol_data, DATAFRAME):
+            # Test runs return what they scraped, hash what would be published
+            scraper = self.api_classes[schedule.name](generate_uuid())
+            eol_data = scraper.build_post_batch(eol_data)
+        decision = schedule.revisit.observe(content_hash(eol_data), time.time())
+        schedule.last_decision = decision
+        metrics.annotate("revisit", decision)
+        LOG.info(
+            "Revisit '%s': changed=%s interval %.0fs -> %.0fs",
+            schedule.name,
+            decision["changed"],
+            decision["previous_interval"],
+            decision["interval"],
+        )
+        with self._lock:
+            states = {
+                name: s.revisit.state()
+                for name, s in self.schedules.items()
+                if s.revisit is not None
+            }
+        self.revisit_store.save({**self.revisit_store.load(), **states})
+
+    def seconds_until_next(self) -> float:
+        """Return how long to wait for the next due scraper.
+
+        :returns seconds to wait
+        """
+        with self._lock:
+            next_runs = [s.next_run for s in self.schedules.values() if s.next_run]
+        if not next_runs:
+            return MAX_IDLE_SECONDS
+        wait = (min(next_runs) - datetime.now()).total_seconds()
+        return min(max(wait, 0), MAX_IDLE_SECONDS)
+
+    def trigger(self, name: str) -> bool:
+        """Run a scraper as soon as possible.
+
+        :param name: scraper name
+        :returns False if the scraper is not scheduled
+        """
+        with self._lock:
+            schedule = self.schedules.get(name)
+            if schedule is None:
+                return False
+            schedule.next_run = datetime.now()
+        self._wakeup.set()
+        return True
+
+    def stop(self):
+        """Stop after the scraper currently running."""
+        self._stop.set()
+        self._wakeup.set()
+
+    def shutdown(self):
+        """Release shared resources."""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        broker_session.close()
+        browser_pool.close()
+        LOG.info("Scraper daemon stopped")
+
+    def status(self) -> dict:
+        """Return the daemon state.
+
+        :returns JSON serializable daemon state
+        """
+        with self._lock:
+            scrapers = {
+                name: schedule.status() for name, schedule in self.schedules.items()
+            }
+        return {
+            "started": self.started,
+            "test": self.test,
+            "idle_browsers": browser_pool.idle_count,
+            "hosts": governor.status(),
+            "scrapers": scrapers,
+        }
+
+
+class ControlHandler(BaseHTTPRequestHandler):
+    """Local control endpoint of the daemon.
+
+    GET /status, /report and /metrics, POST /run/<scraper> and /stop.
+    """
+
+    def do_GET(self):  # pylint: disable=C0103
+        """Serve status and metrics."""
+        daemon = self.server.daemon_controller
+        if self.path == "/status":
+            self.respond(200, json_dumps(daemon.status(), indent=2))
+        elif self.path == "/report":
+            self.respond(200, json_dumps(metrics.report(), indent=2))
+        elif self.path == "/metrics":
+            self.respond(200, metrics.to_prometheus(), "text/plain; version=0.0.4")
+        else:
+            self.respond(404, json_dumps({"error": "not found"}))
+
+    def do_POST(self):  # pylint: disable=C0103
+        """Trigger scrapers or stop the daemon."""
+        daemon = self.server.daemon_controller
+        if self.path.startswith("/run/"):
+            name = self.path[len("/run/") :]
+            if daemon.trigger(name):
+                self.respond(202, json_dumps({"scheduled": name}))
+            else:
+                self.respond(404, json_dumps({"error": f"unknown scraper {name}"}))
+        elif self.path == "/stop":
+            daemon.stop()
+            self.respond(202, json_dumps({"stopping": True}))
+        else:
+            self.respond(404, json_dumps({"error": "not found"}))
+
+    def respond(self, code: int, body: str, content_type: str = "application/json"):
+        """Send a response.
+
+        :param code: HTTP status code
+        :param body: response body
+        :param content_type: response content type
+        """
+        payload = body.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):  # pylint: disable=W0622
+        """Log requests at debug level instead of stderr."""
+        LOG.debug(format % args)
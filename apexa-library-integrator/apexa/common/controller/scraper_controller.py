@@ -1,17 +1,33 @@
 """Scrapers Controller."""
 
+import time
+
+from apexa.common.browser import browser_pool
+from apexa.common.cassette import RECORD, REPLAY, recorder
+from apexa.common.deadline import Deadline, DeadlineExceeded, checkpoint, deadlines
+from apexa.common.fingerprints import fingerprint_index
+from apexa.common.history import run_history
+from apexa.common.log import log_context, set_log_context
+from apexa.common.metrics import metrics
+from apexa.common.plugins import scraper_plugins
+from apexa.common.profiling import profile_scraper
 from apexa.common.publisher.publisher_dependency import Publisher
-from apexa.common.util import (
-    generate_uuid,
-    get_logger,
-    metadata_entry_points,
-    save_to_file,
+from apexa.common.result_cache import result_cache
+from apexa.common.run_manifest import (
+    FAILED,
+    FETCHED,
+    FORMATTED,
+    PUBLISHED,
+    SAVED,
+    TIMED_OUT,
+    UNAVAILABLE,
+    UNDELIVERED,
+    RunManifest,
 )
-
-SCRAPPER_ENTRY_POINT_GROUP = "apexa-library-integrator.source"
-SCRAPPER_SOURCES = {
-    e.name: e for e in metadata_entry_points().select(group=SCRAPPER_ENTRY_POINT_GROUP)
-}
+from apexa.common.snapshots import snapshot_store
+from apexa.common.util import generate_uuid, get_logger
+from apexa.common.writers import save_to_file
+from apexa.config.default import CASSETTE_DIR, RUNS_DIR
 
 LOG = get_logger(__name__)
 publisher = Publisher()
@@ -24,46 +40,278 @@ def shortlist_scrappers(scrappers: list) -> dict:
 
     :returns dictionary metadata entry points of scrappers to use
     """
-    scrappers_to_use = {k: v for k, v in SCRAPPER_SOURCES.items() if k in scrappers}
+    scrappers_to_use = {
+        k: v for k, v in scraper_plugins.sources().items() if k in scrappers
+    }
     return scrappers_to_use
 
 
-def run_scrappers(scrappers: list, test: bool, output_type: str):
+def cassette_mode(record: bool) -> str:
+    """Return the cassette mode for the --record/--replay flag.
+
+    :param record: True to record, False to replay, None for live runs
+    :returns cassette mode or None
+    """
+    if record is None:
+        return None
+    return RECORD if record else REPLAY
+
+
+def run_scrappers(
+    scrappers: list,
+    test: bool,
+    output_type: str,
+    record: bool = None,
+    cassette_dir: str = CASSETTE_DIR,
+    metrics_out: str = None,
+    metrics_format: str = "json",
+    profile: str = None,
+    profile_dir: str = ".",
+    timeout: float = None,
+    stage_timeouts: dict = None,
+    browser_address: str = None,
+    use_cache: bool = None,
+    resume: str = None,
+    runs_dir: str = RUNS_DIR,
+) -> str:
     """Run all scrappers in the list.
 
     :param scrappers: list of scrappers to be run
     :param test: test flag to save results to file
     :param output_type: type of output file
+    :param record: True to record pages, False to replay them, None for live runs
+    :param cassette_dir: directory holding recorded pages
+    :param metrics_out: file to write the run metrics to, disabled if None
+    :param metrics_format: run metrics file format, "json" or "prometheus"
+    :param profile: profile each scrapper, "cpu" or "memory"
+    :param profile_dir: directory for profile files
+    :param timeout: time budget of each scrapper in seconds, 0 for none
+    :param stage_timeouts: time budget per stage in seconds
+    :param browser_address: host:port of a running Chrome to use
+    :param use_cache: reuse scraped data cached by recent runs, None to only
+        reuse it in test runs, live runs publish freshly scraped data
+    :param resume: id of an interrupted run to finish instead of a new run
+    :param runs_dir: directory holding run manifests and outputs
+    :returns run id
     """
+    deadlines.configure(timeout, stage_timeouts)
+    if browser_address:
+        browser_pool.attach(browser_address)
+    recorder.configure(cassette_mode(record), cassette_dir)
+
+    if resume:
+        manifest = RunManifest.load(resume, runs_dir)
+        test, output_type = manifest.data["test"], manifest.data["output_type"]
+        scrappers = manifest.unfinished()
+        if not scrappers:
+            LOG.info("Run %s has nothing left to do", resume)
+            return resume
+        LOG.info("Resuming run %s with %s", resume, ", ".join(scrappers))
+    else:
+        names = scrappers or scraper_plugins.names()
+        manifest = RunManifest.create(
+            generate_uuid(), names, test, output_type, runs_dir
+        )
+    if use_cache is None:
+        use_cache = test
+    # Recording and replaying are about fetching, which the cache would skip
+    result_cache.configure(enabled=use_cache and record is None)
+    set_log_context(run_id=manifest.run_id)
+    # Always collected, every run is kept in the run history
+    metrics.configure(enabled=True, run_id=manifest.run_id)
+    # Replayed pages would make the run look faster than it is
+    run_history.configure(enabled=record is None)
+    snapshot_store.configure(enabled=record is None)
+    fingerprint_index.configure(enabled=record is None)
+
     if scrappers:
         scrappers_to_use = shortlist_scrappers(scrappers)
     else:
-        scrappers_to_use = SCRAPPER_SOURCES
+        scrappers_to_use = scraper_plugins.sources()
+
+    for scrapper in scrappers or []:
+        if scrapper not in scrappers_to_use:
+            manifest.mark(scrapper, UNAVAILABLE)
 
     for scrapper, entry_point in scrappers_to_use.items():
         scrapper_upper = scrapper.upper()
         api_class = entry_point.load() if entry_point else None
         if not api_class:
-            LOG.info(f"API not found for scrapper ({scrapper_upper})")
+            LOG.info("API not found for scrapper (%s)", scrapper_upper)
             LOG.info(
-                f"Scrapper '{scrapper.upper()}' is not available in the current \
-                intergrator version,Please update Integrator to the 'latest' version"
+                "Scrapper '%s' is not available in the current integrator version, "
+                "please update Integrator to the 'latest' version",
+                scrapper_upper,
+            )
+            manifest.mark(scrapper, UNAVAILABLE)
+            continue
+
+        try:
+            run_scrapper(
+                api_class, scrapper, test, output_type, profile, profile_dir, manifest
             )
-            return None
+        except DeadlineExceeded as err:
+            # A stuck scrapper must not hold back the others
+            LOG.error("Timed out: %s", err)
+            manifest.mark(scrapper, TIMED_OUT, error=str(err))
+            with metrics.scope(scrapper):
+                metrics.annotate("timeout", {"stage": err.stage, "budget": err.budget})
+        except Exception as err:
+            LOG.exception("Scrapper '%s' failed: %s", scrapper_upper, err)
+            manifest.mark(scrapper, FAILED, error=str(err))
+
+    if metrics_out:
+        metrics.write(metrics_out, metrics_format)
+        LOG.info("Run metrics written to %s", metrics_out)
+
+    unfinished = manifest.unfinished()
+    if unfinished:
+        LOG.warning(
+            "Run %s left %s unfinished, continue it with --resume %s",
+            manifest.run_id,
+            ", ".join(unfinished),
+            manifest.run_id,
+        )
+    return manifest.run_id
 
-        cls = api_class(generate_uuid())
 
-        LOG.info(f"Fetching data for Scapper: {scrapper_upper}")
+def run_scrapper(
+    api_class,
+    scrapper: str,
+    test: bool,
+    output_type: str,
+    profile: str = None,
+    profile_dir: str = ".",
+    manifest: RunManifest = None,
+    run_id: str = None,
+):
+    """Run a single scrapper within its time budgets.
 
+    :param api_class: scrapper class
+    :param scrapper: scrapper name
+    :param test: test flag to save results to file
+    :param output_type: type of output file
+    :param profile: profile the scrapper, "cpu" or "memory"
+    :param profile_dir: directory for profile files
+    :param manifest: run manifest to checkpoint progress in
+    :param run_id: run id to store the output under, see fetch_and_deliver
+    :returns scraped data, as dataframe in test mode or as records otherwise
+    :raises DeadlineExceeded: if the scrapper ran out of time and was cancelled
+    """
+    args = (
+        api_class,
+        scrapper,
+        test,
+        output_type,
+        profile,
+        profile_dir,
+        manifest,
+        run_id,
+    )
+    budgets = deadlines.for_scraper(api_class)
+    before = metrics.snapshot(scrapper)
+    started = time.perf_counter()
+    if not budgets:
+        eol_data = _run_scrapper(*args)
+    else:
+        # Runs in a worker thread, which is why metrics and profiling start there
+        eol_data = Deadline(scrapper, budgets).run(_run_scrapper, *args)
+
+    if metrics.enabled:
+        run_history.record_run(
+            run_id or metrics.run_id,
+            scrapper,
+            time.perf_counter() - started,
+            before,
+            metrics.snapshot(scrapper),
+        )
+    return eol_data
+
+
+def _run_scrapper(
+    api_class, scrapper, test, output_type, profile, profile_dir, manifest, run_id
+):
+    """Run a single scrapper in the current thread, see run_scrapper."""
+    with log_context(scraper=scrapper):
+        with metrics.scope(scrapper), profile_scraper(scrapper, profile, profile_dir):
+            return fetch_and_deliver(
+                api_class, scrapper, test, output_type, manifest, run_id
+            )
+
+
+def fetch_and_deliver(
+    api_class,
+    scrapper: str,
+    test: bool,
+    output_type: str,
+    manifest: RunManifest = None,
+    run_id: str = None,
+):
+    """Scrape and save or publish the data of a scrapper.
+
+    Stages an earlier attempt of the run completed are not repeated, their
+    outputs are read back from the manifest instead.
+
+    :param api_class: scrapper class
+    :param scrapper: scrapper name
+    :param test: test flag to save results to file
+    :param output_type: type of output file
+    :param manifest: run manifest to checkpoint progress in
+    :param run_id: run id to store the output under, the run id of the
+        manifest or a new one by default
+    :returns scraped data, as dataframe in test mode or as records otherwise
+    """
+    scrapper_upper = scrapper.upper()
+    if run_id is None:
+        run_id = manifest.run_id if manifest is not None else generate_uuid()
+    cls = api_class(generate_uuid())
+
+    LOG.info("Fetching data for Scapper: %s", scrapper_upper)
+
+    try:
+        eol_data = None
+        if not test and manifest is not None:
+            eol_data = manifest.load_output(scrapper, FORMATTED)
+
+        if eol_data is None:
+            scraped_data = manifest.load_output(scrapper, FETCHED) if manifest else None
+            if scraped_data is None:
+                with metrics.span("fetch") as span:
+                    scraped_data = cls.load_scraped_data()
+                    span.add(rows=len(scraped_data))
+                if manifest is not None:
+                    manifest.save_output(scrapper, FETCHED, scraped_data)
+            else:
+                LOG.info("Reusing data %s fetched earlier in the run", scrapper_upper)
+
+            eol_data = scraped_data
+            if not test:
+                eol_data = cls.build_post_batch(scraped_data)
+                with metrics.span("snapshot"):
+                    snapshot_store.record_run(scrapper, run_id, eol_data)
+                if manifest is not None:
+                    manifest.save_output(scrapper, FORMATTED, eol_data)
+
+        checkpoint("publish")
         if test:
-            # Save data to JSON/CSV file
-            eol_data = cls.fetch_scraped_data()
-            save_to_file(eol_data, scrapper, output_type)
+            # Save data to a file per output type
+            with metrics.span("save"):
+                save_to_file(eol_data, scrapper, output_type)
+            if manifest is not None:
+                manifest.mark(scrapper, SAVED)
         else:
             # Send scraped data to MDM
-            eol_data = cls.generate_post_feed()
-            publisher.publish_software_scraper_data(eol_data)
-
-        LOG.info(f"Ran {scrapper_upper} Successfully")
+            with metrics.span("publish"):
+                delivery = publisher.publish_software_scraper_data(eol_data)
+            if delivery["delivered"]:
+                # Only records MDM confirmed count as sent
+                with metrics.span("fingerprint"):
+                    fingerprint_index.record_run(scrapper, eol_data)
+            if manifest is not None:
+                state = PUBLISHED if delivery["delivered"] else UNDELIVERED
+                manifest.mark(scrapper, state, delivery=delivery)
+    finally:
+        cls.close_browser()
 
-    return None
+    LOG.info("Ran %s Successfully", scrapper_upper)
+    return eol_data
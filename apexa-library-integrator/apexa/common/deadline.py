@@ -0,0 +1,244 @@
+"""Time budgets of scraper runs, enforced by a watchdog."""
+
+import threading
+import time
+from typing import Callable, Optional
+
+from apexa.common.log import current_context, log_context
+from apexa.common.util import get_logger
+from apexa.config.default import DEADLINE_STAGES, DEFAULT_DEADLINES
+
+LOG = get_logger(__name__)
+
+TOTAL = "total"
+# How often the watchdog looks at the running scraper
+WATCHDOG_INTERVAL = 0.5
+# Time left to a cancelled scraper to unwind before it is abandoned
+CANCEL_GRACE = 5
+
+_local = threading.local()
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a scraper runs out of its time budget."""
+
+    def __init__(self, scraper: str, stage: str, budget: float):
+        self.scraper = scraper
+        self.stage = stage
+        self.budget = budget
+        self.message = (
+            f"Scrapper '{scraper}' exceeded its {stage} budget of {budget:g}s"
+        )
+        super().__init__(self.message)
+
+
+def parse_budgets(text: str) -> dict:
+    """Parse stage budgets given as ``stage=seconds`` pairs.
+
+    :param text: comma separated pairs, e.g. "navigation=60,parse=30"
+    :returns dictionary of stage to seconds
+    """
+    budgets = {}
+    for pair in filter(None, (part.strip() for part in (text or "").split(","))):
+        stage, _, seconds = pair.partition("=")
+        stage = stage.strip()
+        if stage not in DEADLINE_STAGES + [TOTAL]:
+            raise ValueError(
+                f"Unknown stage '{stage}', expected one of "
+                f"{', '.join(DEADLINE_STAGES + [TOTAL])}"
+            )
+        budgets[stage] = float(seconds)
+    return budgets
+
+
+def current_deadline() -> Optional["Deadline"]:
+    """Return the deadline of the scraper running in this thread.
+
+    :returns deadline, None outside of a watched run
+    """
+    return getattr(_local, "deadline", None)
+
+
+def checkpoint(stage: str):
+    """Enter a stage of the running scraper, stopping it if it was cancelled.
+
+    :param stage: stage name
+    """
+    deadline = current_deadline()
+    if deadline is not None:
+        deadline.enter(stage)
+
+
+class Deadline:
+    """Budgets of a single scraper run, per stage and in total."""
+
+    def __init__(self, scraper: str, budgets: dict):
+        self.scraper = scraper
+        self.budgets = budgets
+        self.started = time.monotonic()
+        self.stage = None
+        self.stage_started = self.started
+        self.expired = None
+        self._cancel_callbacks: list = []
+        self._lock = threading.Lock()
+
+    def enter(self, stage: str):
+        """Start timing a stage.
+
+        :param stage: stage name
+        :raises DeadlineExceeded: if the run was already cancelled
+        """
+        if self.expired:
+            raise DeadlineExceeded(self.scraper, *self.expired)
+        with self._lock:
+            self.stage = stage
+            self.stage_started = time.monotonic()
+
+    def check(self):
+        """Stop the running scraper once a budget ran out.
+
+        :raises DeadlineExceeded: if the run was cancelled or is overdue
+        """
+        expired = self.expired or self.overdue()
+        if expired:
+            raise DeadlineExceeded(self.scraper, *expired)
+
+    def remaining(self, stage: str = None) -> Optional[float]:
+        """Return the time left to a stage and to the whole run.
+
+        :param stage: stage name, defaults to the current stage
+        :returns seconds left, None when unbounded
+        """
+        now = time.monotonic()
+        stage = stage or self.stage
+        left = []
+        if self.budgets.get(TOTAL):
+            left.append(self.budgets[TOTAL] - (now - self.started))
+        if self.budgets.get(stage):
+            elapsed = now - self.stage_started if stage == self.stage else 0
+            left.append(self.budgets[stage] - elapsed)
+        return max(min(left), 0.0) if left else None
+
+    def overdue(self) -> Optional[tuple]:
+        """Return the budget that ran out, if any.
+
+        :returns (stage, budget) tuple or None
+        """
+        now = time.monotonic()
+        with self._lock:
+            stage, stage_started = self.stage, self.stage_started
+        if self.budgets.get(stage) and now - stage_started > self.budgets[stage]:
+            return stage, self.budgets[stage]
+        if self.budgets.get(TOTAL) and now - self.started > self.budgets[TOTAL]:
+            return TOTAL, self.budgets[TOTAL]
+        return None
+
+    def on_cancel(self, callback: Callable):
+        """Register a callback releasing resources the scraper may hang on.
+
+        :param callback: function without arguments
+        """
+        with self._lock:
+            self._cancel_callbacks.append(callback)
+
+    def discard(self, callback: Callable):
+        """Unregister a callback once its resource was released.
+
+        :param callback: registered callback
+        """
+        with self._lock:
+            if callback in self._cancel_callbacks:
+                self._cancel_callbacks.remove(callback)
+
+    def cancel(self):
+        """Run cancel callbacks, killing browsers and connections."""
+        with self._lock:
+            callbacks, self._cancel_callbacks = self._cancel_callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as err:
+                LOG.debug("Cancel callback of '%s' failed: %s", self.scraper, err)
+
+    def run(self, func: Callable, *args, **kwargs):
+        """Run func in a worker thread, cancelling it once a budget runs out.
+
+        :param func: function to run
+        :returns func result
+        :raises DeadlineExceeded: if a budget ran out
+        """
+        outcome = {}
+        # Records of the worker carry the log context of the caller
+        context = current_context()
+
+        def target():
+            _local.deadline = self
+            try:
+                with log_context(**context):
+                    outcome["result"] = func(*args, **kwargs)
+            except BaseException as err:  # pylint: disable=W0703
+                outcome["error"] = err
+            finally:
+                _local.deadline = None
+
+        worker = threading.Thread(
+            target=target, name=f"scrapper-{self.scraper}", daemon=True
+        )
+        self.started = self.stage_started = time.monotonic()
+        worker.start()
+        while worker.is_alive():
+            worker.join(WATCHDOG_INTERVAL)
+            expired = self.overdue()
+            if expired and worker.is_alive():
+                self.expired = expired
+                LOG.warning(
+                    "Cancelling '%s', %s budget of %gs ran out",
+                    self.scraper,
+                    expired[0],
+                    expired[1],
+                )
+                self.cancel()
+                worker.join(CANCEL_GRACE)
+                if worker.is_alive():
+                    LOG.warning("Abandoning unresponsive worker of '%s'", self.scraper)
+                raise DeadlineExceeded(self.scraper, *expired)
+
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("result")
+
+
+class DeadlineSettings:
+    """Budgets applied to every scraper of a run."""
+
+    def __init__(self):
+        self.overrides: dict = {}
+
+    def configure(self, total: float = None, stages: dict = None):
+        """Override the default budgets, 0 disables a budget.
+
+        :param total: budget of a whole scraper run in seconds
+        :param stages: dictionary of stage to seconds
+        """
+        self.overrides = dict(stages or {})
+        if total is not None:
+            self.overrides[TOTAL] = total
+
+    def for_scraper(self, api_class) -> dict:
+        """Return the budgets of a scraper.
+
+        Scrapers may declare their own ``timeouts`` over the defaults, budgets
+        given for the run win over both.
+
+        :param api_class: scrapper class
+        :returns dictionary of stage to seconds, without disabled budgets
+        """
+        budgets = {
+            **DEFAULT_DEADLINES,
+            **getattr(api_class, "timeouts", {}),
+            **self.overrides,
+        }
+        return {stage: seconds for stage, seconds in budgets.items() if seconds}
+
+
+deadlines = DeadlineSettings()
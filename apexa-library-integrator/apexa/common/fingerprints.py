@@ -0,0 +1,217 @@
+"""Fingerprints of every record a scraper has sent, kept across runs.
+
+A fingerprint is a 64 bit hash of a formatted record, over its
+MAIN_FIELDS and every extraDates and extraFields value. scraperName and
+scraperId are left out, they differ between runs of equal records.
+Every present field is hashed from its name and value, the field
+hashes of a record are summed. Records hash equally in every process,
+so fingerprints of earlier runs stay comparable, and a record keeps its
+fingerprint when other records of the run gain fields.
+
+Each scraper keeps two sorted uint64 arrays as .npy files, one of record
+fingerprints and one of (originalName, originalVersion) key fingerprints.
+Lookups memory-map them and search them with numpy.searchsorted for a
+whole run at once. Adding the fingerprints of a run reads each array
+into memory once, to merge the new fingerprints in and write it anew.
+"""
+
+import os
+import threading
+
+import numpy
+from pandas.util import hash_array
+
+from apexa.common.records import RECORDS, flatten_records
+from apexa.common.snapshots import DROPPED_FIELDS, KEY_FIELDS
+from apexa.common.util import get_logger
+from apexa.config.default import FINGERPRINT_DIR
+
+LOG = get_logger(__name__)
+
+RECORD_KIND = "records"
+KEY_KIND = "keys"
+EMPTY = numpy.empty(0, dtype=numpy.uint64)
+
+
+def mix(hashes: numpy.ndarray) -> numpy.ndarray:
+    """Scramble the bits of hashes, the finalizer of splitmix64.
+
+    :param hashes: uint64 array, changed in place
+    :returns the scrambled array
+    """
+    hashes ^= hashes >> numpy.uint64(30)
+    hashes *= numpy.uint64(0xBF58476D1CE4E5B9)
+    hashes ^= hashes >> numpy.uint64(27)
+    hashes *= numpy.uint64(0x94D049BB133111EB)
+    hashes ^= hashes >> numpy.uint64(31)
+    return hashes
+
+
+def fingerprint(records: RECORDS, fields: list = None) -> numpy.ndarray:
+    """Hash records to 64 bit fingerprints.
+
+    Missing and None values are left out of a fingerprint.
+
+    :param records: records of the EOL post feed, or a batch of them
+    :param fields: fields to hash, all but DROPPED_FIELDS by default
+    :returns uint64 array, one fingerprint per record
+    """
+    if not records:
+        return EMPTY
+    frame = flatten_records(records)
+    fingerprints = numpy.zeros(len(frame), dtype=numpy.uint64)
+    for column in fields or frame.columns.difference(DROPPED_FIELDS):
+        if column not in frame:
+            continue
+        values = frame[column]
+        # Before astype, which may write the strings into object columns
+        present = values.notna().to_numpy()
+        name = hash_array(numpy.array([column], dtype=object))[0]
+        hashes = mix(hash_array(values.astype(str).to_numpy()) ^ name)
+        # Sums wrap around, the order of the fields does not matter
+        fingerprints += numpy.where(present, hashes, 0)
+    return fingerprints
+
+
+def contains(fingerprints: numpy.ndarray, candidates: numpy.ndarray) -> numpy.ndarray:
+    """Test candidates for membership in sorted fingerprints.
+
+    :param fingerprints: sorted uint64 array, may be memory-mapped
+    :param candidates: uint64 array
+    :returns boolean array, True where a candidate is in fingerprints
+    """
+    if not len(fingerprints):
+        return numpy.zeros(len(candidates), dtype=bool)
+    positions = numpy.searchsorted(fingerprints, candidates)
+    found = numpy.take(fingerprints, positions, mode="clip")
+    return (positions < len(fingerprints)) & (found == candidates)
+
+
+class FingerprintIndex:
+    """Sorted fingerprints of the records every scraper has sent."""
+
+    def __init__(self, directory: str = FINGERPRINT_DIR):
+        self.directory = directory
+        self.enabled = True
+        self._lock = threading.Lock()
+
+    def configure(self, enabled: bool = True, directory: str = None):
+        """Enable or disable updating the index.
+
+        :param enabled: False to record nothing, e.g. for replayed runs
+        :param directory: index directory
+        """
+        self.enabled = enabled
+        if directory:
+            self.directory = directory
+
+    def _file(self, scraper: str, kind: str) -> str:
+        """Return the file holding fingerprints of a scraper."""
+        return os.path.join(self.directory, scraper, f"{kind}.npy")
+
+    def load(self, scraper: str, kind: str = RECORD_KIND) -> numpy.ndarray:
+        """Return the stored fingerprints of a scraper.
+
+        :param scraper: scraper name
+        :param kind: RECORD_KIND or KEY_KIND
+        :returns sorted, memory-mapped uint64 array
+        """
+        file_name = self._file(scraper, kind)
+        if not os.path.exists(file_name):
+            return EMPTY
+        return numpy.load(file_name, mmap_mode="r")
+
+    def scrapers(self) -> list[str]:
+        """Return the scrapers with stored fingerprints.
+
+        :returns scraper names
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name
+            for name in os.listdir(self.directory)
+            if os.path.exists(self._file(name, RECORD_KIND))
+        )
+
+    def seen(self, scraper: str, records: RECORDS) -> numpy.ndarray:
+        """Test which records a scraper has sent before.
+
+        :param scraper: scraper name
+        :param records: records of the EOL post feed, or a batch of them
+        :returns boolean array, True for records sent before
+        """
+        return contains(self.load(scraper), fingerprint(records))
+
+    def diff(self, scraper: str, records: RECORDS) -> dict:
+        """Compare records to everything a scraper has sent before.
+
+        :param scraper: scraper name
+        :param records: records of the EOL post feed, or a batch of them
+        :returns number of "new", "changed" and "unchanged" records, changed
+            records have a known originalName and originalVersion
+        """
+        unchanged = self.seen(scraper, records)
+        known = contains(self.load(scraper, KEY_KIND), fingerprint(records, KEY_FIELDS))
+        return {
+            "new": int((~known).sum()),
+            "changed": int((known & ~unchanged).sum()),
+            "unchanged": int(unchanged.sum()),
+        }
+
+    def add(self, scraper: str, records: RECORDS) -> int:
+        """Add the fingerprints of records to the index.
+
+        :param scraper: scraper name
+        :param records: records of the EOL post feed, or a batch of them
+        :returns number of fingerprints added
+        """
+        added = 0
+        with self._lock:
+            os.makedirs(os.path.join(self.directory, scraper), exist_ok=True)
+            for kind, fields in ((RECORD_KIND, None), (KEY_KIND, KEY_FIELDS)):
+                stored = self.load(scraper, kind)
+                merged = numpy.union1d(stored, fingerprint(records, fields))
+                if kind == RECORD_KIND:
+                    added = len(merged) - len(stored)
+                # Release the memory map before replacing its file
+                del stored
+                self._write(self._file(scraper, kind), merged)
+        return added
+
+    def record_run(self, scraper: str, records: RECORDS) -> dict:
+        """Log how a run differs from earlier runs, then add its records.
+
+        Never fails the run itself.
+
+        :param scraper: scraper name
+        :param records: records of the EOL post feed, or a batch of them
+        :returns counts of diff, None if disabled or failed
+        """
+        if not self.enabled:
+            return None
+        try:
+            counts = self.diff(scraper, records)
+            self.add(scraper, records)
+        except (OSError, ValueError) as err:
+            LOG.warning("Could not update fingerprints of '%s': %s", scraper, err)
+            return None
+        LOG.info(
+            "'%s' sent %s new, %s changed and %s unchanged records",
+            scraper,
+            counts["new"],
+            counts["changed"],
+            counts["unchanged"],
+        )
+        return counts
+
+    @staticmethod
+    def _write(file_name: str, fingerprints: numpy.ndarray):
+        """Replace a fingerprint file once the new one is complete."""
+        tmp_file = f"{file_name}.tmp"
+        with open(tmp_file, "wb") as file:
+            numpy.save(file, fingerprints.astype(numpy.uint64, copy=False))
+        os.replace(tmp_file, file_name)
+
+
+fingerprint_index = FingerprintIndex()
@@ -0,0 +1,237 @@
+"""Per host politeness and adaptive concurrency for page fetches."""
+
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlsplit
+
+from apexa.common.metrics import metrics
+from apexa.common.util import get_logger
+from apexa.config.default import (
+    FETCH_BURST,
+    FETCH_MAX_CONCURRENCY,
+    FETCH_MAX_RETRY_AFTER,
+    FETCH_RATE,
+    FETCH_TARGET_LATENCY,
+)
+
+LOG = get_logger(__name__)
+
+# Multiplicative decrease applied to the concurrency limit on congestion
+DECREASE_FACTOR = 0.5
+THROTTLED_STATUSES = {429}
+
+
+def parse_retry_after(value: Optional[str], now: float = None) -> Optional[float]:
+    """Parse a Retry-After header into seconds to wait.
+
+    :param value: header value, delay in seconds or an HTTP date
+    :param now: current timestamp
+    :returns seconds to wait, None if absent or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        now = datetime.now(timezone.utc).timestamp() if now is None else now
+        seconds = retry_at.timestamp() - now
+    return min(max(seconds, 0.0), FETCH_MAX_RETRY_AFTER)
+
+
+def is_congestion(status: Optional[int]) -> bool:
+    """Check whether a status code asks clients to back off.
+
+    :param status: HTTP status code, None when unknown
+    :returns True for 429 and 5xx responses
+    """
+    return status is not None and (status in THROTTLED_STATUSES or status >= 500)
+
+
+class HostLimiter:
+    """Token bucket and AIMD concurrency limit of a single host."""
+
+    def __init__(
+        self,
+        rate: float = FETCH_RATE,
+        burst: int = FETCH_BURST,
+        max_concurrency: int = FETCH_MAX_CONCURRENCY,
+        target_latency: float = FETCH_TARGET_LATENCY,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.tokens = float(burst)
+        self.limit = 1.0
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.refilled = time.monotonic()
+        self._condition = threading.Condition()
+
+    def _refill(self, now: float):
+        """Add the tokens earned since the last refill.
+
+        :param now: monotonic time
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled) * self.rate)
+        self.refilled = now
+
+    def _wait_time(self, now: float) -> float:
+        """Return how long to wait before a request may start, 0 if it can.
+
+        :param now: monotonic time
+        :returns seconds to wait, None to wait for a release
+        """
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.in_flight >= int(self.limit):
+            return None
+        if self.tokens < 1:
+            return (1 - self.tokens) / self.rate
+        return 0.0
+
+    def acquire(self):
+        """Block until a request to the host may start."""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._wait_time(now)
+                if wait == 0.0:
+                    break
+                self._condition.wait(wait)
+
+            self.tokens -= 1
+            self.in_flight += 1
+
+    def release(
+        self,
+        latency: float,
+        status: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ):
+        """Finish a request and adapt the concurrency limit.
+
+        :param latency: request duration in seconds
+        :param status: HTTP status code, None when unknown
+        :param retry_after: seconds the server asked to wait
+        """
+        with self._condition:
+            self.in_flight -= 1
+            if is_congestion(status) or latency > self.target_latency:
+                self.limit = max(1.0, self.limit * DECREASE_FACTOR)
+            else:
+                # Grows by about one per limit's worth of successful requests
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+
+            if retry_after:
+                self.blocked_until = max(
+                    self.blocked_until, time.monotonic() + retry_after
+                )
+            self._condition.notify_all()
+
+
+class FetchSlot:
+    """Outcome of a governed fetch, filled in by the caller."""
+
+    def __init__(self):
+        self.status = None
+        self.retry_after = None
+
+    def observe(self, status: Optional[int], headers: Optional[dict] = None):
+        """Record the response of the fetch.
+
+        :param status: HTTP status code, None when unknown
+        :param headers: response headers
+        """
+        self.status = status
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+        self.retry_after = parse_retry_after(headers.get("retry-after"))
+
+    @property
+    def should_retry(self) -> bool:
+        """Whether the server asked to back off and retry."""
+        return is_congestion(self.status)
+
+
+class FetchGovernor:
+    """Hands out per host fetch slots."""
+
+    def __init__(self):
+        self.hosts: dict = {}
+        self.settings: dict = {}
+        self._lock = threading.Lock()
+
+    def configure(self, host: str, **settings):
+        """Override limits of a host.
+
+        :param host: host name
+        :param settings: HostLimiter keyword arguments
+        """
+        with self._lock:
+            self.settings[host] = settings
+            self.hosts.pop(host, None)
+
+    def limiter(self, host: str) -> HostLimiter:
+        """Return the limiter of a host.
+
+        :param host: host name
+        :returns host limiter
+        """
+        with self._lock:
+            if host not in self.hosts:
+                self.hosts[host] = HostLimiter(**self.settings.get(host, {}))
+            return self.hosts[host]
+
+    @contextmanager
+    def slot(self, url: str):
+        """Wait for permission to fetch url, then time the fetch.
+
+        :param url: url to fetch
+        """
+        host = urlsplit(url).hostname or ""
+        limiter = self.limiter(host)
+        with metrics.span("fetch_wait"):
+            limiter.acquire()
+
+        slot = FetchSlot()
+        started = time.perf_counter()
+        try:
+            yield slot
+        finally:
+            limiter.release(
+                time.perf_counter() - started, slot.status, slot.retry_after
+            )
+            if slot.should_retry:
+                LOG.warning(
+                    "%s answered %s, concurrency limit now %.2f, retry after %.0fs",
+                    host,
+                    slot.status,
+                    limiter.limit,
+                    slot.retry_after or 0,
+                )
+
+    def status(self) -> dict:
+        """Return limiter state per host.
+
+        :returns JSON serializable limiter state
+        """
+        with self._lock:
+            return {
+                host: {"limit": limiter.limit, "in_flight": limiter.in_flight}
+                for host, limiter in self.hosts.items()
+            }
+
+
+governor = FetchGovernor()
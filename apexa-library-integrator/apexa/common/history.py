@@ -0,0 +1,303 @@
+"""Time series of per-scraper run metrics, kept across runs.
+
+Every scraper run appends one sample per metric to a local SQLite file.
+Reports compare the latest run of each series with a rolling baseline of
+the runs before it, so slow drifts caused by vendor pages or code changes
+show up instead of vanishing with the logs.
+"""
+
+import sqlite3
+import statistics
+import time
+from contextlib import closing
+from typing import Optional
+
+from apexa.common.util import get_logger
+from apexa.config.default import (
+    HISTORY_FILE,
+    HISTORY_MIN_CHANGE,
+    HISTORY_MIN_RUNS,
+    HISTORY_MIN_SECONDS,
+    HISTORY_RETENTION,
+    HISTORY_WINDOW,
+    HISTORY_Z_SCORE,
+)
+
+LOG = get_logger(__name__)
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS samples ("
+    "time REAL NOT NULL, run_id TEXT, scraper TEXT NOT NULL, "
+    "metric TEXT NOT NULL, value REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS samples_series ON samples (scraper, metric, time)",
+]
+DURATION = "duration"
+ROWS = "rows"
+PAGE_BYTES = "page_bytes"
+PUBLISH_LATENCY = "publish_latency"
+# Per stage seconds are stored as "stage.<name>"
+STAGE_PREFIX = "stage."
+# Metrics where more is not worse
+NEUTRAL_METRICS = [ROWS]
+# MAD of a normal distribution is this fraction of its standard deviation
+MAD_SCALE = 1.4826
+SPARKS = "▁▂▃▄▅▆▇█"
+
+
+def stats_delta(before: dict, after: dict) -> dict:
+    """Subtract two metrics snapshots of a scraper.
+
+    :param before: stage stats before the run
+    :param after: stage stats after the run
+    :returns stage stats of the run alone
+    """
+    delta = {}
+    for stage, stat in after.items():
+        previous = before.get(stage, {})
+        change = {
+            field: value - previous.get(field, 0)
+            for field, value in stat.items()
+            if field != "max_seconds"
+        }
+        if any(change.values()):
+            delta[stage] = change
+    return delta
+
+
+def run_values(stages: dict, seconds: float) -> Optional[dict]:
+    """Extract the metrics kept in history from a scraper run.
+
+    Runs served from the result cache or resumed past the fetch are left
+    out, their timings would drag the baseline down.
+
+    :param stages: stage stats of the run
+    :param seconds: wall time of the run
+    :returns dictionary of metric to value, None if the run is not comparable
+    """
+    if "fetch" not in stages or "result_cache_hit" in stages:
+        return None
+    values = {
+        DURATION: seconds,
+        ROWS: stages["fetch"]["rows"],
+        PAGE_BYTES: stages.get("page_source", {}).get("bytes", 0)
+        + stages.get("page_weight", {}).get("bytes", 0),
+    }
+    if "amqp_publish" in stages:
+        values[PUBLISH_LATENCY] = stages["amqp_publish"]["seconds"]
+    for stage, stat in stages.items():
+        if stat.get("calls"):
+            values[f"{STAGE_PREFIX}{stage}"] = stat["seconds"]
+    return values
+
+
+class RunHistory:
+    """SQLite store of run metrics.
+
+    Connections are opened per call, runs append from several threads.
+    """
+
+    def __init__(self, file_name: str = HISTORY_FILE):
+        self.file_name = file_name
+        self.enabled = True
+
+    def configure(self, enabled: bool = True, file_name: str = None):
+        """Enable or disable recording.
+
+        :param enabled: False to record nothing, e.g. for replayed runs
+        :param file_name: history file
+        """
+        self.enabled = enabled
+        if file_name:
+            self.file_name = file_name
+
+    def connect(self) -> sqlite3.Connection:
+        """Open the history file, creating it if needed.
+
+        :returns connection
+        """
+        connection = sqlite3.connect(self.file_name, timeout=10)
+        for statement in SCHEMA:
+            connection.execute(statement)
+        return connection
+
+    def append(self, run_id: str, scraper: str, values: dict, at: float = None):
+        """Store the metrics of a scraper run and drop expired samples.
+
+        :param run_id: run id
+        :param scraper: scraper name
+        :param values: dictionary of metric to value
+        :param at: run time as a timestamp, now by default
+        """
+        at = time.time() if at is None else at
+        rows = [
+            (at, run_id, scraper, metric, value) for metric, value in values.items()
+        ]
+        with closing(self.connect()) as connection, connection:
+            connection.executemany("INSERT INTO samples VALUES (?, ?, ?, ?, ?)", rows)
+            connection.execute(
+                "DELETE FROM samples WHERE time < ?", (at - HISTORY_RETENTION,)
+            )
+
+    def record_run(
+        self, run_id: str, scraper: str, seconds: float, before: dict, after: dict
+    ):
+        """Append a finished scraper run, never failing the run itself.
+
+        :param run_id: run id
+        :param scraper: scraper name
+        :param seconds: wall time of the run
+        :param before: metrics snapshot of the scraper before the run
+        :param after: metrics snapshot of the scraper after the run
+        """
+        if not self.enabled:
+            return
+        values = run_values(stats_delta(before, after), seconds)
+        if values is None:
+            return
+        try:
+            self.append(run_id, scraper, values)
+        except sqlite3.Error as err:
+            LOG.warning("Could not record run metrics of '%s': %s", scraper, err)
+
+    def series(self, scraper: str = None, limit: int = None) -> dict:
+        """Return stored samples, oldest first.
+
+        :param scraper: only this scraper, all by default
+        :param limit: keep the newest samples of each series only
+        :returns dictionary of (scraper, metric) to list of (time, value)
+        """
+        query = "SELECT scraper, metric, time, value FROM samples"
+        params: tuple = ()
+        if scraper:
+            query += " WHERE scraper = ?"
+            params = (scraper,)
+        query += " ORDER BY scraper, metric, time"
+
+        series: dict = {}
+        with closing(self.connect()) as connection:
+            for name, metric, at, value in connection.execute(query, params):
+                series.setdefault((name, metric), []).append((at, value))
+        if limit:
+            series = {key: samples[-limit:] for key, samples in series.items()}
+        return series
+
+
+def sparkline(values: list) -> str:
+    """Draw values as a line of block characters.
+
+    :param values: numbers
+    :returns sparkline
+    """
+    low, high = min(values), max(values)
+    span = (high - low) or 1
+    return "".join(
+        SPARKS[int((value - low) / span * (len(SPARKS) - 1))] for value in values
+    )
+
+
+def assess(
+    metric: str,
+    values: list,
+    window: int = HISTORY_WINDOW,
+    z_score: float = HISTORY_Z_SCORE,
+    min_change: float = HISTORY_MIN_CHANGE,
+) -> dict:
+    """Compare the latest value of a series with the runs before it.
+
+    The baseline is the median of up to window earlier runs, spread is
+    their median absolute deviation, which a few outliers cannot inflate.
+    The latest run is a regression when it sits more than z_score
+    deviations above the baseline and also exceeds it by min_change, and
+    for timings by at least HISTORY_MIN_SECONDS.
+
+    :param metric: metric name
+    :param values: series values, oldest first
+    :param window: number of earlier runs in the baseline
+    :param z_score: deviations above the baseline that count as significant
+    :param min_change: smallest relative increase that counts
+    :returns latest value, baseline, change, score and regression flag
+    """
+    latest, earlier = values[-1], values[:-1][-window:]
+    result = {
+        "latest": latest,
+        "baseline": None,
+        "change": None,
+        "score": None,
+        "regression": False,
+    }
+    if len(earlier) < HISTORY_MIN_RUNS:
+        return result
+
+    baseline = statistics.median(earlier)
+    deviation = MAD_SCALE * statistics.median(
+        abs(value - baseline) for value in earlier
+    )
+    # A flat baseline would make any change infinitely significant
+    deviation = max(deviation, abs(baseline) * 0.01, 1e-9)
+    result["baseline"] = baseline
+    result["change"] = (latest - baseline) / baseline if baseline else None
+    result["score"] = (latest - baseline) / deviation
+    timed = metric in (DURATION, PUBLISH_LATENCY) or metric.startswith(STAGE_PREFIX)
+    result["regression"] = (
+        metric not in NEUTRAL_METRICS
+        and result["score"] > z_score
+        and latest > baseline * (1 + min_change)
+        and (not timed or latest - baseline > HISTORY_MIN_SECONDS)
+    )
+    return result
+
+
+def report(
+    history: RunHistory,
+    scraper: str = None,
+    window: int = HISTORY_WINDOW,
+    z_score: float = HISTORY_Z_SCORE,
+) -> list[dict]:
+    """Assess every stored series.
+
+    :param history: run history
+    :param scraper: only this scraper, all by default
+    :param window: number of earlier runs in the baseline
+    :param z_score: deviations above the baseline that count as significant
+    :returns one entry per series, regressions first
+    """
+    entries = []
+    for (name, metric), samples in history.series(scraper, window + 1).items():
+        values = [value for _, value in samples]
+        entries.append(
+            {
+                "scraper": name,
+                "metric": metric,
+                "runs": len(values),
+                "last_run": samples[-1][0],
+                "trend": sparkline(values),
+                **assess(metric, values, window, z_score),
+            }
+        )
+    entries.sort(key=lambda entry: not entry["regression"])
+    return entries
+
+
+def format_report(entries: list[dict]) -> list[str]:
+    """Render a history report as a table.
+
+    :param entries: report entries
+    :returns table lines
+    """
+    lines = [
+        f"{'scraper':<14} {'metric':<22} {'runs':>4} {'latest':>12} "
+        f"{'baseline':>12} {'change':>8}  trend"
+    ]
+    for entry in entries:
+        baseline = "-" if entry["baseline"] is None else f"{entry['baseline']:.4g}"
+        change = "-" if entry["change"] is None else f"{entry['change']:+.0%}"
+        flag = "  REGRESSION" if entry["regression"] else ""
+        lines.append(
+            f"{entry['scraper']:<14} {entry['metric']:<22} {entry['runs']:>4} "
+            f"{entry['latest']:>12.4g} {baseline:>12} {change:>8}  "
+            f"{entry['trend']}{flag}"
+        )
+    return lines
+
+
+run_history = RunHistory()
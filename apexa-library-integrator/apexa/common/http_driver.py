@@ -0,0 +1,73 @@
+"""Plain HTTP driver for scrapers that do not need a browser."""
+
+from html import escape
+
+import requests
+
+from apexa.config.default import HTTP_TIMEOUT, HTTP_USER_AGENT
+
+# Chrome wraps non HTML documents like this when exposing their page source
+TEXT_PAGE_SOURCE = (
+    "<html><head></head><body>"
+    '<pre style="word-wrap: break-word; white-space: pre-wrap;">{}</pre>'
+    "</body></html>"
+)
+
+
+def as_page_source(response: requests.Response) -> str:
+    """Return the page source Chrome would expose for a response.
+
+    :param response: HTTP response
+    :returns page source
+    """
+    content_type = response.headers.get("Content-Type", "")
+    if "html" in content_type or "xml" in content_type:
+        return response.text
+    return TEXT_PAGE_SOURCE.format(escape(response.text, quote=False))
+
+
+class HTTPDriver:
+    """Minimal WebDriver look-alike fetching pages with requests."""
+
+    renders_javascript = False
+
+    def __init__(self, timeout: int = HTTP_TIMEOUT):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = HTTP_USER_AGENT
+        self.current_url = None
+        self.page_source = ""
+        self.status_code = None
+        self.headers = {}
+        self.window_handles = ["http"]
+        self.current_window_handle = "http"
+
+    def get(self, url: str):
+        """Fetch url.
+
+        :param url: url to fetch
+        """
+        response = self.session.get(url, timeout=self.timeout)
+        self.current_url = response.url
+        self.status_code = response.status_code
+        self.headers = dict(response.headers)
+        self.page_source = as_page_source(response)
+
+    def execute_script(self, *args):  # pylint: disable=W0613
+        """Scripts cannot run without a browser."""
+        return None
+
+    def close(self):
+        """Nothing to close."""
+
+    def quit(self):
+        """Close the HTTP session."""
+        self.session.close()
+
+
+def init_http_driver() -> HTTPDriver:
+    """Create a new HTTP driver for scrapping.
+
+    :return driver: HTTP driver
+    """
+    return HTTPDriver()
@@ -0,0 +1,194 @@
+"""Queue backed logging with structured context.
+
+Loggers only put records on an in-memory queue, a listener thread does
+the formatting and the I/O. A slow terminal or disk therefore never holds
+up a scraper or a publish callback. Records carry the run id, scraper and
+request id they were logged under. They go to stderr as text and to a
+rotating file as JSON lines.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_FILE_INTEGRATIR = os.environ.get(
+    "APEXA_INTEGRATOR_LOG_FILE", "/var/log/apexa_integrator.log"
+)
+# Used when the log file above cannot be written, e.g. without root.
+# Mirrors BASE_CONFIG_DIR, apexa.config cannot be imported from here.
+FALLBACK_LOG_FILE = os.path.join(
+    os.environ.get("APEXADIR", os.path.join(os.path.expanduser("~"), ".apexa")),
+    "apexa_integrator.log",
+)
+LOG_FORMAT = "%(asctime)s %(levelname)-8s [%(name)s] %(message)s"
+LOG_MAX_BYTES = 10 * 1024 * 1024  # 10 MiB
+LOG_BACKUPS = 5
+# Context fields attached to every record, None when unknown
+CONTEXT_FIELDS = ["run_id", "scraper", "request_id"]
+
+_global_context: dict = {}
+_local = threading.local()
+_lock = threading.Lock()
+_listener = None
+_handler = None
+
+
+def set_log_context(**fields):
+    """Set context fields for records of every thread, e.g. the run id.
+
+    :param fields: context fields, None removes a field
+    """
+    for name, value in fields.items():
+        if value is None:
+            _global_context.pop(name, None)
+        else:
+            _global_context[name] = value
+
+
+@contextmanager
+def log_context(**fields):
+    """Attach context fields to records the current thread logs.
+
+    :param fields: context fields
+    """
+    previous = getattr(_local, "fields", {})
+    _local.fields = {**previous, **fields}
+    try:
+        yield
+    finally:
+        _local.fields = previous
+
+
+def current_context() -> dict:
+    """Return the context fields of the current thread.
+
+    :returns dictionary of field to value
+    """
+    return {**_global_context, **getattr(_local, "fields", {})}
+
+
+class ContextQueueHandler(QueueHandler):
+    """Queue handler capturing context and message in the logging thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Freeze a record before it crosses to the listener thread.
+
+        :param record: log record
+        :returns record with merged message and context fields
+        """
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        context = current_context()
+        for field in CONTEXT_FIELDS:
+            if not hasattr(record, field):
+                setattr(record, field, context.get(field))
+        return record
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats records as single line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format a record.
+
+        :param record: log record
+        :returns JSON line
+        """
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def file_handler(*file_names: str) -> logging.Handler:
+    """Open the first writable rotating JSON log file.
+
+    :param file_names: log file paths, in order of preference
+    :returns handler, None if no file can be written
+    """
+    for file_name in file_names:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(file_name)), exist_ok=True)
+            handler = RotatingFileHandler(
+                file_name, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS
+            )
+        except OSError:
+            continue
+        handler.setFormatter(JSONFormatter())
+        return handler
+    return None
+
+
+def setup_logging(file_name: str = LOG_FILE_INTEGRATIR, level: int = logging.INFO):
+    """Route the root logger through a queue, once per process.
+
+    :param file_name: JSON log file, FALLBACK_LOG_FILE if it cannot be written
+    :param level: root logger level
+    """
+    global _listener, _handler  # pylint: disable=W0603
+    with _lock:
+        if _listener is not None:
+            return
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers = [console]
+        json_file = file_handler(file_name, FALLBACK_LOG_FILE) if file_name else None
+        if json_file is not None:
+            handlers.append(json_file)
+
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        _handler = ContextQueueHandler(records)
+        root = logging.getLogger()
+        root.addHandler(_handler)
+        root.setLevel(level)
+        _listener = QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+
+    if json_file is None and file_name:
+        logging.getLogger(__name__).warning(
+            "Cannot write log file %s, logging to stderr only", file_name
+        )
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener, _handler  # pylint: disable=W0603
+    with _lock:
+        listener, _listener = _listener, None
+        handler, _handler = _handler, None
+    if handler is not None:
+        logging.getLogger().removeHandler(handler)
+    if listener is not None:
+        listener.stop()
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return a logger with the given name.
+
+    Records are only handled once an entry point called setup_logging.
+
+    :param name: the name of the logger
+    """
+    return logging.getLogger(name)
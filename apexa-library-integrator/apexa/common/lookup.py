@@ -0,0 +1,383 @@
+"""Indexed end-of-life lookups over scraped EOL data.
+
+The index keeps one entry per (product, version) of the formatted
+records, as sorted arrays: a code per normalized product name, the
+parsed version parts and the EOL dates. A single lookup binary searches
+the name and scans the few versions of that product. Batch lookups join
+whole inventories against the entries, most specific version first.
+
+A version family like "10.0.x" covers every version starting with 10.0,
+an exact version like "12.3.1" only itself. Exact entries win over
+families, longer families over shorter ones. Searches for a family only
+return entries at least as specific as the family: "10.0.x" finds
+"10.0.x" and "10.0.3", not the broader "10.x".
+"""
+
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Union
+from urllib.parse import parse_qs, urlparse
+
+import numpy
+from pandas import DataFrame, Series, Timestamp, concat, factorize, to_datetime
+
+from apexa.common._typings import DATAFRAME, SERIES
+from apexa.common.snapshots import SnapshotStore
+from apexa.common.util import get_logger, json_dumps
+from apexa.common.versions import PART_COLUMNS, parse_version, parse_versions
+
+LOG = get_logger(__name__)
+
+# Length of exact versions, which match all their parts
+EXACT = -1
+RESULT_FIELDS = [
+    "originalName",
+    "originalVersion",
+    "originalEOLDate",
+    "originalExtendedEOLDate",
+    "scraperName",
+]
+RANGE_SEPARATOR = ".."
+
+
+def normalize_name(name: str) -> str:
+    """Return the lookup key of a product name.
+
+    :param name: product name
+    :returns case folded name with single spaces
+    """
+    return " ".join(str(name).casefold().split())
+
+
+def normalize_names(names: SERIES) -> SERIES:
+    """Return the lookup keys of product names, see normalize_name.
+
+    :param names: product names
+    :returns lookup keys
+    """
+    return (
+        names.astype(str)
+        .str.casefold()
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+    )
+
+
+def compare_versions(parts: numpy.ndarray, bound: tuple) -> numpy.ndarray:
+    """Compare parsed versions with a version, part by part.
+
+    :param parts: array of version parts, one row per version
+    :param bound: version parts, as many as parts has columns
+    :returns -1, 0 or 1 per row, like the row is lower, equal or higher
+    """
+    signs = numpy.sign(parts - numpy.array(bound, dtype=numpy.int64))
+    # The first differing part decides, rows without one are equal
+    first = (signs != 0).argmax(axis=1)
+    return signs[numpy.arange(len(parts)), first]
+
+
+def as_day(when: Union[str, date, None]) -> numpy.datetime64:
+    """Return the day EOL dates are compared with.
+
+    :param when: date or ISO date string, today by default
+    :returns day
+    """
+    return numpy.datetime64(Timestamp(when or date.today()).date(), "D")
+
+
+class LookupIndex:
+    """Sorted arrays of product names, versions and EOL dates."""
+
+    def __init__(self, frame: DATAFRAME):
+        """Build the index.
+
+        :param frame: formatted records, with scraperName when known
+        """
+        frame = frame.reset_index(drop=True)
+        for field in RESULT_FIELDS:
+            if field not in frame:
+                frame[field] = None
+        records = frame[RESULT_FIELDS].astype(object)
+        self.records = records.where(records.notna(), None)
+
+        keys = normalize_names(frame["originalName"])
+        self.names = numpy.array(sorted(set(keys)), dtype=str)
+        versions = parse_versions(frame["originalVersion"])
+        entries = versions[PART_COLUMNS].assign(
+            code=numpy.searchsorted(self.names, keys.to_numpy(dtype=str)),
+            length=versions["length"].where(versions["wildcard"], EXACT),
+            eol=to_datetime(frame["originalEOLDate"], errors="coerce"),
+            position=numpy.arange(len(frame)),
+        )
+        # One entry per product version, the first scraped one
+        entries = entries.drop_duplicates(["code", "length"] + PART_COLUMNS)
+        self.entries = entries.sort_values(
+            ["code"] + PART_COLUMNS + ["length"], kind="stable"
+        ).reset_index(drop=True)
+
+        self._codes = self.entries["code"].to_numpy()
+        self._parts = self.entries[PART_COLUMNS].to_numpy()
+        self._lengths = self.entries["length"].to_numpy()
+        # Exact versions fix every part
+        self._fixed = numpy.where(
+            self._lengths == EXACT, len(PART_COLUMNS), self._lengths
+        )
+        self._eol = self.entries["eol"].to_numpy().astype("datetime64[D]")
+        self._positions = self.entries["position"].to_numpy()
+
+    @classmethod
+    def from_records(cls, records: list[dict]) -> "LookupIndex":
+        """Build an index from EOL post feed records.
+
+        :param records: formatted records
+        :returns lookup index
+        """
+        return cls(DataFrame(records, columns=None if records else RESULT_FIELDS))
+
+    @classmethod
+    def from_snapshots(cls, store: SnapshotStore) -> "LookupIndex":
+        """Build an index from the latest snapshot of every scraper.
+
+        :param store: snapshot store
+        :returns lookup index
+        """
+        frames = []
+        for scraper in store.scrapers():
+            frame = store.latest(scraper)
+            if frame is not None:
+                frames.append(frame.assign(scraperName=scraper.upper()))
+        if not frames:
+            return cls(DataFrame(columns=RESULT_FIELDS))
+        return cls(concat(frames, ignore_index=True))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _block(self, name: str) -> tuple:
+        """Return the entry range of a product.
+
+        :param name: product name
+        :returns start and end of its entries, equal when unknown
+        """
+        key = normalize_name(name)
+        code = numpy.searchsorted(self.names, key)
+        if code == len(self.names) or self.names[code] != key:
+            return 0, 0
+        start, end = numpy.searchsorted(self._codes, [code, code + 1])
+        return start, end
+
+    def _result(self, entry: int, day: numpy.datetime64) -> dict:
+        """Return the record of an entry with its EOL state on a day."""
+        result = self.records.iloc[self._positions[entry]].to_dict()
+        eol = self._eol[entry]
+        result["eol"] = None if numpy.isnat(eol) else bool(eol <= day)
+        return result
+
+    def lookup(self, name: str, version: str, on=None) -> Optional[dict]:
+        """Find the entry covering a product version.
+
+        :param name: product name
+        :param version: installed version, e.g. "10.0.5"
+        :param on: day to check the EOL date against, today by default
+        :returns record with "eol" True, False or None without EOL date,
+            None if no entry covers the version
+        """
+        start, end = self._block(name)
+        if start == end:
+            return None
+        parts, _, _ = parse_version(version)
+        equal = self._parts[start:end] == numpy.array(parts)
+        fixed = self._fixed[start:end]
+        exact = (self._lengths[start:end] == EXACT) & equal.all(axis=1)
+        if exact.any():
+            return self._result(start + exact.argmax(), as_day(on))
+
+        covered = (equal | (numpy.arange(len(parts)) >= fixed[:, None])).all(axis=1)
+        covered &= self._lengths[start:end] != EXACT
+        if not covered.any():
+            return None
+        candidates = numpy.flatnonzero(covered)
+        return self._result(start + candidates[fixed[candidates].argmax()], as_day(on))
+
+    def is_eol(self, name: str, version: str, on=None) -> Optional[bool]:
+        """Tell whether a product version is past its end of life.
+
+        :param name: product name
+        :param version: installed version
+        :param on: day to check, today by default
+        :returns True or False, None if unknown
+        """
+        result = self.lookup(name, version, on)
+        return None if result is None else result["eol"]
+
+    def search(self, name: str, versions: str = None, on=None) -> list[dict]:
+        """Find every entry of a product within a version pattern.
+
+        :param name: product name
+        :param versions: None for all, a family like "10.x" or an exact
+            version, which match entries at least as specific, or an
+            inclusive range like "9..11.x", whose bounds may be families
+        :param on: day to check EOL dates against, today by default
+        :returns records, lowest version first
+        """
+        start, end = self._block(name)
+        parts = self._parts[start:end]
+        if versions is None or start == end:
+            matches = numpy.ones(end - start, dtype=bool)
+        elif RANGE_SEPARATOR in versions:
+            low, _, high = versions.partition(RANGE_SEPARATOR)
+            low_parts, _, _ = parse_version(low)
+            high_parts, high_length, high_family = parse_version(high)
+            if high_family:
+                # Everything starting with the high bound is in range
+                highest = numpy.iinfo(numpy.int64).max
+                high_parts = high_parts[:high_length] + (highest,) * (
+                    len(high_parts) - high_length
+                )
+            matches = (compare_versions(parts, low_parts) >= 0) & (
+                compare_versions(parts, high_parts) <= 0
+            )
+        else:
+            query, length, family = parse_version(versions)
+            length = length if family else len(query)
+            # Entries fixing at least the parts the pattern fixes, equal in those
+            matches = (self._fixed[start:end] >= length) & (
+                parts[:, :length] == numpy.array(query[:length])
+            ).all(axis=1)
+        day = as_day(on)
+        return [
+            self._result(start + entry, day) for entry in numpy.flatnonzero(matches)
+        ]
+
+    def lookup_frame(self, names: SERIES, versions: SERIES, on=None) -> DATAFRAME:
+        """Look up a whole inventory at once.
+
+        :param names: product names
+        :param versions: installed versions
+        :param on: day to check EOL dates against, today by default
+        :returns dataframe aligned with the inventory, with RESULT_FIELDS
+            and "eol", empty fields where nothing matched
+        """
+        # Inventories repeat products, distinct names and versions are
+        # normalized and parsed once, distinct pairs matched once
+        name_rows, unique_names = factorize(Series(names, dtype=object).fillna(""))
+        version_rows, unique_versions = factorize(
+            Series(versions, dtype=object).fillna("")
+        )
+        keys = normalize_names(Series(unique_names, dtype=object)).to_numpy(dtype=str)
+        codes = numpy.searchsorted(self.names, keys)
+        known = codes < len(self.names)
+        known[known] = self.names[codes[known]] == keys[known]
+        codes = numpy.where(known, codes, -1)
+        parts = parse_versions(Series(unique_versions, dtype=object))
+        parts = parts[PART_COLUMNS].to_numpy()
+
+        width = max(len(unique_versions), 1)
+        pair_rows, pairs = factorize(
+            name_rows.astype(numpy.int64) * width + version_rows
+        )
+        pair_names, pair_versions = numpy.divmod(pairs, width)
+        inventory = DataFrame(parts[pair_versions], columns=PART_COLUMNS)
+        inventory["code"] = codes[pair_names]
+        found = self._match(inventory)[pair_rows]
+
+        matched = found >= 0
+        result = self.records.iloc[self._positions[found[matched]]]
+        result = result.set_index(numpy.flatnonzero(matched)).reindex(range(len(found)))
+        dates = self._eol[found[matched]]
+        dated = ~numpy.isnat(dates)
+        eol = numpy.full(len(found), None, dtype=object)
+        eol[numpy.flatnonzero(matched)[dated]] = dates[dated] <= as_day(on)
+        result["eol"] = eol
+        return result
+
+    def _match(self, inventory: DATAFRAME) -> numpy.ndarray:
+        """Find the entry covering each row of an inventory.
+
+        :param inventory: PART_COLUMNS and the name "code", -1 if unknown
+        :returns entry number per row, -1 where none covers the row
+        """
+        entries = self.entries.assign(entry=numpy.arange(len(self.entries)))
+        found = numpy.full(len(inventory), -1)
+        # Exact versions first, then families from the most specific
+        for length in [EXACT] + list(range(len(PART_COLUMNS), -1, -1)):
+            candidates = entries[entries["length"] == length]
+            pending = (found < 0) & (inventory["code"].to_numpy() >= 0)
+            if candidates.empty or not pending.any():
+                continue
+            on_columns = ["code"] + (
+                PART_COLUMNS if length == EXACT else PART_COLUMNS[:length]
+            )
+            joined = inventory.loc[pending, on_columns].join(
+                candidates.drop_duplicates(on_columns).set_index(on_columns)["entry"],
+                on=on_columns,
+            )
+            found[pending] = joined["entry"].fillna(-1).to_numpy(dtype=int)
+        return found
+
+
+class LookupHandler(BaseHTTPRequestHandler):
+    """Read-only lookup endpoint.
+
+    GET /lookup?name=<product>&version=<version>[&on=<date>] and
+    GET /search?name=<product>[&versions=<pattern>][&on=<date>].
+    """
+
+    def do_GET(self):  # pylint: disable=C0103
+        """Answer lookups."""
+        index = self.server.lookup_index
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if "name" not in params or url.path not in ("/lookup", "/search"):
+            self.respond(404, json_dumps({"error": "not found"}))
+            return
+        try:
+            if url.path == "/lookup":
+                result = index.lookup(
+                    params["name"], params.get("version", ""), params.get("on")
+                )
+                code = 200 if result is not None else 404
+            else:
+                result = index.search(
+                    params["name"], params.get("versions"), params.get("on")
+                )
+                code = 200
+        except ValueError as err:
+            self.respond(400, json_dumps({"error": str(err)}))
+            return
+        self.respond(code, json_dumps(result))
+
+    def respond(self, code: int, body: str):
+        """Send a JSON response.
+
+        :param code: HTTP status code
+        :param body: response body
+        """
+        payload = body.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):  # pylint: disable=W0622
+        """Log requests at debug level instead of stderr."""
+        LOG.debug(format, *args)
+
+
+def serve_lookups(index: LookupIndex, host: str, port: int) -> ThreadingHTTPServer:
+    """Answer lookups over HTTP in a background thread.
+
+    :param index: lookup index
+    :param host: address to listen on
+    :param port: port to listen on
+    :returns server, stop it with shutdown()
+    """
+    server = ThreadingHTTPServer((host, port), LookupHandler)
+    server.lookup_index = index
+    threading.Thread(
+        target=server.serve_forever, name="lookup-http", daemon=True
+    ).start()
+    LOG.info("Lookups served on http://%s:%s", host, server.server_port)
+    return server
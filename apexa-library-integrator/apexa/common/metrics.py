@@ -0,0 +1,277 @@
+"""Per-stage timing and counters of a scraper run."""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+PROMETHEUS_METRICS = [
+    ("calls", "apexa_stage_calls_total", "Number of times a stage ran"),
+    ("seconds", "apexa_stage_seconds_total", "Time spent in a stage"),
+    ("max_seconds", "apexa_stage_max_seconds", "Slowest single run of a stage"),
+    ("rows", "apexa_stage_rows_total", "Rows handled by a stage"),
+    ("bytes", "apexa_stage_bytes_total", "Bytes handled by a stage"),
+]
+RUN_SCOPE = "run"
+
+
+class NullSpan:
+    """Span used while metrics are disabled, does nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def add(self, rows: int = 0, nbytes: int = 0):
+        """Ignore counters."""
+
+
+NULL_SPAN = NullSpan()
+
+
+def label_value(value) -> str:
+    """Escape a Prometheus label value.
+
+    :param value: label value
+    :returns value with backslashes, double quotes and newlines escaped
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Span:
+    """Times a stage and collects its counters."""
+
+    def __init__(self, metrics: "Metrics", stage: str):
+        self.metrics = metrics
+        self.stage = stage
+        self.rows = 0
+        self.nbytes = 0
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.started
+        self.metrics.record(self.stage, elapsed, self.rows, self.nbytes)
+        return False
+
+    def add(self, rows: int = 0, nbytes: int = 0):
+        """Add rows and bytes handled by the stage.
+
+        :param rows: number of rows
+        :param nbytes: number of bytes
+        """
+        self.rows += rows
+        self.nbytes += nbytes
+
+
+class Metrics:
+    """Aggregates stage timings per scraper."""
+
+    def __init__(self):
+        self.enabled = False
+        self.run_id = None
+        self.started = time.time()
+        self.stats: dict = {}
+        self.annotations: dict = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def configure(self, enabled: bool, run_id: str = None):
+        """Enable or disable collection and reset collected data.
+
+        :param enabled: whether to collect metrics
+        :param run_id: id of the run being measured
+        """
+        self.enabled = enabled
+        self.run_id = run_id
+        self.started = time.time()
+        self.stats = {}
+        self.annotations = {}
+
+    @property
+    def current_scope(self) -> str:
+        """Scraper the current thread is working for."""
+        return getattr(self._local, "scope", RUN_SCOPE)
+
+    @contextmanager
+    def scope(self, scraper: str):
+        """Attribute stages of the current thread to a scraper.
+
+        :param scraper: scraper name
+        """
+        previous = self.current_scope
+        self._local.scope = scraper
+        try:
+            yield
+        finally:
+            self._local.scope = previous
+
+    def span(self, stage: str):
+        """Return a context manager timing a stage.
+
+        :param stage: stage name
+        :returns span
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, stage)
+
+    def timed(self, stage: str):
+        """Decorate a function to time it as a stage.
+
+        :param stage: stage name
+        """
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with Span(self, stage):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def count(self, stage: str, rows: int = 0, nbytes: int = 0):
+        """Add counters to a stage without timing it.
+
+        :param stage: stage name
+        :param rows: number of rows
+        :param nbytes: number of bytes
+        """
+        if self.enabled:
+            self.record(stage, 0.0, rows, nbytes, calls=0)
+
+    def observe(self, stage: str, seconds: float):
+        """Add a stage run timed by the caller.
+
+        :param stage: stage name
+        :param seconds: time spent
+        """
+        if self.enabled:
+            self.record(stage, seconds)
+
+    def record(
+        self,
+        stage: str,
+        seconds: float,
+        rows: int = 0,
+        nbytes: int = 0,
+        calls: int = 1,
+    ):
+        """Record a finished stage.
+
+        :param stage: stage name
+        :param seconds: time spent
+        :param rows: number of rows
+        :param nbytes: number of bytes
+        :param calls: number of stage runs
+        """
+        key = (self.current_scope, stage)
+        with self._lock:
+            stat = self.stats.setdefault(
+                key,
+                {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "rows": 0, "bytes": 0},
+            )
+            stat["calls"] += calls
+            stat["seconds"] += seconds
+            stat["max_seconds"] = max(stat["max_seconds"], seconds)
+            stat["rows"] += rows
+            stat["bytes"] += nbytes
+
+    def snapshot(self, scraper: str) -> dict:
+        """Copy the stage stats collected so far for a scraper.
+
+        :param scraper: scraper name
+        :returns dictionary of stage to stats
+        """
+        with self._lock:
+            return {
+                stage: dict(stat)
+                for (scope, stage), stat in self.stats.items()
+                if scope == scraper
+            }
+
+    def annotate(self, key: str, value):
+        """Attach a value to the current scraper in the report.
+
+        :param key: annotation name
+        :param value: JSON serializable value
+        """
+        if self.enabled:
+            with self._lock:
+                self.annotations.setdefault(self.current_scope, {})[key] = value
+
+    def report(self) -> dict:
+        """Summarize collected metrics.
+
+        :returns run summary grouped by scraper and stage
+        """
+        scrapers: dict = {}
+        with self._lock:
+            for (scraper, stage), stat in sorted(self.stats.items()):
+                scrapers.setdefault(scraper, {"stages": {}})["stages"][stage] = dict(
+                    stat
+                )
+            for scraper, annotations in self.annotations.items():
+                scrapers.setdefault(scraper, {"stages": {}}).update(annotations)
+
+        return {
+            "run_id": self.run_id,
+            "started": datetime.utcfromtimestamp(self.started).isoformat(),
+            "duration_seconds": time.time() - self.started,
+            "scrapers": scrapers,
+        }
+
+    def to_prometheus(self) -> str:
+        """Render collected metrics in Prometheus text exposition format.
+
+        :returns textfile collector content
+        """
+        report = self.report()
+        lines = [
+            "# HELP apexa_run_duration_seconds Duration of the scraper run",
+            "# TYPE apexa_run_duration_seconds gauge",
+            f"apexa_run_duration_seconds {report['duration_seconds']:.6f}",
+        ]
+        for field, name, help_text in PROMETHEUS_METRICS:
+            kind = "gauge" if field == "max_seconds" else "counter"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for scraper, data in report["scrapers"].items():
+                for stage, stat in data["stages"].items():
+                    labels = (
+                        f'scraper="{label_value(scraper)}",'
+                        f'stage="{label_value(stage)}"'
+                    )
+                    lines.append(f"{name}{{{labels}}} {stat[field]}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, file_name: str, file_type: str = "json"):
+        """Write the run summary to a file.
+
+        :param file_name: output file path
+        :param file_type: "json" or "prometheus"
+        """
+        if file_type.lower() == "prometheus":
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.report(), indent=2)
+
+        tmp_file = f"{file_name}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as outfile:
+            outfile.write(content)
+        # Textfile collectors must never see a partially written file
+        os.replace(tmp_file, file_name)
+
+
+metrics = Metrics()
@@ -2,16 +2,33 @@
 
 from abc import ABC, ABCMeta
 
+from requests.exceptions import Timeout
+from selenium.common.exceptions import TimeoutException
+
 from apexa.common._typings import DATAFRAME
+from apexa.common.browser import (
+    LEAN_PROFILE,
+    browser_pool,
+    kill_driver,
+    page_weight,
+    unwrap_driver,
+)
+from apexa.common.cassette import recorder
+from apexa.common.deadline import DeadlineExceeded, checkpoint, current_deadline
+from apexa.common.governor import governor
+from apexa.common.http_driver import init_http_driver
+from apexa.common.metrics import metrics
+from apexa.common.records import RecordBatch
+from apexa.common.result_cache import result_cache
+from apexa.common.schema import compact_frame
 from apexa.common.util import (
     GOOGLE_CACHE_VERSION_URL,
     MAIN_FIELDS,
     delete_downloaded_file,
-    init_chrome_web_driver,
     pandas_concat,
-    pandas_df_to_json,
     sleep_seconds,
 )
+from apexa.config.default import FETCH_MAX_RETRIES
 
 
 class Scraper(metaclass=ABCMeta):
@@ -25,19 +42,66 @@ class Scraper(metaclass=ABCMeta):
     scraping_restricted = False
     mapping = {}
     extra_date_fields = []
+    # "browser" renders pages in Chrome, "http" fetches them with requests
+    fetch_backend = "browser"
+    # Chrome settings and blocked requests, FULL_PROFILE for stock Chrome
+    browser_profile = LEAN_PROFILE
+    # Time budgets in seconds overriding the defaults, e.g. {"navigation": 60}
+    timeouts = {}
+    _driver = None
+    kill_browser = None
 
     def __init__(self):
-        self.driver = init_chrome_web_driver()
+        # Started on first use, cached runs never need a browser
+        self._driver = None
+
+    @property
+    def driver(self):
+        """Driver used to fetch pages, created on first use."""
+        if self._driver is None:
+            self._driver = self.create_driver()
+        return self._driver
+
+    @driver.setter
+    def driver(self, driver):
+        self._driver = driver
 
     def __del__(self):
         """Destructor to close browser and clean files."""
         self.close_browser()
 
+    def create_driver(self):
+        """Create the driver used to fetch pages.
+
+        :returns Chrome, HTTP or replay driver
+        """
+        if recorder.replaying:
+            return recorder.replay_driver(self.name)
+
+        with metrics.span("driver_start"):
+            if self.fetch_backend == "http":
+                driver = init_http_driver()
+            else:
+                driver = browser_pool.acquire(self.browser_profile)
+
+        deadline = current_deadline()
+        if deadline is not None:
+            self.kill_browser = lambda: kill_driver(driver)
+            deadline.on_cancel(self.kill_browser)
+        return recorder.wrap(driver, self.name)
+
     def close_browser(self):
-        """Close browser."""
+        """Close browser, or hand it back to the browser pool."""
         if self.supports_download:
             delete_downloaded_file(self.downloaded_file_name)
-        self.driver.quit()
+        if self.kill_browser is not None:
+            deadline = current_deadline()
+            if deadline is not None:
+                deadline.discard(self.kill_browser)
+            self.kill_browser = None
+        if self._driver is not None:
+            browser_pool.release(self._driver)
+            self._driver = None
 
     def close_tab(self):
         """Close browser tab."""
@@ -61,51 +125,121 @@ class Scraper(metaclass=ABCMeta):
                 self.driver.switch_to.window(tab)
                 break
 
+    def resolve_url(self, url: str) -> str:
+        """Return the address actually fetched for url.
+
+        :param url: page url
+        :returns url, through the Google cache for restricted sites
+        """
+        return f"{GOOGLE_CACHE_VERSION_URL}{url}" if self.scraping_restricted else url
+
     def goto_url(self, url: str, sec: int = 0):
         """Go to URL.
 
         :param url: url to visit to
         :param sec: wait time to load the page
         """
-        url = f"{GOOGLE_CACHE_VERSION_URL}{url}" if self.scraping_restricted else url
-        self.driver.get(url)
-        sleep_seconds(sec)
+        url = self.resolve_url(url)
+        checkpoint("navigation")
+        if recorder.replaying:
+            self.driver.get(url)
+        else:
+            self.polite_get(url)
+
+        checkpoint("readiness")
+        # Nothing renders without a browser, so there is nothing to wait for
+        if getattr(self.driver, "renders_javascript", True):
+            deadline = current_deadline()
+            remaining = deadline.remaining() if deadline else None
+            with metrics.span("page_wait"):
+                sleep_seconds(sec if remaining is None else min(sec, remaining))
+            if metrics.enabled:
+                self.record_page_weight()
+        checkpoint("parse")
+
+    def record_page_weight(self):
+        """Add what the browser downloaded for the current page to run metrics."""
+        weight = page_weight(self.driver)
+        if weight:
+            metrics.record(
+                "page_weight", 0.0, rows=weight["resources"], nbytes=weight["bytes"]
+            )
+            metrics.record("js_heap", 0.0, nbytes=weight["heap"])
+
+    def limit_navigation(self) -> float:
+        """Bound page loads by the navigation budget of the running scraper.
+
+        :returns navigation budget left in seconds, None when unbounded
+        """
+        deadline = current_deadline()
+        remaining = deadline.remaining("navigation") if deadline else None
+        if remaining is None:
+            return None
+        driver = unwrap_driver(self.driver)
+        if hasattr(driver, "set_page_load_timeout"):
+            driver.set_page_load_timeout(max(remaining, 1))
+        else:
+            driver.timeout = max(remaining, 1)
+        return remaining
+
+    def polite_get(self, url: str):
+        """Navigate within the limits of the url's host, retrying on 429/5xx.
 
+        :param url: url to visit to
+        """
+        for attempt in range(FETCH_MAX_RETRIES + 1):
+            budget = self.limit_navigation()
+            with governor.slot(url) as slot, metrics.span("navigate"):
+                try:
+                    self.driver.get(url)
+                except (TimeoutException, Timeout) as err:
+                    if budget is None:
+                        raise
+                    raise DeadlineExceeded(self.name, "navigation", budget) from err
+                slot.observe(
+                    getattr(self.driver, "status_code", None),
+                    getattr(self.driver, "headers", None),
+                )
+            if not slot.should_retry or attempt == FETCH_MAX_RETRIES:
+                return
+            metrics.count("fetch_retry", rows=1)
+
+    @metrics.timed("format_data")
     def format_data(self, scraped_data: DATAFRAME) -> DATAFRAME:
         """Format dataframe data to include addition dates and columns.
 
+        Extra dates and fields are kept as prefixed columns, e.g.
+        "extraDates.releaseDate", which pandas_df_to_json nests per record.
+
         :param dataframe: Scraper Data
         :return: Formatted dataframe in sharable format to MDM
         """
         scraped_data = scraped_data.rename(columns=self.mapping)
 
-        main_columns = list(set(scraped_data.columns) & set(MAIN_FIELDS))
-        extra_date_columns = list(
-            set(scraped_data.columns) & set(self.extra_date_fields)
+        columns = list(scraped_data.columns)
+        main_columns = [column for column in columns if column in MAIN_FIELDS]
+        extra_date_columns = [
+            column for column in columns if column in self.extra_date_fields
+        ]
+        extra_columns = [
+            column
+            for column in columns
+            if column not in MAIN_FIELDS and column not in self.extra_date_fields
+        ]
+
+        main_df = pandas_concat(
+            [
+                scraped_data[main_columns],
+                scraped_data[extra_date_columns].add_prefix("extraDates."),
+                scraped_data[extra_columns].add_prefix("extraFields."),
+            ],
+            axis=1,
         )
-        extra_columns = list(
-            set(scraped_data.columns) - set(main_columns + self.extra_date_fields)
-        )
-
-        main_df = scraped_data[main_columns].copy()
-        extra_dates_df = scraped_data[extra_date_columns].copy()
-        extra_columns_df = scraped_data[extra_columns].copy()
-
-        if len(extra_dates_df.columns):
-            dates_data = extra_dates_df.to_dict(orient="records")
-            main_df.loc[:, "extraDates"] = dates_data
-
-        if len(extra_columns_df.columns):
-            dates_data = extra_columns_df.to_dict(orient="records")
-            main_df.loc[:, "extraFields"] = dates_data
-
         del scraped_data
-        del extra_dates_df
-        del extra_columns_df
 
-        main_df.loc[:, "scraperName"] = self.name
-        main_df.loc[:, "scraperId"] = self.uuid
-        return main_df
+        main_df["scraperName"] = self.name
+        main_df["scraperId"] = self.uuid
+        return compact_frame(main_df)
 
     def fetch_scraped_data(self) -> DATAFRAME:
         """Data to be sent in EOL post request.
@@ -115,14 +249,49 @@ class Scraper(metaclass=ABCMeta):
         scraped_data: DATAFRAME = self.eol_data_generator()
         return scraped_data
 
+    def load_scraped_data(self) -> DATAFRAME:
+        """Scraped data, from the result cache when still fresh.
+
+        :returns scraped data
+        """
+        scraped_data = result_cache.get(type(self), self.name)
+        if scraped_data is not None:
+            metrics.count("result_cache_hit", rows=len(scraped_data))
+            return scraped_data
+
+        scraped_data = self.fetch_scraped_data()
+        result_cache.put(type(self), self.name, scraped_data)
+        return scraped_data
+
     def generate_post_feed(self) -> dict:
         """Generate EOL post feed to be sent to MDM.
 
         :returns scraped data as dictionary
         """
-        scraped_data = self.fetch_scraped_data()
-        scraped_data = self.format_data(scraped_data)
-        return pandas_df_to_json(scraped_data)
+        with metrics.span("fetch") as span:
+            scraped_data = self.load_scraped_data()
+            span.add(rows=len(scraped_data))
+        return self.build_post_feed(scraped_data)
+
+    def build_post_feed(self, scraped_data: DATAFRAME) -> list[dict]:
+        """Format scraped data into the EOL post feed.
+
+        :param scraped_data: data returned by fetch_scraped_data
+        :returns scraped data as records
+        """
+        batch = self.build_post_batch(scraped_data)
+        with metrics.span("to_records"):
+            return batch.to_records()
+
+    def build_post_batch(self, scraped_data: DATAFRAME) -> RecordBatch:
+        """Format scraped data into the EOL post feed, kept as columns.
+
+        The publisher encodes batches without building a record each.
+
+        :param scraped_data: data returned by fetch_scraped_data
+        :returns scraped data as a record batch
+        """
+        return RecordBatch(self.format_data(scraped_data))
 
     def eol_data_generator(self) -> DATAFRAME:
         """Generates eol_data, to be implemented by subclasses."""
@@ -149,7 +318,8 @@ class MultiURLScraper(Scraper, ABC):
         """
         list_eol_data = []
         for url in self.urls:
-            super().__init__()
+            # Fresh browser per url, the previous one goes back to the pool
+            self.close_browser()
             self.url = url
             scraped_data = self.eol_data_generator()
             list_eol_data.append(scraped_data)
@@ -0,0 +1,164 @@
+"""Registry of scraper plugins backed by a cached entry point index."""
+
+import json
+import os
+import sys
+from hashlib import sha1
+from importlib import metadata
+from typing import Any, Union
+
+from apexa.common.util import get_logger, metadata_entry_points
+from apexa.config.default import PLUGIN_INDEX_FILE, SCRAPPER_ENTRY_POINT_GROUP
+
+LOG = get_logger(__name__)
+
+
+class RegisteredPlugin:
+    """Entry point look-alike for plugins registered in-process."""
+
+    def __init__(self, name: str, plugin: Any, group: str):
+        self.name = name
+        self.value = f"{plugin.__module__}:{plugin.__qualname__}"
+        self.group = group
+        self.plugin = plugin
+
+    def load(self) -> Any:
+        """Return the registered plugin."""
+        return self.plugin
+
+
+def installation_key() -> str:
+    """Fingerprint the installed distributions without reading their metadata.
+
+    Installing, upgrading or removing a distribution creates or renames its
+    ``*.dist-info`` directory, which changes the mtime of the ``sys.path``
+    entry holding it, so stat-ing the path entries is enough. The working
+    directory is left out, files saved there would invalidate the index.
+
+    :returns hex digest identifying the current installation state
+    """
+    digest = sha1(sys.prefix.encode("utf-8"))
+    cwd = os.getcwd()
+    for entry in sys.path:
+        if not entry or os.path.abspath(entry) == cwd:
+            continue
+        try:
+            mtime = os.stat(entry).st_mtime_ns
+        except OSError:
+            continue
+        digest.update(f"{entry}:{mtime};".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class PluginRegistry:
+    """Lazily resolved scraper sources keyed by plugin name."""
+
+    def __init__(
+        self,
+        group: str = SCRAPPER_ENTRY_POINT_GROUP,
+        index_file: str = PLUGIN_INDEX_FILE,
+    ):
+        self.group = group
+        self.index_file = index_file
+        self.registered: dict = {}
+        self._discovered: dict = None
+
+    def register(self, name: str, plugin: Union[str, Any]):
+        """Register a plugin in-process, overriding any installed one.
+
+        :param name: plugin name
+        :param plugin: plugin class or ``module:attribute`` reference
+        """
+        if isinstance(plugin, str):
+            entry_point = metadata.EntryPoint(name=name, value=plugin, group=self.group)
+        else:
+            entry_point = RegisteredPlugin(name, plugin, self.group)
+        self.registered[name] = entry_point
+
+    def unregister(self, name: str):
+        """Remove an in-process registration.
+
+        :param name: plugin name
+        """
+        self.registered.pop(name, None)
+
+    def refresh(self):
+        """Forget the resolved entry points so they are read again."""
+        self._discovered = None
+
+    def sources(self) -> dict:
+        """Return entry points of every available plugin.
+
+        :returns dictionary of plugin name to entry point
+        """
+        if self._discovered is None:
+            self._discovered = self._load()
+        return {**self._discovered, **self.registered}
+
+    def names(self) -> list:
+        """Return names of every available plugin.
+
+        :returns sorted plugin names
+        """
+        return sorted(self.sources())
+
+    def get(self, name: str):
+        """Return the entry point for a plugin name.
+
+        :param name: plugin name
+        :returns entry point or None
+        """
+        return self.sources().get(name)
+
+    def _load(self) -> dict:
+        """Resolve entry points from the index, rebuilding it when stale.
+
+        :returns dictionary of plugin name to entry point
+        """
+        key = installation_key()
+        values = self._read_index(key)
+        if values is None:
+            values = {
+                e.name: e.value
+                for e in metadata_entry_points().select(group=self.group)
+            }
+            self._write_index(key, values)
+
+        return {
+            name: metadata.EntryPoint(name=name, value=value, group=self.group)
+            for name, value in values.items()
+        }
+
+    def _read_index(self, key: str) -> Union[dict, None]:
+        """Read cached entry points for the group.
+
+        :param key: current installation key
+        :returns dictionary of plugin name to entry point value or None if stale
+        """
+        try:
+            with open(self.index_file, encoding="utf-8") as index:
+                cached = json.load(index)
+        except (OSError, ValueError):
+            return None
+
+        if cached.get("key") != key:
+            return None
+        return cached.get("groups", {}).get(self.group)
+
+    def _write_index(self, key: str, values: dict):
+        """Persist entry points for the group, ignoring unwritable locations.
+
+        :param key: current installation key
+        :param values: dictionary of plugin name to entry point value
+        """
+        tmp_file = f"{self.index_file}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+            with open(tmp_file, "w", encoding="utf-8") as index:
+                json.dump({"key": key, "groups": {self.group: values}}, index)
+            os.replace(tmp_file, self.index_file)
+        except OSError as err:
+            LOG.debug("Unable to write plugin index %s: %s", self.index_file, err)
+
+
+scraper_plugins = PluginRegistry()
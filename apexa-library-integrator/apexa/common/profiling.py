@@ -0,0 +1,128 @@
+"""Per-scraper CPU and memory profiling."""
+
+import cProfile
+import os
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+
+from apexa.common.util import get_logger
+
+LOG = get_logger(__name__)
+
+PROFILE_MODES = ["cpu", "memory"]
+PROFILE_TOP_N = 15
+TRACEMALLOC_FRAMES = 10
+
+
+def format_location(file_name: str, line: int, function: str) -> str:
+    """Format a code location compactly.
+
+    :param file_name: source file
+    :param line: line number
+    :param function: function name
+    :returns "function (file.py:line)"
+    """
+    return f"{function} ({os.path.basename(file_name)}:{line})"
+
+
+def hot_functions(profile: cProfile.Profile, top: int) -> list[str]:
+    """Summarize the functions with the most own time.
+
+    :param profile: finished profile
+    :param top: number of functions to list
+    :returns summary lines
+    """
+    stats = pstats.Stats(profile).stats
+    total = sum(stat[2] for stat in stats.values()) or 1.0
+    ranked = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)
+
+    lines = []
+    for (file_name, line, function), (_, calls, own, cumulative, _) in ranked[:top]:
+        lines.append(
+            f"{own:9.4f}s {own / total:6.1%} {cumulative:9.4f}s cum "
+            f"{calls:8d} calls  {format_location(file_name, line, function)}"
+        )
+    return lines
+
+
+def top_allocations(snapshot: tracemalloc.Snapshot, top: int) -> list[str]:
+    """Summarize the source lines holding the most memory.
+
+    :param snapshot: tracemalloc snapshot
+    :param top: number of lines to list
+    :returns summary lines
+    """
+    snapshot = snapshot.filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ]
+    )
+    lines = []
+    for stat in snapshot.statistics("lineno")[:top]:
+        frame = stat.traceback[0]
+        lines.append(
+            f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  "
+            f"{os.path.basename(frame.filename)}:{frame.lineno}"
+        )
+    return lines
+
+
+def write_report(file_name: str, title: str, lines: list[str]):
+    """Write a plain text report.
+
+    :param file_name: report path
+    :param title: first line of the report
+    :param lines: report lines
+    """
+    with open(file_name, "w", encoding="utf-8") as report:
+        report.write("\n".join([title] + lines) + "\n")
+
+
+@contextmanager
+def profile_scraper(
+    scraper: str, mode: str, output_dir: str = ".", top: int = PROFILE_TOP_N
+):
+    """Profile the enclosed block and report it under the scraper name.
+
+    CPU profiles are saved as ``<scraper>.prof`` (load them with pstats or
+    snakeviz), memory profiles as ``<scraper>.alloc.txt``.
+
+    :param scraper: scraper name
+    :param mode: "cpu", "memory" or None to disable
+    :param output_dir: directory for profile files
+    :param top: number of entries in summaries
+    """
+    if not mode:
+        yield
+        return
+
+    os.makedirs(output_dir, exist_ok=True)
+    base_name = os.path.join(output_dir, scraper)
+
+    if mode == "cpu":
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            profile.dump_stats(f"{base_name}.prof")
+            lines = hot_functions(profile, top)
+            LOG.info(
+                f"Hot functions of '{scraper}' ({base_name}.prof):\n" + "\n".join(lines)
+            )
+        return
+
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+    try:
+        yield
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        lines = top_allocations(snapshot, top)
+        title = f"Peak traced memory of '{scraper}': {peak / 1024 / 1024:.2f} MiB"
+        write_report(f"{base_name}.alloc.txt", title, lines)
+        LOG.info("%s (%s.alloc.txt):\n%s", title, base_name, "\n".join(lines))
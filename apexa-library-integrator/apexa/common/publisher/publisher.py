@@ -1,11 +1,22 @@
 """Publisher utility with retry logic."""
 
 # Imports
+import time
 from typing import Union
 
-from pika import ConnectionParameters, PlainCredentials, SelectConnection, spec
+from pika import (
+    BlockingConnection,
+    ConnectionParameters,
+    PlainCredentials,
+    SelectConnection,
+    spec,
+)
+from pika.exceptions import AMQPError, NackError, UnroutableError
 
-from apexa.common.publisher.registry import registry
+from apexa.common.deadline import DeadlineExceeded, current_deadline
+from apexa.common.metrics import metrics
+from apexa.common.publisher.registry import Registry
+from apexa.common.publisher.registry import registry as default_registry
 from apexa.common.util import get_logger, sleep_seconds
 from apexa.config import config
 from apexa.config.default import (
@@ -36,9 +47,143 @@ def init_pika_connection(host, port, user, password, on_open_callback):
     return connection
 
 
+def init_blocking_connection() -> BlockingConnection:
+    """Open a blocking Pika connection with the configured credentials.
+
+    :returns pika rabbitMQ blocking connection object
+    """
+    credentials = PlainCredentials(
+        config.get_cache("RABBIT_USER"), config.get_cache("RABBIT_PASSWORD")
+    )
+    parameters = ConnectionParameters(
+        config.get_cache("RABBIT_HOST"),
+        config.get_cache("RABBIT_PORT"),
+        "/",
+        credentials,
+        heartbeat=60,
+    )
+    return BlockingConnection(parameters)
+
+
+class BrokerSession:
+    """Long lived confirmed channel reused across publishes.
+
+    Inactive until opened, publish() then goes through it instead of
+    connecting to RabbitMQ for every message.
+    """
+
+    def __init__(self):
+        self.active = False
+        self.connection_factory = init_blocking_connection
+        self.connection = None
+        self.channel = None
+
+    def open(self, connection_factory=None):
+        """Start reusing a connection for every publish.
+
+        :param connection_factory: callable returning a blocking connection
+        """
+        self.active = True
+        if connection_factory is not None:
+            self.connection_factory = connection_factory
+
+    def close(self):
+        """Close the connection and go back to a connection per publish."""
+        self.active = False
+        self._disconnect()
+
+    def process_events(self):
+        """Service heartbeats while idle, reconnecting lazily if it failed."""
+        if self.connection is None:
+            return
+        try:
+            self.connection.process_data_events(time_limit=0)
+        except AMQPError as err:
+            logger.warning("RabbitMQ session lost while idle: %s", err)
+            self._disconnect()
+
+    def publish(
+        self,
+        exchange: str,
+        routing_key: str,
+        msg: Union[str, bytes],
+        request_id: str,
+        is_retry: bool = False,
+        registry: Registry = None,
+    ):
+        """Publish a message and wait for its delivery confirmation.
+
+        :param exchange : Exchange name to be published on
+        :param routing_key : Routing Key for exchange
+        :param msg : Message payload to be published
+        :param request_id: ID of the request message
+        :param is_retry : Publish retry attemp?. Defaults to False.
+        :param registry: registry tracking the message, the shared one by default
+        """
+        if registry is None:
+            registry = default_registry
+        with metrics.span("amqp_publish") as span:
+            span.add(nbytes=len(msg))
+            try:
+                channel = self._channel()
+                started = time.perf_counter()
+                channel.basic_publish(exchange, routing_key, body=msg)
+                metrics.observe("amqp_confirm", time.perf_counter() - started)
+            except (NackError, UnroutableError):
+                registry.add(request_id, msg, exchange, routing_key, SERVICE)
+                logger.error(
+                    "[%s] Failed to publish to: '%s' with '%s'",
+                    request_id,
+                    exchange,
+                    routing_key,
+                )
+                return
+            except AMQPError as err:
+                self._disconnect()
+                registry.add(request_id, msg, exchange, routing_key, SERVICE)
+                logger.error(
+                    "[%s] Error While Publishing to: '%s' with '%s' | ERROR: %s",
+                    request_id,
+                    exchange,
+                    routing_key,
+                    err,
+                )
+                return
+
+        registry.record_outcome(request_id, delivered=True)
+        if is_retry:
+            registry.soft_delete_retry_message(request_id)
+
+    def _channel(self):
+        """Return the confirmed channel, connecting if needed."""
+        if self.channel is None or not self.channel.is_open:
+            self._disconnect()
+            self.connection = self.connection_factory()
+            self.channel = self.connection.channel()
+            self.channel.confirm_delivery()
+        return self.channel
+
+    def _disconnect(self):
+        """Drop the connection, ignoring errors of already broken ones."""
+        connection, self.connection, self.channel = self.connection, None, None
+        if connection is not None:
+            try:
+                connection.close()
+            except AMQPError:
+                pass
+
+
+broker_session = BrokerSession()
+
+
 # Publish a message
 def publish(
-    exchange: str, routing_key: str, msg: str, request_id: str, is_retry: bool = False
+    exchange: str,
+    routing_key: str,
+    msg: str,
+    request_id: str,
+    is_retry: bool = False,
+    registry: Registry = None,
 ):
     """Publish message and keep track of ACK|NACK for the event.
 
@@ -47,13 +192,24 @@ def publish(
     :param msg : Message payload to be published
     :param request_id: ID of the request message
     :param is_retry : Publish retry attemp?. Defaults to False.
+    :param registry: registry tracking the message, the shared one by default
     """
+    if registry is None:
+        registry = default_registry
+    if broker_session.active:
+        broker_session.publish(
+            exchange, routing_key, msg, request_id, is_retry, registry
+        )
+        return
+
     # Rabbit configuration
     rabbit_user = config.get_cache("RABBIT_USER")
     rabbit_password = config.get_cache("RABBIT_PASSWORD")
     rabbit_host = config.get_cache("RABBIT_HOST")
     rabbit_port = config.get_cache("RABBIT_PORT")
 
+    published_at = []
+
     def on_open(conn):
         """After Connection is opened, create a channel."""
         conn.channel(on_open_callback=on_channel_open)
@@ -63,19 +219,27 @@ def publish(
         channel.confirm_delivery(ack_nack_callback=on_delivery_confirmation)
 
         try:
+            published_at.append(time.perf_counter())
             channel.basic_publish(exchange, routing_key, body=msg)
         except Exception as err:
             # Error while publishing (other than NACK)
             logger.error(
-                f"[{request_id}] Error While Publishing to: "
-                f"'{exchange}' with '{routing_key}' | ERROR: {err}"
+                "[%s] Error While Publishing to: '%s' with '%s' | ERROR: %s",
+                request_id,
+                exchange,
+                routing_key,
+                err,
             )
             raise
 
     def on_delivery_confirmation(frame):
         """Delivery Confermation after publishing message."""
+        if published_at:
+            metrics.observe("amqp_confirm", time.perf_counter() - published_at[0])
+
         # Got ACK
         if isinstance(frame.method, spec.Basic.Ack):
+            registry.record_outcome(request_id, delivered=True)
             # Remove message from map if got ACK for retried message
             if is_retry:
                 registry.soft_delete_retry_message(request_id)
@@ -86,8 +250,10 @@ def publish(
                 request_id, msg, exchange, routing_key, SERVICE
             )  # Add message to map
             logger.error(
-                f"[{request_id}] Failed to publish to: "
-                f"'{exchange}' with '{routing_key}'"
+                "[%s] Failed to publish to: '%s' with '%s'",
+                request_id,
+                exchange,
+                routing_key,
             )
 
         # Close Connection
@@ -102,27 +268,68 @@ def publish(
     # Cannot connect to RabbitMQ
     if not connection:
         logger.error(
-            f"[{request_id}] Unable to Publish. "
-            "Broken or Uninitialized RabbitMQ Connection"
+            "[%s] Unable to Publish. Broken or Uninitialized RabbitMQ Connection",
+            request_id,
         )
     else:
-        connection.ioloop.start()
+        deadline = current_deadline()
+        if deadline is not None:
+
+            def on_cancel():
+                """Give up on the unconfirmed message and stop waiting."""
+                registry.record_outcome(request_id, delivered=False)
+                connection.ioloop.add_callback_threadsafe(connection.ioloop.stop)
+
+            deadline.on_cancel(on_cancel)
+
+        try:
+            with metrics.span("amqp_publish") as span:
+                span.add(nbytes=len(msg))
+                connection.ioloop.start()
+        finally:
+            if deadline is not None:
+                deadline.discard(on_cancel)
+
+
+def abandon_retries(registry: Registry):
+    """Record every message waiting for a retry as undelivered.
+
+    :param registry: registry of the messages
+    """
+    registry.clear_soft_delete_retry_message()
+    for request_id in list(registry.get_registry()):
+        registry.record_outcome(request_id, delivered=False)
+        registry.remove(request_id)
 
 
 # Retry after "5" sec interval
-def retry():
-    """Retry Failed Publish Message."""
+def retry(registry: Registry = None):
+    """Retry Failed Publish Message.
+
+    :param registry: registry of the failed messages, the shared one by default
+    :raises DeadlineExceeded: if the running scraper ran out of time, the
+        messages left are recorded as undelivered
+    """
+    if registry is None:
+        registry = default_registry
 
     underliverables = []
     retriable_messages = registry.get_registry()
+    deadline = current_deadline()
 
-    for request_id, msg in retriable_messages.items():
+    for request_id, msg in list(retriable_messages.items()):
+        if deadline is not None:
+            try:
+                deadline.check()
+            except DeadlineExceeded:
+                abandon_retries(registry)
+                raise
         if msg["retries"] < PUBLISHER_MAX_RETRIES:
             registry.increment_retries(request_id)
             exchange, routing_key = msg["exchange"], msg["routing_key"]
 
             logger.info(
-                f"Retrying failed messages to: '{exchange}' with '{routing_key}'"
+                "Retrying failed messages to: '%s' with '%s'", exchange, routing_key
             )
             publish(
                 exchange,
@@ -130,31 +337,44 @@ def retry():
                 msg=msg["msg"],
                 is_retry=True,
                 request_id=request_id,
+                registry=registry,
             )
         else:
             # Move to notification queue
             underliverables.append(request_id)
             logger.warning(
                 "Retrying Failed for Below Message! "
-                f"Publishing to Notification Service. {underliverables}"
+                "Publishing to Notification Service. %s",
+                underliverables,
             )
     registry.clear_soft_delete_retry_message()
     if underliverables:
+        for request_id in underliverables:
+            registry.record_outcome(request_id, delivered=False)
         underliverables = [
             registry.remove(request_id) for request_id in underliverables
         ]
 
 
 def publish_messages(
-    exchange: str, routing_key: str, msg: Union[str, bytes], request_id: str
+    exchange: str,
+    routing_key: str,
+    msg: Union[str, bytes],
+    request_id: str,
+    registry: Registry = None,
 ) -> str:
     """Publish function that intiates publishing and handles retrying.
 
+    Only messages of the given registry are retried, concurrent publishes
+    each pass a registry of their own.
+
     :param exchange: Exchange to be published on
     :param routing_key: Routing key for exchange
     :param msg: Message to be published
     :param request_id: ID of the request message
+    :param registry: registry tracking the messages, the shared one by default
     :returns "Done" response message
+    :raises DeadlineExceeded: if the running scraper ran out of time
     """
 
     if isinstance(msg, (str, bytes)):
@@ -162,12 +382,24 @@ def publish_messages(
     else:
         msgs = msg
 
+    if registry is None:
+        registry = default_registry
+
     for message in msgs:
-        publish(exchange, routing_key, msg=message, request_id=request_id)  # Publish
+        publish(
+            exchange, routing_key, msg=message, request_id=request_id, registry=registry
+        )  # Publish
 
     # Check for retries
+    deadline = current_deadline()
     while len(registry.get_registry()):
+        if deadline is not None:
+            try:
+                deadline.check()
+            except DeadlineExceeded:
+                abandon_retries(registry)
+                raise
         sleep_seconds(PUBLISHER_RETRY_INTERVAL)
-        retry()  # Retry
+        retry(registry)  # Retry
 
     return "Done"
@@ -1,12 +1,16 @@
 """Publisher Dependancy for service which handles all publish operations."""
 
+import logging
+
+from apexa.common.log import log_context
+from apexa.common.metrics import metrics
 from apexa.common.publisher import publisher
+from apexa.common.publisher.registry import Registry
+from apexa.common.records import RECORDS, dumps_payload
 from apexa.common.util import (
     generate_uuid,
     get_isoformated_date,
     get_logger,
-    json_dumps,
-    logging,
 )
 from apexa.config.default import (
     SCRAPER_INTEGRATOR_DATA_EXCHANGE,
@@ -24,53 +28,67 @@ class Publisher:
     def __init__(self):
         pass
 
-    def publish_scraper_data(self, data: dict, routing_key: str):
+    def publish_scraper_data(self, data: RECORDS, routing_key: str) -> dict:
         """Publish scraped hardware data.
 
-        :param data: Scraped data
+        :param data: Scraped data, records or a record batch
         :param routing_key: Routing key, software/hardware
+        :returns delivery confirmation of the request
         """
         request_id = generate_uuid()
-
-        # Generate Payload
-        payload = {
-            "requestId": request_id,
-            "eol_data": data,
-            "timestamp": get_isoformated_date(),
-        }
-
-        payload = json_dumps(payload)
-
-        # Publish!
-        logger.info(
-            f"[{request_id}] Publishing Scraped data to: "
-            f"'{SCRAPER_INTEGRATOR_DATA_EXCHANGE}' with "
-            f"'{routing_key}'"
-        )
-
-        publisher.publish_messages(
-            exchange=SCRAPER_INTEGRATOR_DATA_EXCHANGE,
-            routing_key=routing_key,
-            msg=payload,
-            request_id=request_id,
-        )
-
-        logger.info(
-            f"[{request_id}] Published Scraped data to: "
-            f"'{SCRAPER_INTEGRATOR_DATA_EXCHANGE}' with "
-            f"'{routing_key}'"
-        )
-
-    def publish_software_scraper_data(self, data: dict):
+        # Retries of concurrent publishes, e.g. of dispatched jobs, stay apart
+        registry = Registry()
+
+        with log_context(request_id=request_id):
+            # Generate Payload
+            payload = {
+                "requestId": request_id,
+                "eol_data": data,
+                "timestamp": get_isoformated_date(),
+            }
+
+            with metrics.span("json_encode") as span:
+                payload = dumps_payload(payload)
+                span.add(rows=len(data), nbytes=len(payload))
+
+            # Publish!
+            logger.info(
+                "[%s] Publishing Scraped data to: '%s' with '%s'",
+                request_id,
+                SCRAPER_INTEGRATOR_DATA_EXCHANGE,
+                routing_key,
+            )
+
+            publisher.publish_messages(
+                exchange=SCRAPER_INTEGRATOR_DATA_EXCHANGE,
+                routing_key=routing_key,
+                msg=payload,
+                request_id=request_id,
+                registry=registry,
+            )
+
+            outcome = registry.outcome(request_id) or {"delivered": False}
+            logger.info(
+                "[%s] Published Scraped data to: '%s' with '%s', delivered: %s",
+                request_id,
+                SCRAPER_INTEGRATOR_DATA_EXCHANGE,
+                routing_key,
+                outcome["delivered"],
+            )
+        return {"request_id": request_id, **outcome}
+
+    def publish_software_scraper_data(self, data: RECORDS) -> dict:
         """Publish scraped software data.
 
         :param data: Scraped software data
+        :returns delivery confirmation of the request
         """
-        self.publish_scraper_data(data, SCRAPER_INTEGRATOR_SOFTWARE_ROUTING_KEY)
+        return self.publish_scraper_data(data, SCRAPER_INTEGRATOR_SOFTWARE_ROUTING_KEY)
 
-    def publish_hardware_scraper_data(self, data):
+    def publish_hardware_scraper_data(self, data) -> dict:
         """Publish scraped Hardware data.
 
         :param data: Scraped Hardware data
+        :returns delivery confirmation of the request
         """
-        self.publish_scraper_data(data, SCRAPER_INTEGRATOR_HARDWARE_ROUTING_KEY)
+        return self.publish_scraper_data(data, SCRAPER_INTEGRATOR_HARDWARE_ROUTING_KEY)
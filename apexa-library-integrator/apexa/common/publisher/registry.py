@@ -9,6 +9,7 @@ class Registry:
     def __init__(self):
         self.message_registry: dict = {}
         self.soft_delete_message_registry: list = []
+        self.outcomes: dict = {}
 
     def add(
         self,
@@ -72,5 +73,24 @@ class Registry:
             self.remove(message_id)
         self.soft_delete_message_registry = []
 
+    def record_outcome(self, request_id: str, delivered: bool):
+        """Remember whether the broker confirmed a message.
+
+        :param request_id: request id
+        :param delivered: True on ACK, False once retries are exhausted
+        """
+        self.outcomes[request_id] = {
+            "delivered": delivered,
+            "timestamp": get_isoformated_date(),
+        }
+
+    def outcome(self, request_id: str) -> dict:
+        """Return and forget the delivery outcome of a message.
+
+        :param request_id: request id
+        :returns delivered flag and time, None if still unknown
+        """
+        return self.outcomes.pop(request_id, None)
+
 
 registry = Registry()
@@ -0,0 +1,179 @@
+"""Formatted EOL records, stored column by column.
+
+A RecordBatch keeps the formatted dataframe of a scraper run as it is,
+one array per field, instead of one dictionary per record. Its encoder
+writes the JSON the publisher sends straight from the columns: every
+distinct value of a column is encoded once, and the records are joined
+from the encoded columns. The text equals json_dumps of the records
+pandas_df_to_json would return, values go through DataFrame.to_json the
+same way, which e.g. rounds floats to 10 significant digits.
+"""
+
+import json
+from itertools import repeat
+from typing import Union
+
+import numpy
+from pandas import DataFrame, Series, concat, factorize
+
+from apexa.common._typings import DATAFRAME, SERIES
+from apexa.common.util import NESTED_FIELDS, json_dumps, pandas_df_to_json
+
+# Separators of json.dumps, which json_dumps uses
+ITEM_SEPARATOR = ", "
+KEY_SEPARATOR = ": "
+NULL = "null"
+
+
+def flatten_records(records: Union[list[dict], "RecordBatch"]) -> DATAFRAME:
+    """Convert records to a dataframe with NESTED_FIELDS as dotted columns.
+
+    Columns keep the type of their values, numbers missing from some
+    records are not turned into floats.
+
+    :param records: records of the EOL post feed, or a batch of them
+    :returns dataframe of object columns
+    """
+    if isinstance(records, RecordBatch):
+        return records.frame.astype(object)
+    frame = DataFrame(records, dtype=object)
+    columns = []
+    for column in frame.columns:
+        if column not in NESTED_FIELDS:
+            columns.append(frame[[column]])
+            continue
+        nested = [value if isinstance(value, dict) else {} for value in frame[column]]
+        nested = DataFrame(nested, index=frame.index, dtype=object)
+        columns.append(nested.add_prefix(f"{column}."))
+    return concat(columns, axis=1) if columns else frame
+
+
+def encode_values(values) -> list[str]:
+    """Encode values to JSON as pandas_df_to_json and json_dumps would.
+
+    :param values: array-like of values
+    :returns JSON text per value
+    """
+    decoded = json.loads(Series(values, dtype=object).to_json(orient="values"))
+    return [json_dumps(value) for value in decoded]
+
+
+def encode_column(values: SERIES) -> numpy.ndarray:
+    """Encode every value of a column to JSON, each distinct value once.
+
+    :param values: column
+    :returns object array of JSON texts, "null" for missing values
+    """
+    try:
+        codes, uniques = factorize(values)
+    except TypeError:  # unhashable values, e.g. dictionaries
+        return numpy.array(encode_values(values), dtype=object)
+    texts = encode_values(uniques)
+    # Missing values have code -1, which picks the last text
+    return numpy.array(texts + [NULL], dtype=object)[codes]
+
+
+def layout(columns: list) -> list[tuple]:
+    """Group the columns of a formatted dataframe into record fields.
+
+    :param columns: column names, e.g. "extraDates.releaseDate"
+    :returns (field, columns, keys) per field in record order, keys are
+        None for plain fields and the nested keys for NESTED_FIELDS
+    """
+    fields = []
+    nested = {}
+    for column in columns:
+        field, _, key = str(column).partition(".")
+        if field not in NESTED_FIELDS or not key:
+            fields.append((column, [column], None))
+        elif field in nested:
+            nested[field][1].append(column)
+            nested[field][2].append(key)
+        else:
+            nested[field] = (field, [column], [key])
+            fields.append(nested[field])
+    return fields
+
+
+class RecordBatch:
+    """Formatted records of a scraper run as columns."""
+
+    __slots__ = ("frame",)
+
+    def __init__(self, frame: DATAFRAME):
+        """Wrap a formatted dataframe, as returned by Scraper.format_data.
+
+        :param frame: formatted dataframe
+        """
+        self.frame = frame
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def encode_rows(self) -> list[str]:
+        """Encode every record to JSON.
+
+        :returns one JSON object per record
+        """
+        # Constant texts between the encoded columns, and the columns
+        pieces, constant = [], "{"
+        for number, (field, columns, keys) in enumerate(layout(self.frame.columns)):
+            constant += (ITEM_SEPARATOR if number else "") + json_dumps(str(field))
+            constant += KEY_SEPARATOR
+            if keys is None:
+                pieces += [repeat(constant), encode_column(self.frame[field])]
+                constant = ""
+                continue
+            for position, (column, key) in enumerate(zip(columns, keys)):
+                constant += ITEM_SEPARATOR if position else "{"
+                constant += json_dumps(key) + KEY_SEPARATOR
+                pieces += [repeat(constant), encode_column(self.frame[column])]
+                constant = ""
+            constant = "}"
+        constant += "}"
+        if not pieces:
+            return [constant] * len(self)
+        pieces.append(repeat(constant))
+        return ["".join(row) for row in zip(*pieces)]
+
+    def encode(self) -> str:
+        """Encode the batch to a JSON array.
+
+        :returns JSON text
+        """
+        return "[" + ITEM_SEPARATOR.join(self.encode_rows()) + "]"
+
+    def to_records(self) -> list[dict]:
+        """Convert the batch to one dictionary per record.
+
+        :returns records of the EOL post feed
+        """
+        return pandas_df_to_json(self.frame)
+
+
+# Records of the EOL post feed, as dictionaries or as a batch
+RECORDS = Union[list[dict], RecordBatch]
+
+
+def dumps_records(records: RECORDS) -> str:
+    """Serialize records like json_dumps, batches without building records.
+
+    :param records: list of records or a batch
+    :returns JSON text
+    """
+    if isinstance(records, RecordBatch):
+        return records.encode()
+    return json_dumps(records)
+
+
+def dumps_payload(payload: dict) -> str:
+    """Serialize a message like json_dumps, batches without building records.
+
+    :param payload: message, values may be batches
+    :returns JSON text
+    """
+    items = [
+        json_dumps(str(key)) + KEY_SEPARATOR + dumps_records(value)
+        for key, value in payload.items()
+    ]
+    return "{" + ITEM_SEPARATOR.join(items) + "}"
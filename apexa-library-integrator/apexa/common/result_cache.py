@@ -0,0 +1,97 @@
+"""Cache of scraped data, keyed by scraper and its code version."""
+
+import inspect
+from hashlib import sha1
+from typing import Optional
+
+from diskcache import Cache
+
+import apexa
+from apexa.common._typings import DATAFRAME
+from apexa.common.util import get_logger
+from apexa.config.default import RESULT_CACHE_DIR, RESULT_CACHE_TTL
+
+LOG = get_logger(__name__)
+
+
+def code_version(api_class) -> str:
+    """Hash the source of a scraper and of the classes it builds on.
+
+    :param api_class: scrapper class
+    :returns hex digest, changes with the code and the package version
+    """
+    digest = sha1(apexa.__version__.encode("utf-8"))
+    for klass in inspect.getmro(api_class):
+        if klass.__module__ in ("builtins", "abc"):
+            continue
+        try:
+            digest.update(inspect.getsource(klass).encode("utf-8"))
+        except (OSError, TypeError):
+            digest.update(klass.__qualname__.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Scraped data kept for a while, so re-runs skip fetching."""
+
+    def __init__(self, directory: str = RESULT_CACHE_DIR, ttl: int = RESULT_CACHE_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        self.enabled = True
+        self._cache = None
+        self._versions: dict = {}
+
+    def configure(self, enabled: bool = True, ttl: int = RESULT_CACHE_TTL):
+        """Enable or bypass the cache.
+
+        :param enabled: False to always fetch
+        :param ttl: seconds cached data stays valid
+        """
+        self.enabled = enabled
+        self.ttl = ttl
+
+    @property
+    def cache(self) -> Cache:
+        """Open the diskcache store on first use."""
+        if self._cache is None:
+            self._cache = Cache(self.directory)
+        return self._cache
+
+    def key(self, api_class, name: str) -> str:
+        """Return the cache key of a scraper.
+
+        :param api_class: scrapper class
+        :param name: scrapper name
+        :returns cache key
+        """
+        if api_class not in self._versions:
+            self._versions[api_class] = code_version(api_class)
+        return f"{name}:{self._versions[api_class]}"
+
+    def get(self, api_class, name: str) -> Optional[DATAFRAME]:
+        """Return the cached data of a scraper.
+
+        :param api_class: scrapper class
+        :param name: scrapper name
+        :returns scraped data, None on a miss or when disabled
+        """
+        if not self.enabled:
+            return None
+        return self.cache.get(self.key(api_class, name))
+
+    def put(self, api_class, name: str, data: DATAFRAME):
+        """Cache the data of a scraper for ttl seconds.
+
+        :param api_class: scrapper class
+        :param name: scrapper name
+        :param data: scraped data
+        """
+        if self.enabled and self.ttl:
+            self.cache.set(self.key(api_class, name), data, expire=self.ttl)
+
+    def clear(self):
+        """Drop every cached result."""
+        self.cache.clear()
+
+
+result_cache = ResultCache()
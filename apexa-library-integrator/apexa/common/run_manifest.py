@@ -0,0 +1,199 @@
+"""Run manifests recording how far each scraper of a run got."""
+
+import gzip
+import json
+import os
+import shutil
+import threading
+from typing import Optional, Union
+
+from pandas import read_pickle
+
+from apexa.common._typings import DATAFRAME
+from apexa.common.records import dumps_records
+from apexa.common.util import get_isoformated_date, get_logger, json_dumps
+from apexa.config.default import RUNS_DIR, RUNS_KEPT
+
+LOG = get_logger(__name__)
+
+PENDING = "pending"
+FETCHED = "fetched"
+FORMATTED = "formatted"
+SAVED = "saved"
+PUBLISHED = "published"
+UNDELIVERED = "undelivered"
+FAILED = "failed"
+TIMED_OUT = "timeout"
+UNAVAILABLE = "unavailable"
+# States a resumed run does not redo
+DONE_STATES = [SAVED, PUBLISHED]
+
+
+class RunNotFound(Exception):
+    """Raised when resuming a run without a manifest."""
+
+    def __init__(self, run_id: str, directory: str):
+        self.message = f"No manifest of run {run_id} in {directory}"
+        super().__init__(self.message)
+
+
+class RunManifest:
+    """State and intermediate outputs of every scraper of a run.
+
+    Lives in ``<runs dir>/<run id>/manifest.json``, next to the outputs it
+    points to, and is rewritten atomically on every change.
+    """
+
+    def __init__(self, run_id: str, directory: str = RUNS_DIR):
+        self.run_id = run_id
+        self.directory = f"{directory}/{run_id}"
+        self.data: dict = {}
+        self._lock = threading.Lock()
+
+    @property
+    def file_name(self) -> str:
+        """Manifest file path."""
+        return f"{self.directory}/manifest.json"
+
+    @classmethod
+    def create(
+        cls,
+        run_id: str,
+        scrappers: list,
+        test: bool,
+        output_type: str,
+        directory: str = RUNS_DIR,
+    ) -> "RunManifest":
+        """Start the manifest of a new run.
+
+        :param run_id: run id
+        :param scrappers: names of the scrappers of the run
+        :param test: test flag of the run
+        :param output_type: type of output file
+        :param directory: runs directory
+        :returns run manifest
+        """
+        prune_runs(directory, keep=RUNS_KEPT - 1)
+        manifest = cls(run_id, directory)
+        manifest.data = {
+            "run_id": run_id,
+            "created": get_isoformated_date(),
+            "test": test,
+            "output_type": output_type,
+            "scrapers": {name: {"state": PENDING, "outputs": {}} for name in scrappers},
+        }
+        manifest.save()
+        return manifest
+
+    @classmethod
+    def load(cls, run_id: str, directory: str = RUNS_DIR) -> "RunManifest":
+        """Read the manifest of an earlier run.
+
+        :param run_id: run id
+        :param directory: runs directory
+        :returns run manifest
+        :raises RunNotFound: if the run has no manifest
+        """
+        manifest = cls(run_id, directory)
+        try:
+            with open(manifest.file_name, encoding="utf-8") as file:
+                manifest.data = json.load(file)
+        except FileNotFoundError as err:
+            raise RunNotFound(run_id, directory) from err
+        return manifest
+
+    def save(self):
+        """Write the manifest atomically."""
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_file = f"{self.file_name}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as file:
+            file.write(json_dumps(self.data, indent=2))
+        os.replace(tmp_file, self.file_name)
+
+    def entry(self, name: str) -> dict:
+        """Return the record of a scrapper.
+
+        :param name: scrapper name
+        :returns state, outputs and delivery of the scrapper
+        """
+        return self.data["scrapers"].setdefault(name, {"state": PENDING, "outputs": {}})
+
+    def mark(self, name: str, state: str, **fields):
+        """Move a scrapper to a new state.
+
+        :param name: scrapper name
+        :param state: new state
+        :param fields: extra values to record, e.g. delivery or error
+        """
+        with self._lock:
+            entry = self.entry(name)
+            entry.update(fields, state=state, updated=get_isoformated_date())
+            self.save()
+        LOG.debug("Run %s: '%s' is %s", self.run_id, name, state)
+
+    def unfinished(self) -> list:
+        """Return the scrappers a resumed run still has to run.
+
+        :returns scrapper names
+        """
+        return [
+            name
+            for name, entry in self.data["scrapers"].items()
+            if entry["state"] not in DONE_STATES
+        ]
+
+    def save_output(self, name: str, stage: str, data):
+        """Keep the output of a stage, then move the scrapper to that stage.
+
+        :param name: scrapper name
+        :param stage: FETCHED for the scraped dataframe, FORMATTED for records
+            or a record batch
+        :param data: output of the stage
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        if stage == FETCHED:
+            file_name = f"{self.directory}/{name}.{stage}.pkl.gz"
+            data.to_pickle(file_name, compression="gzip")
+        else:
+            file_name = f"{self.directory}/{name}.{stage}.json.gz"
+            with gzip.open(file_name, "wt", encoding="utf-8") as file:
+                file.write(dumps_records(data))
+
+        with self._lock:
+            self.entry(name)["outputs"][stage] = os.path.basename(file_name)
+        self.mark(name, stage)
+
+    def load_output(self, name: str, stage: str) -> Optional[Union[DATAFRAME, list]]:
+        """Return the output a stage left in an earlier attempt.
+
+        :param name: scrapper name
+        :param stage: FETCHED or FORMATTED
+        :returns output of the stage, None if it never completed
+        """
+        file_name = self.entry(name)["outputs"].get(stage)
+        if not file_name:
+            return None
+        path = f"{self.directory}/{file_name}"
+        try:
+            if stage == FETCHED:
+                return read_pickle(path, compression="gzip")
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError) as err:
+            LOG.warning("Ignoring unreadable %s output of '%s': %s", stage, name, err)
+            return None
+
+
+def prune_runs(directory: str = RUNS_DIR, keep: int = RUNS_KEPT):
+    """Delete all but the newest runs.
+
+    :param directory: runs directory
+    :param keep: number of runs to keep
+    """
+    try:
+        runs = [entry for entry in os.scandir(directory) if entry.is_dir()]
+    except FileNotFoundError:
+        return
+    runs.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in runs[max(keep, 0) :]:
+        shutil.rmtree(entry.path, ignore_errors=True)
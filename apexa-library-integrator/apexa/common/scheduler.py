@@ -0,0 +1,336 @@
+"""Cron-like and adaptive schedules for scrapers run by the daemon."""
+
+import json
+import os
+from datetime import datetime, timedelta
+from hashlib import sha256
+from typing import Optional
+
+from apexa.common.records import RECORDS, RecordBatch
+from apexa.common.snapshots import DROPPED_FIELDS
+from apexa.common.util import (
+    get_logger,
+    json_dumps,
+    random_num_between,
+)
+
+LOG = get_logger(__name__)
+
+CRON_ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+# (minimum, maximum) of minute, hour, day of month, month and day of week
+CRON_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+# Bounds the search of the next run of a schedule that can never match
+CRON_SEARCH_LIMIT = timedelta(days=366 * 5)
+# Weight of the newest gap in the moving average of gaps between changes
+REVISIT_SMOOTHING = 0.3
+# Share of the distance to the target interval kept after each unchanged run
+REVISIT_DECAY = 0.5
+# Revisit twice per expected change period so changes are seen early
+REVISIT_SAMPLING = 0.5
+
+
+class ScheduleException(Exception):
+    """Raised on invalid schedule expressions."""
+
+    def __init__(self, message="invalid schedule"):
+        self.message = message
+        super().__init__(self.message)
+
+
+def parse_cron_field(field: str, minimum: int, maximum: int) -> set:
+    """Expand one cron field into the values it matches.
+
+    Supports ``*``, single values, ``a-b`` ranges, ``/step`` and lists.
+
+    :param field: cron field
+    :param minimum: lowest allowed value
+    :param maximum: highest allowed value
+    :returns set of matched values
+    """
+    values = set()
+    for part in field.split(","):
+        value_range, _, step = part.partition("/")
+        if value_range == "*":
+            start, end = minimum, maximum
+        elif "-" in value_range:
+            start, end = (int(value) for value in value_range.split("-", 1))
+        else:
+            start = int(value_range)
+            end = maximum if step else start
+
+        step = int(step) if step else 1
+        if not minimum <= start <= end <= maximum or step < 1:
+            raise ScheduleException(f"Invalid cron field '{field}'")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """Five field cron expression (minute hour day month weekday)."""
+
+    def __init__(self, expression: str):
+        self.expression = CRON_ALIASES.get(expression.strip(), expression.strip())
+        fields = self.expression.split()
+        if len(fields) != 5:
+            raise ScheduleException(f"Expected 5 cron fields in '{expression}'")
+
+        try:
+            minutes, hours, days, months, weekdays = (
+                parse_cron_field(field, *limits)
+                for field, limits in zip(fields, CRON_RANGES)
+            )
+        except ValueError as err:
+            raise ScheduleException(f"Invalid cron '{expression}': {err}") from err
+
+        self.minutes, self.hours, self.months = minutes, hours, months
+        self.days = days
+        # cron counts Sunday as 0 or 7, Python as 6
+        self.weekdays = {(day - 1) % 7 for day in weekdays}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def matches_day(self, moment: datetime) -> bool:
+        """Check the day of month and day of week fields.
+
+        Like cron, a day matches either field when both are restricted.
+
+        :param moment: date to check
+        :returns True if the schedule runs on that day
+        """
+        day_match = moment.day in self.days
+        weekday_match = moment.weekday() in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_match and weekday_match
+        return day_match or weekday_match
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Return the first scheduled minute after moment.
+
+        :param moment: reference time
+        :returns next run time
+        """
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + CRON_SEARCH_LIMIT
+        while candidate < limit:
+            if candidate.month not in self.months:
+                month = candidate.month % 12 + 1
+                year = candidate.year + (candidate.month == 12)
+                candidate = candidate.replace(
+                    year=year, month=month, day=1, hour=0, minute=0
+                )
+            elif not self.matches_day(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ScheduleException(f"Cron '{self.expression}' never runs")
+
+
+def content_hash(data: RECORDS) -> str:
+    """Hash formatted records independently of their order.
+
+    scraperName and scraperId are left out, scraperId differs between runs
+    of equal records.
+
+    :param data: records of the EOL post feed, or a batch of them
+    :returns hex digest of the records
+    """
+    if isinstance(data, RecordBatch):
+        frame = data.frame.drop(columns=DROPPED_FIELDS, errors="ignore")
+        lines = sorted(RecordBatch(frame).encode_rows())
+    else:
+        lines = sorted(
+            json_dumps({k: v for k, v in record.items() if k not in DROPPED_FIELDS})
+            for record in data
+        )
+    return sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+class AdaptiveRevisit:
+    """Revisit interval following how often a source actually changes.
+
+    Unchanged runs move the interval exponentially toward half the observed
+    change period, a change cuts it back to the minimum right away.
+    """
+
+    def __init__(self, min_interval: int, max_interval: int, state: dict = None):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        state = state or {}
+        self.interval = state.get("interval", min_interval)
+        self.last_hash = state.get("last_hash")
+        self.last_change = state.get("last_change")
+        self.change_gap = state.get("change_gap")
+        self.changes = state.get("changes", 0)
+        self.checks = state.get("checks", 0)
+        self.interval = self.clamp(self.interval)
+
+    def clamp(self, interval: float) -> float:
+        """Keep an interval within the configured bounds.
+
+        :param interval: interval in seconds
+        :returns bounded interval
+        """
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def observe(self, digest: str, now: float) -> dict:
+        """Update the interval after a run.
+
+        :param digest: content hash of the run
+        :param now: run time as a timestamp
+        :returns decision taken, for reporting
+        """
+        self.checks += 1
+        previous = self.interval
+
+        if self.last_hash is None:
+            changed = False
+            self.last_change = now
+        elif digest != self.last_hash:
+            changed = True
+            self.changes += 1
+            gap = now - self.last_change
+            self.change_gap = (
+                gap
+                if self.change_gap is None
+                else REVISIT_SMOOTHING * gap + (1 - REVISIT_SMOOTHING) * self.change_gap
+            )
+            self.last_change = now
+            self.interval = self.min_interval
+        else:
+            changed = False
+            period = max(self.change_gap or 0, now - self.last_change)
+            target = self.clamp(REVISIT_SAMPLING * period)
+            self.interval = self.clamp(
+                target + (self.interval - target) * REVISIT_DECAY
+            )
+
+        self.last_hash = digest
+        return {
+            "changed": changed,
+            "previous_interval": previous,
+            "interval": self.interval,
+            "change_gap": self.change_gap,
+            "changes": self.changes,
+            "checks": self.checks,
+        }
+
+    def state(self) -> dict:
+        """Return the persistable state.
+
+        :returns JSON serializable state
+        """
+        return {
+            "interval": self.interval,
+            "last_hash": self.last_hash,
+            "last_change": self.last_change,
+            "change_gap": self.change_gap,
+            "changes": self.changes,
+            "checks": self.checks,
+        }
+
+
+class RevisitStore:
+    """JSON file keeping adaptive revisit state across daemon restarts."""
+
+    def __init__(self, file_name: str):
+        self.file_name = file_name
+
+    def load(self) -> dict:
+        """Read saved states.
+
+        :returns dictionary of scraper name to state
+        """
+        try:
+            with open(self.file_name, encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as err:
+            LOG.warning("Ignoring unreadable revisit state %s: %s", self.file_name, err)
+            return {}
+
+    def save(self, states: dict):
+        """Write states atomically.
+
+        :param states: dictionary of scraper name to state
+        """
+        tmp_file = f"{self.file_name}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.file_name), exist_ok=True)
+            with open(tmp_file, "w", encoding="utf-8") as file:
+                json.dump(states, file)
+            os.replace(tmp_file, self.file_name)
+        except OSError as err:
+            LOG.warning("Unable to save revisit state %s: %s", self.file_name, err)
+
+
+class ScraperSchedule:
+    """When a scraper runs next and how its previous runs went."""
+
+    def __init__(
+        self,
+        name: str,
+        cron: str,
+        jitter: int = 0,
+        revisit: Optional[AdaptiveRevisit] = None,
+    ):
+        self.name = name
+        self.cron = CronSchedule(cron)
+        self.jitter = jitter
+        self.revisit = revisit
+        self.last_decision = None
+        self.next_run = None
+        self.last_started = None
+        self.last_duration = None
+        self.last_status = None
+        self.runs = 0
+
+    def plan(self, now: datetime) -> datetime:
+        """Plan the next run after now, delayed by a random jitter.
+
+        Adaptive schedules wait their current revisit interval, others wait
+        for the next cron match.
+
+        :param now: reference time
+        :returns next run time
+        """
+        delay = random_num_between(0, self.jitter + 1) if self.jitter else 0
+        if self.revisit is not None and self.revisit.checks:
+            planned = now + timedelta(seconds=self.revisit.interval)
+        else:
+            planned = self.cron.next_after(now)
+        self.next_run = planned + timedelta(seconds=delay)
+        return self.next_run
+
+    def is_due(self, now: datetime) -> bool:
+        """Check whether the scraper should run.
+
+        :param now: current time
+        :returns True if the next run time has passed
+        """
+        return self.next_run is not None and self.next_run <= now
+
+    def status(self) -> dict:
+        """Return the schedule state.
+
+        :returns JSON serializable schedule state
+        """
+        return {
+            "cron": self.cron.expression,
+            "jitter": self.jitter,
+            "next_run": self.next_run,
+            "last_started": self.last_started,
+            "last_duration": self.last_duration,
+            "last_status": self.last_status,
+            "runs": self.runs,
+            "revisit": self.last_decision,
+        }
@@ -0,0 +1,54 @@
+"""Compact column types of formatted scraper output.
+
+Formatted dataframes repeat a few values on every row: the product name,
+the source URL, the scraper name and id, and dates out of a few thousand
+days. Such columns become categoricals, one small integer code per row
+and every distinct value stored once. Date categories are ordered, ISO
+dates sort chronologically, so their codes compare like the dates.
+Serializing a categorical writes its original values, empty strings and
+None included, so the records sent stay the same.
+"""
+
+from pandas import CategoricalDtype
+from pandas.api.types import infer_dtype
+
+from apexa.common._typings import DATAFRAME
+from apexa.config.default import SCHEMA_CATEGORY_RATIO
+
+DATE_FIELDS = ["originalEOLDate", "originalExtendedEOLDate"]
+DATE_PREFIX = "extraDates."
+
+
+def is_date_column(column) -> bool:
+    """Return whether a formatted column holds dates.
+
+    :param column: column name
+    :returns True for the EOL dates and extra dates
+    """
+    return column in DATE_FIELDS or str(column).startswith(DATE_PREFIX)
+
+
+def compact_frame(
+    dataframe: DATAFRAME, ratio: float = SCHEMA_CATEGORY_RATIO
+) -> DATAFRAME:
+    """Convert repetitive text columns to categoricals, in place.
+
+    :param dataframe: formatted dataframe
+    :param ratio: largest share of distinct values of a converted column
+    :returns the same dataframe
+    """
+    rows = len(dataframe)
+    for column in dataframe.columns:
+        values = dataframe[column]
+        if values.dtype != object:
+            continue
+        try:
+            distinct = values.nunique()
+        except TypeError:  # unhashable values, e.g. dictionaries
+            continue
+        if distinct > ratio * rows:
+            continue
+        # Mixed values, e.g. dates and numbers, have no order
+        ordered = is_date_column(column) and infer_dtype(values) == "string"
+        dataframe[column] = values.astype(CategoricalDtype(ordered=ordered))
+    return dataframe
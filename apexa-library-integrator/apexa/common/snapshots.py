@@ -0,0 +1,368 @@
+"""Local store of the formatted output of every scraper run.
+
+Snapshots are partitioned per scraper and per run date::
+
+    <scraper>/date=<YYYY-MM-DD>/<time>-<run id>.<parquet|pkl.gz>
+
+Each scraper also keeps an index of which partition files hold which
+(originalName, originalVersion) keys, as JSON lines every run appends to.
+Product histories only read the partitions the index points at, latest
+snapshots only the newest file. The runs of days older than
+SNAPSHOT_COMPACT_AFTER are merged into one file per day.
+
+Snapshot files are Parquet when pyarrow is installed, gzipped pickles
+otherwise. Both keep the frame column by column and read back with pandas,
+files of either kind are read by their extension.
+"""
+
+import glob
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from pandas import DataFrame, Timestamp, concat, read_json, read_parquet, read_pickle
+
+from apexa.common._typings import DATAFRAME
+from apexa.common.records import RECORDS, flatten_records
+from apexa.common.util import get_logger, json_dumps, pandas_df_to_json
+from apexa.config.default import SNAPSHOT_COMPACT_AFTER, SNAPSHOT_DIR
+
+try:
+    import pyarrow
+except ImportError:  # optional dependency
+    pyarrow = None
+
+LOG = get_logger(__name__)
+
+KEY_FIELDS = ["originalName", "originalVersion"]
+# Added to every row, identifying the run the row was scraped in
+RUN_FIELDS = ["run_id", "captured"]
+# Already given by the partition, or different in every run
+DROPPED_FIELDS = ["scraperName", "scraperId"]
+EXTENSION = "parquet" if pyarrow is not None else "pkl.gz"
+PARTITION_PREFIX = "date="
+INDEX_FILE = "index.jsonl"
+INDEX_COLUMNS = KEY_FIELDS + ["partition"]
+
+
+def write_frame(frame: DATAFRAME, file_name: str):
+    """Write a dataframe, replacing the file only once it is complete.
+
+    :param frame: dataframe
+    :param file_name: file ending in .parquet or .pkl.gz
+    """
+    tmp_file = f"{file_name}.tmp"
+    if file_name.endswith(".parquet"):
+        frame.to_parquet(tmp_file, index=False)
+    else:
+        frame.to_pickle(tmp_file, compression="gzip")
+    os.replace(tmp_file, file_name)
+
+
+def read_frame(file_name: str) -> DATAFRAME:
+    """Read a dataframe written by write_frame.
+
+    :param file_name: file ending in .parquet or .pkl.gz
+    :returns dataframe
+    """
+    if file_name.endswith(".parquet"):
+        return read_parquet(file_name)
+    return read_pickle(file_name, compression="gzip")
+
+
+def index_lines(index: DATAFRAME) -> str:
+    """Encode index rows as JSON lines.
+
+    :param index: dataframe of INDEX_COLUMNS
+    :returns one JSON object per row, each ending in a newline
+    """
+    index = index.astype(object)
+    rows = index.where(index.notna(), None).to_dict("records")
+    return "".join(json_dumps(row) + "\n" for row in rows)
+
+
+def snapshot_frame(records: RECORDS, run_id: str, at: float) -> DATAFRAME:
+    """Flatten formatted records into a snapshot.
+
+    extraDates and extraFields become dotted columns, e.g.
+    "extraDates.releaseDate". Values are kept as strings, so every run of
+    a scraper has the same column types.
+
+    :param records: records of the EOL post feed, or a batch of them
+    :param run_id: run id
+    :param at: run time as a timestamp
+    :returns snapshot dataframe
+    """
+    frame = flatten_records(records) if records else DataFrame(columns=KEY_FIELDS)
+    frame = frame.drop(columns=DROPPED_FIELDS, errors="ignore")
+    for column in frame.columns:
+        values = frame[column]
+        # Before astype, which may write the strings into object columns
+        missing = values.isna()
+        frame[column] = values.astype(str).where(~missing, None)
+    frame.insert(0, "run_id", run_id)
+    frame.insert(1, "captured", Timestamp(at, unit="s"))
+    return frame
+
+
+def changes(frame: DATAFRAME) -> DATAFRAME:
+    """Keep the rows that differ from the previous run of the same product.
+
+    :param frame: rows of one or more products, oldest first
+    :returns rows where a product first appears or any value changed
+    """
+    values = frame.drop(columns=RUN_FIELDS).astype(str)
+    previous = values.groupby([frame[field] for field in KEY_FIELDS]).shift()
+    return frame[(values != previous).any(axis=1)]
+
+
+def snapshot_records(frame: DATAFRAME) -> list[dict]:
+    """Convert snapshot rows to records with ISO formatted capture times.
+
+    :param frame: snapshot rows
+    :returns list of records
+    """
+    captured = frame["captured"].dt.strftime("%Y-%m-%dT%H:%M:%S")
+    return pandas_df_to_json(frame.assign(captured=captured))
+
+
+class SnapshotStore:
+    """Partitioned snapshots of formatted scraper output."""
+
+    def __init__(self, directory: str = SNAPSHOT_DIR):
+        self.directory = directory
+        self.enabled = True
+        self._lock = threading.Lock()
+
+    def configure(self, enabled: bool = True, directory: str = None):
+        """Enable or disable storing snapshots.
+
+        :param enabled: False to store nothing, e.g. for replayed runs
+        :param directory: store directory
+        """
+        self.enabled = enabled
+        if directory:
+            self.directory = directory
+
+    def scrapers(self) -> list[str]:
+        """Return the scrapers with stored snapshots.
+
+        :returns scraper names
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name
+            for name in os.listdir(self.directory)
+            if os.path.isdir(os.path.join(self.directory, name))
+        )
+
+    def partitions(self, scraper: str) -> list[str]:
+        """Return the snapshot files of a scraper, oldest first.
+
+        :param scraper: scraper name
+        :returns paths relative to the scraper directory
+        """
+        base = os.path.join(self.directory, scraper)
+        pattern = os.path.join(base, f"{PARTITION_PREFIX}*", "*")
+        return sorted(
+            os.path.relpath(path, base)
+            for path in glob.glob(pattern)
+            if not path.endswith(".tmp")
+        )
+
+    def _index_file(self, scraper: str) -> str:
+        """Return the index file of a scraper."""
+        return os.path.join(self.directory, scraper, INDEX_FILE)
+
+    def index(self, scraper: str) -> DATAFRAME:
+        """Return which partitions hold which products.
+
+        Partitions are indexed anew when the index is missing or unreadable.
+
+        :param scraper: scraper name
+        :returns dataframe of originalName, originalVersion and partition
+        """
+        index_file = self._index_file(scraper)
+        if not os.path.exists(index_file):
+            return self._scan(scraper)
+        if not os.path.getsize(index_file):
+            return DataFrame(columns=INDEX_COLUMNS)
+        try:
+            index = read_json(index_file, orient="records", lines=True, dtype=False)
+        except ValueError as err:
+            LOG.warning("Indexing snapshots of '%s' anew: %s", scraper, err)
+            return self._scan(scraper)
+        # Names, versions and partitions repeat across runs
+        return index.reindex(columns=INDEX_COLUMNS).astype("category")
+
+    def _scan(self, scraper: str) -> DATAFRAME:
+        """Index the keys of every partition of a scraper."""
+        frames = [DataFrame(columns=INDEX_COLUMNS)]
+        for partition in self.partitions(scraper):
+            frame = read_frame(os.path.join(self.directory, scraper, partition))
+            keys = frame.reindex(columns=KEY_FIELDS).drop_duplicates()
+            frames.append(keys.assign(partition=partition))
+        return concat(frames, ignore_index=True)
+
+    def append(
+        self, scraper: str, run_id: str, records: RECORDS, at: float = None
+    ) -> str:
+        """Store the formatted output of a run, then merge the runs of old days.
+
+        :param scraper: scraper name
+        :param run_id: run id
+        :param records: records of the EOL post feed, or a batch of them
+        :param at: run time as a timestamp, now by default
+        :returns path of the partition file, relative to the scraper directory
+        """
+        at = time.time() if at is None else at
+        when = datetime.fromtimestamp(at, timezone.utc)
+        partition = os.path.join(
+            f"{PARTITION_PREFIX}{when:%Y-%m-%d}",
+            f"{when:%Y%m%dT%H%M%S}-{run_id}.{EXTENSION}",
+        )
+        frame = snapshot_frame(records, run_id, at)
+
+        with self._lock:
+            path = os.path.join(self.directory, scraper, partition)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_frame(frame, path)
+            keys = frame.reindex(columns=KEY_FIELDS).drop_duplicates()
+            self._append_index(scraper, keys.assign(partition=partition))
+            self._compact(scraper, at)
+        return partition
+
+    def record_run(self, scraper: str, run_id: str, records: RECORDS):
+        """Append the output of a run, never failing the run itself.
+
+        :param scraper: scraper name
+        :param run_id: run id
+        :param records: records of the EOL post feed, or a batch of them
+        """
+        if not self.enabled:
+            return
+        try:
+            self.append(scraper, run_id, records)
+        except (OSError, ValueError) as err:
+            LOG.warning("Could not store snapshot of '%s': %s", scraper, err)
+
+    def latest(self, scraper: str) -> Optional[DATAFRAME]:
+        """Return the newest snapshot of a scraper.
+
+        :param scraper: scraper name
+        :returns snapshot, None if there is none
+        """
+        partitions = self.partitions(scraper)
+        if not partitions:
+            return None
+        frame = read_frame(os.path.join(self.directory, scraper, partitions[-1]))
+        if frame.empty:
+            return frame
+        # Merged days hold several runs, the last one is the newest
+        return frame[frame["run_id"] == frame["run_id"].iloc[-1]]
+
+    def history(
+        self,
+        scraper: str,
+        name: str,
+        version: str = None,
+        changes_only: bool = True,
+    ) -> DATAFRAME:
+        """Return the stored rows of a product across runs.
+
+        :param scraper: scraper name
+        :param name: originalName of the product
+        :param version: originalVersion, all versions by default
+        :param changes_only: drop rows equal to the previous run of the product
+        :returns rows, oldest first
+        """
+        index = self.index(scraper)
+        matches = index["originalName"] == name
+        if version is not None:
+            matches &= index["originalVersion"] == version
+
+        frames = []
+        for partition in sorted(set(index.loc[matches, "partition"])):
+            frame = read_frame(os.path.join(self.directory, scraper, partition))
+            rows = frame["originalName"] == name
+            if version is not None:
+                rows &= frame["originalVersion"] == version
+            frames.append(frame[rows])
+        if not frames:
+            return DataFrame(columns=RUN_FIELDS + KEY_FIELDS)
+
+        rows = concat(frames, ignore_index=True).sort_values("captured", kind="stable")
+        return changes(rows) if changes_only else rows
+
+    def compact(self, scraper: str = None, now: float = None) -> int:
+        """Merge the runs of days older than SNAPSHOT_COMPACT_AFTER.
+
+        Every such day ends up with a single file holding all of its runs.
+
+        :param scraper: scraper name, all by default
+        :param now: current time as a timestamp
+        :returns number of snapshot files merged into others
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            names = [scraper] if scraper else self.scrapers()
+            return sum(self._compact(name, now) for name in names)
+
+    def _compact(self, scraper: str, now: float) -> int:
+        """Merge the partitions of old days of a scraper, holding the lock."""
+        cutoff = datetime.fromtimestamp(now - SNAPSHOT_COMPACT_AFTER, timezone.utc)
+        first_kept = f"{PARTITION_PREFIX}{cutoff:%Y-%m-%d}"
+        by_day: dict = {}
+        for partition in self.partitions(scraper):
+            day = os.path.dirname(partition)
+            if day < first_kept:
+                by_day.setdefault(day, []).append(partition)
+
+        merged = {}
+        for partitions in by_day.values():
+            if len(partitions) < 2:
+                continue
+            paths = [os.path.join(self.directory, scraper, p) for p in partitions]
+            frame = concat([read_frame(path) for path in paths], ignore_index=True)
+            # The file of the last run of the day holds every run once written
+            write_frame(frame, paths[-1])
+            for partition, path in zip(partitions[:-1], paths):
+                os.remove(path)
+                merged[partition] = partitions[-1]
+        if not merged:
+            return 0
+
+        index = self.index(scraper).astype(object)
+        index["partition"] = index["partition"].replace(merged)
+        self._write_index(scraper, index.drop_duplicates())
+        LOG.info(
+            "Merged %s snapshots of '%s' into %s days",
+            len(merged),
+            scraper,
+            len(set(merged.values())),
+        )
+        return len(merged)
+
+    def _append_index(self, scraper: str, keys: DATAFRAME):
+        """Add the keys of a new partition to the index, holding the lock."""
+        index_file = self._index_file(scraper)
+        if not os.path.exists(index_file):
+            # Also indexes partitions stored before the index was
+            self._write_index(scraper, self._scan(scraper))
+            return
+        with open(index_file, "a", encoding="utf-8") as file:
+            file.write(index_lines(keys))
+
+    def _write_index(self, scraper: str, index: DATAFRAME):
+        """Replace the index of a scraper, holding the lock."""
+        index_file = self._index_file(scraper)
+        tmp_file = f"{index_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as file:
+            file.write(index_lines(index))
+        os.replace(tmp_file, index_file)
+
+
+snapshot_store = SnapshotStore()
@@ -2,7 +2,6 @@
 
 import calendar
 import json
-import logging
 import os
 import random
 import re
@@ -30,6 +29,8 @@ from apexa.common._typings import (
     ListDataFrame,
     ListWebElement,
 )
+from apexa.common.log import get_logger
+from apexa.common.metrics import metrics
 
 MAIN_FIELDS = [
     "originalName",
@@ -40,6 +41,9 @@ MAIN_FIELDS = [
     "originalExtendedEOLDate",
     "originalEolSource",
 ]
+# Fields holding a dictionary per record, kept as prefixed columns in
+# formatted dataframes, e.g. "extraDates.releaseDate"
+NESTED_FIELDS = ["extraDates", "extraFields"]
 
 GOOGLE_CACHE_VERSION_URL = "https://webcache.googleusercontent.com/search?q=cache:"
 
@@ -47,28 +51,15 @@ CONFIG_CONTEXT = {"context_settings": {"help_option_names": ["-h", "--help"]}}
 APP_NAME = os.environ.get("APP_NAME", "apexa")
 DOWNLOAD_PATH = os.environ.get("DOWNLOAD_PATH") or os.getcwd() + "/downloads"
 
-LOG_FILE_INTEGRATIR = os.environ.get(
-    "APEXA_INTEGRATOR_LOG_FILE", "/var/log/apexa_integrator.log"
-)
-LOG_FORMAT = "%(asctime)s %(levelname)-8s [%(name)s] %(message)s"
-
 QUARTER_DATE_PATTERN = r"Q[1-4].*\d{4}"
 QUARTER_PATTERN = r"Q[1-4]"
 YEAR_PATTERN = r"\d{4}"
 
 
-def get_logger(name: str):
-    """Return a logger with the given name.
-
-    :param name: the name of the logger
-    """
-    logging.basicConfig(format=LOG_FORMAT, level=logging.INFO)
-    return logging.getLogger(name)
-
-
 # Setup logger
 LOG = get_logger(__name__)
 
+
 # time and date related functions
 def sleep_seconds(secs: int):
     """Sleep for the given number of seconds.
@@ -164,7 +155,7 @@ def delete_downloaded_file(file_name: str):
     try:
         os.remove(f"{DOWNLOAD_PATH}/{file_name}")
     except FileNotFoundError:
-        LOG.error(f"File not found: {file_name}")
+        LOG.error("File not found: %s", file_name)
     except Exception as err:
         LOG.exception(err)
 
@@ -197,7 +188,10 @@ def convert_table_to_pandas_dataframe(html_table_elements: list) -> list[DATAFRA
     :param html_table_elements: list of html table elements
     :returns list of coverted pandas dataframes
     """
-    return read_html(str(html_table_elements))
+    with metrics.span("read_html") as span:
+        tables = read_html(str(html_table_elements))
+        span.add(rows=sum(len(table) for table in tables))
+    return tables
 
 
 def drop_multilevel_index(dataframe: DATAFRAME, level: int = 0) -> DATAFRAME:
@@ -221,13 +215,35 @@ def combine_multi_index(dataframe: DATAFRAME) -> DATAFRAME:
     return dataframe
 
 
+def nest_columns(dataframe: DATAFRAME) -> DATAFRAME:
+    """Turn prefixed columns of NESTED_FIELDS into columns of dictionaries.
+
+    :param dataframe: formatted dataframe, e.g. with "extraDates.releaseDate"
+    :returns dataframe with an "extraDates" column instead, or the same
+        dataframe if it has no prefixed columns
+    """
+    for field in NESTED_FIELDS:
+        prefix = f"{field}."
+        columns = [col for col in dataframe.columns if str(col).startswith(prefix)]
+        if not columns:
+            continue
+        keys = [column[len(prefix) :] for column in columns]
+        values = zip(*(dataframe[column].to_numpy(object) for column in columns))
+        position = dataframe.columns.get_loc(columns[0])
+        dataframe = dataframe.drop(columns=columns)
+        dataframe.insert(position, field, [dict(zip(keys, row)) for row in values])
+    return dataframe
+
+
 def pandas_df_to_json(dataframe: DATAFRAME) -> list[dict]:
     """Convert dataframe into list of dict with column_name as key.
 
+    Prefixed columns of NESTED_FIELDS become one dictionary per record.
+
     :param dataframe: Dataframe to be converted
     :return list_dict: list[dict]
     """
-    json_records = dataframe.to_json(orient="records")
+    json_records = nest_columns(dataframe).to_json(orient="records")
     return json.loads(json_records)
 
 
@@ -247,15 +263,27 @@ def os_abspath(file: str) -> str:
 
 
 # selenium related functions
-def init_chrome_web_driver() -> WEBDRIVER:
+def init_chrome_web_driver(
+    options: webdriver.ChromeOptions = None, debugger_address: str = None
+) -> WEBDRIVER:
     """Create a new instance of Chrome driver for scrapping.
 
+    :param options: Chrome options of a browser profile, stock Chrome if None
+    :param debugger_address: host:port of a running Chrome to attach to
     :return driver: Chrome driver
     """
-    options = webdriver.ChromeOptions()
-    prefs = {"download.default_directory": DOWNLOAD_PATH}
-    options.add_experimental_option("prefs", prefs)
-    options.headless = True
+    options = options or webdriver.ChromeOptions()
+    if debugger_address:
+        # A running browser keeps the flags and preferences it was started with
+        attached = webdriver.ChromeOptions()
+        attached.page_load_strategy = options.page_load_strategy
+        attached.debugger_address = debugger_address
+        options = attached
+    else:
+        prefs = {"download.default_directory": DOWNLOAD_PATH}
+        prefs.update(options.experimental_options.get("prefs", {}))
+        options.add_experimental_option("prefs", prefs)
+        options.headless = True
     driver = webdriver.Chrome(
         executable_path=os_abspath("chromedriver"), options=options
     )
@@ -295,8 +323,11 @@ def web_driver_find_elements(
     :param value: locator value
     :param is_list: bool, whether to find multi elements
     """
-    html = driver.page_source
-    soup = BeautifulSoup(html, "html.parser")
+    with metrics.span("page_source") as span:
+        html = driver.page_source
+        span.add(nbytes=len(html))
+    with metrics.span("html_parse"):
+        soup = BeautifulSoup(html, "html.parser")
     attributes = attributes if attributes is not None else {}
     return (
         soup.find_all(html_tag, attributes)
@@ -389,33 +420,6 @@ def metadata_entry_points():
     return metadata.entry_points()
 
 
-def convert_data_to_save_in_file(data: DATAFRAME, filetype: str) -> str:
-    """Convert data to file writeable string format.
-
-    :param data: data to be converted
-    :param filetype: file type
-    :returns file writeable string for respective file type
-    """
-    data_conversion = {
-        "json": json.dumps(pandas_df_to_json(data)),
-        "csv": data.to_csv(index=False),
-    }
-    return data_conversion[filetype]
-
-
-# Project utils
-def save_to_file(data: dict, file_name: str, file_type: str):
-    """save data into a file `name`
-
-    :param data: data to be saved
-    :param file_name: Output file name
-    :param file_type: Output file type
-    """
-    file_type_lower = file_type.lower()
-    with open(f"{file_name}.{file_type_lower}", "w", encoding="utf-8") as outfile:
-        outfile.write(convert_data_to_save_in_file(data, file_type.lower()))
-
-
 def generate_uuid() -> str:
     """Generate a random uuid.
 
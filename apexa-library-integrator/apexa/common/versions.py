@@ -0,0 +1,102 @@
+"""Numeric parsing of the product versions scrapers emit.
+
+Scrapers publish versions as version families like "9.x" or "10.0.x", or
+as exact versions like "12.3.1". Both parse to up to VERSION_PARTS
+integers, missing parts are 0. A family only fixes its leading parts.
+The integers are the sort keys of a version, so scrapers order and
+deduplicate whole columns without comparing strings.
+"""
+
+import re
+
+import numpy
+from pandas import factorize
+
+from apexa.common._typings import DATAFRAME, SERIES
+
+VERSION_PARTS = 4
+PART_COLUMNS = [f"part{number}" for number in range(VERSION_PARTS)]
+# Leading dotted number of a text, e.g. "10.0" in "10.0 SP2"
+VERSION_PATTERN = re.compile(r"(\d+)" + r"(?:\.(\d+))?" * (VERSION_PARTS - 1))
+# Trailing wildcard of a version family, e.g. ".x" in "10.0.x"
+WILDCARD_PATTERN = re.compile(r"(?:^|\.)\s*[x*]\s*$", re.IGNORECASE)
+# Leading digits and dots of a text, e.g. "23.01" in "23.01 beta"
+FAMILY_PATTERN = re.compile(r"^((?:\.*\d+)*)")
+
+
+def parse_version(text: str) -> tuple:
+    """Parse a single version.
+
+    :param text: version, e.g. "10.0.x" or "12.3.1"
+    :returns tuple of VERSION_PARTS integers, number of parsed parts and
+        whether the version is a family
+    """
+    text = str(text or "")
+    match = VERSION_PATTERN.search(text)
+    groups = match.groups() if match else ()
+    parts = [int(group) for group in groups if group is not None]
+    padded = tuple(parts) + (0,) * (VERSION_PARTS - len(parts))
+    return padded, len(parts), bool(WILDCARD_PATTERN.search(text))
+
+
+def parse_versions(versions: SERIES) -> DATAFRAME:
+    """Parse a series of versions at once.
+
+    :param versions: version strings
+    :returns dataframe of PART_COLUMNS, "length", the number of parsed
+        parts, and "wildcard", True for version families
+    """
+    text = versions.fillna("").astype(str)
+    parts = text.str.extract(VERSION_PATTERN)
+    parts.columns = PART_COLUMNS
+    parsed = parts.fillna(0).astype(numpy.int64)
+    parsed["length"] = parts.notna().sum(axis=1).astype(numpy.int8)
+    parsed["wildcard"] = text.str.contains(WILDCARD_PATTERN)
+    return parsed
+
+
+def version_families(versions: SERIES) -> SERIES:
+    """Reduce versions to their version family, e.g. "23.01 beta" to "23.01.x".
+
+    :param versions: version texts
+    :returns version families
+    """
+    return versions.astype(str).str.extract(FAMILY_PATTERN, expand=False) + ".x"
+
+
+def latest_per_family(
+    frame: DATAFRAME, name_column: str, version_column: str
+) -> DATAFRAME:
+    """Keep the first row of every version of a product, newest versions first.
+
+    Products keep the order they first appear in. Versions parsing to the
+    same numbers but written differently, e.g. "1.01.x" and "1.1.x", or
+    differing beyond VERSION_PARTS parts, are all kept, in the order they
+    first appear in. Rows of equal versions keep their order, so the first
+    of them is kept.
+
+    :param frame: scraped rows
+    :param name_column: column of the product names
+    :param version_column: column of the versions
+    :returns deduplicated and ordered rows
+    """
+    parsed = parse_versions(frame[version_column])
+    products = factorize(frame[name_column])[0]
+    texts = factorize(frame[version_column].astype(str))[0]
+    keys = numpy.column_stack(
+        [
+            products,
+            parsed[PART_COLUMNS].to_numpy(),
+            parsed["length"].to_numpy(),
+            texts,
+        ]
+    )
+    # lexsort is stable and sorts by its last key first: product in order
+    # of appearance, every version part descending, then the version text
+    # in order of appearance
+    descending = [-keys[:, column] for column in range(keys.shape[1] - 2, 0, -1)]
+    order = numpy.lexsort([keys[:, -1]] + descending + [keys[:, 0]])
+    keys = keys[order]
+    first = numpy.ones(len(order), dtype=bool)
+    first[1:] = (keys[1:] != keys[:-1]).any(axis=1)
+    return frame.iloc[order[first]]
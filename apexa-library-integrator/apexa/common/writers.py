@@ -0,0 +1,219 @@
+"""Streaming writers of scraped data saved by test runs.
+
+Rows are converted and written a chunk at a time, so no output file is
+ever held in memory as one document. Every requested format is fed from
+the same pass over the rows. Parquet and Feather need pyarrow, the other
+formats only pandas.
+"""
+
+import os
+
+from apexa.common._typings import DATAFRAME
+from apexa.config.default import OUTPUT_CHUNK_ROWS, OUTPUT_TYPES
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional dependency
+    pyarrow = None
+
+ARROW_TYPES = ["parquet", "feather"]
+
+
+def parse_output_types(text: str) -> list[str]:
+    """Parse the output file types of a test run.
+
+    :param text: comma separated types, e.g. "csv,jsonl"
+    :returns output types, in the given order
+    :raises ValueError: if a type is unknown or needs pyarrow
+    """
+    output_types = []
+    for output_type in (part.strip().lower() for part in (text or "").split(",")):
+        if not output_type or output_type in output_types:
+            continue
+        if output_type not in OUTPUT_TYPES:
+            raise ValueError(
+                f"Unknown output type '{output_type}', expected one of "
+                f"{', '.join(OUTPUT_TYPES)}"
+            )
+        if output_type in ARROW_TYPES and pyarrow is None:
+            raise ValueError(f"Output type '{output_type}' needs pyarrow installed")
+        output_types.append(output_type)
+    if not output_types:
+        raise ValueError("No output type given")
+    return output_types
+
+
+class FileWriter:
+    """Writes a dataframe chunk by chunk to a temporary file.
+
+    The file only replaces file_name once every chunk was written, a failed
+    run never leaves a truncated output behind.
+    """
+
+    binary = False
+
+    def __init__(self, file_name: str, frame: DATAFRAME):
+        """Open the file.
+
+        :param file_name: output file
+        :param frame: dataframe to write, only its columns are used here
+        """
+        self.file_name = file_name
+        self.tmp_file = f"{file_name}.tmp"
+        if self.binary:
+            self.file = open(self.tmp_file, "wb")  # pylint: disable=R1732
+        else:
+            self.file = open(  # pylint: disable=R1732
+                self.tmp_file, "w", encoding="utf-8", newline=""
+            )
+        self.rows = 0
+        try:
+            self.start(frame)
+        except BaseException:
+            self.close(complete=False)
+            raise
+
+    def start(self, frame: DATAFRAME):
+        """Write what precedes the rows.
+
+        :param frame: dataframe to write
+        """
+
+    def write_rows(self, chunk: DATAFRAME):
+        """Write a chunk of rows.
+
+        :param chunk: rows of the dataframe
+        """
+        raise NotImplementedError
+
+    def finish(self):
+        """Write what follows the rows."""
+
+    def write(self, chunk: DATAFRAME):
+        """Write a chunk of rows.
+
+        :param chunk: rows of the dataframe
+        """
+        if len(chunk):
+            self.write_rows(chunk)
+            self.rows += len(chunk)
+
+    def close(self, complete: bool = True):
+        """Close the file, keeping it only if it is complete.
+
+        :param complete: False to discard the file
+        """
+        try:
+            if complete:
+                self.finish()
+        finally:
+            self.file.close()
+        if complete:
+            os.replace(self.tmp_file, self.file_name)
+        else:
+            os.remove(self.tmp_file)
+
+
+class CSVWriter(FileWriter):
+    """CSV with a header line."""
+
+    def start(self, frame: DATAFRAME):
+        frame.head(0).to_csv(self.file, index=False)
+
+    def write_rows(self, chunk: DATAFRAME):
+        chunk.to_csv(self.file, header=False, index=False)
+
+
+class JSONLinesWriter(FileWriter):
+    """One JSON object per row and line."""
+
+    def write_rows(self, chunk: DATAFRAME):
+        self.file.write(chunk.to_json(orient="records", lines=True).rstrip("\n"))
+        self.file.write("\n")
+
+
+class JSONWriter(FileWriter):
+    """A JSON array of row objects."""
+
+    def start(self, frame: DATAFRAME):
+        self.file.write("[")
+
+    def write_rows(self, chunk: DATAFRAME):
+        if self.rows:
+            self.file.write(",")
+        # Strip the brackets, the chunks are items of one array
+        self.file.write(chunk.to_json(orient="records")[1:-1])
+
+    def finish(self):
+        self.file.write("]")
+
+
+class ArrowWriter(FileWriter):
+    """Columnar file written a record batch per chunk."""
+
+    binary = True
+
+    def start(self, frame: DATAFRAME):
+        # Inferred once from all rows, a chunk of empty cells says nothing
+        self.schema = pyarrow.Schema.from_pandas(frame, preserve_index=False)
+        self.writer = self.open_writer()
+
+    def open_writer(self):
+        """Return a pyarrow writer over the open file."""
+        raise NotImplementedError
+
+    def write_rows(self, chunk: DATAFRAME):
+        self.writer.write_table(
+            pyarrow.Table.from_pandas(chunk, schema=self.schema, preserve_index=False)
+        )
+
+    def finish(self):
+        self.writer.close()
+
+
+class ParquetWriter(ArrowWriter):
+    """Parquet, a row group per chunk."""
+
+    def open_writer(self):
+        return pyarrow.parquet.ParquetWriter(self.file, self.schema)
+
+
+class FeatherWriter(ArrowWriter):
+    """Feather version 2, which is the Arrow IPC file format."""
+
+    def open_writer(self):
+        return pyarrow.ipc.new_file(self.file, self.schema)
+
+
+WRITERS = {
+    "csv": CSVWriter,
+    "json": JSONWriter,
+    "jsonl": JSONLinesWriter,
+    "parquet": ParquetWriter,
+    "feather": FeatherWriter,
+}
+
+
+def save_to_file(data: DATAFRAME, file_name: str, file_type: str) -> list[str]:
+    """Save data to one file per output type in a single pass.
+
+    :param data: data to be saved
+    :param file_name: output file name, without extension
+    :param file_type: output file types, comma separated, e.g. "csv,parquet"
+    :returns paths of the written files
+    """
+    writers = []
+    complete = False
+    try:
+        for output_type in parse_output_types(file_type):
+            writers.append(WRITERS[output_type](f"{file_name}.{output_type}", data))
+        for start in range(0, len(data), OUTPUT_CHUNK_ROWS):
+            chunk = data.iloc[start : start + OUTPUT_CHUNK_ROWS]
+            for writer in writers:
+                writer.write(chunk)
+        complete = True
+    finally:
+        for writer in writers:
+            writer.close(complete)
+    return [writer.file_name for writer in writers]
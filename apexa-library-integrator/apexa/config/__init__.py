@@ -1,12 +1,13 @@
 """Integrator configuration management module."""
 
+import json
+import os
 from typing import Optional, Union
 
 from diskcache import Cache
 
-from apexa.cli.utils import click_echo
 from apexa.common.util import get_logger
-from apexa.config.default import CACHE_DIR
+from apexa.config.default import CACHE_DIR, CONFIG_FILE, RABBIT_SETTINGS
 
 LOG = get_logger(__name__)
 
@@ -19,11 +20,43 @@ class ConfigBaseException(Exception):
         super().__init__(self.message)
 
 
-class Config:
-    """Collector configuration management class."""
+def file_signature(file_names: list) -> tuple:
+    """Return modification times of files, None for missing ones.
+
+    :param file_names: list of file paths
+    :returns tuple of modification times
+    """
+    signature = []
+    for file_name in file_names:
+        try:
+            signature.append(os.stat(file_name).st_mtime_ns)
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
 
-    def __init__(self):
-        self.cache = Cache(CACHE_DIR)
+class Config:
+    """Collector configuration management class.
+
+    Values are resolved from environment variables, then the config file,
+    then the diskcache store, and kept in memory until either file changes.
+    """
+
+    def __init__(self, config_file: str = CONFIG_FILE, cache_dir: str = CACHE_DIR):
+        self.config_file = config_file
+        self.cache_dir = cache_dir
+        # diskcache keeps its data in SQLite, writes land in the WAL file first
+        self.cache_files = [f"{cache_dir}/cache.db", f"{cache_dir}/cache.db-wal"]
+        self._cache = None
+        self._settings: dict = {}
+        self._signature = None
+
+    @property
+    def cache(self) -> Cache:
+        """Open the diskcache store on first use."""
+        if self._cache is None:
+            self._cache = Cache(self.cache_dir)
+        return self._cache
 
     def get_cache(self, key: str) -> Union[dict, str]:
         """Returns the cache value for key.
@@ -31,10 +64,17 @@ class Config:
         :param key: str cache key name
         :return: dict cache value
         """
-        value = self.cache.get(key)
+        settings = self.settings()
+        if key not in settings:
+            settings[key] = self._resolve(key, self._read_config_file())
+
+        value = settings[key]
         if value:
             return value
 
+        # Imported here as apexa.cli imports this module while initializing
+        from apexa.cli.utils import click_echo  # pylint: disable=C0415
+
         click_echo(
             "Rabbit Credentials are not set. "
             "Please set your credentials using `setup-rabbit` command.",
@@ -42,6 +82,54 @@ class Config:
         )
         raise ConfigBaseException(f"Credential {key} is not set")
 
+    def settings(self) -> dict:
+        """Return resolved settings, reloading them if a source file changed.
+
+        :returns dictionary of setting name to value
+        """
+        signature = file_signature([self.config_file] + self.cache_files)
+        if signature != self._signature:
+            config_file = self._read_config_file()
+            self._settings = {
+                key: self._resolve(key, config_file) for key in RABBIT_SETTINGS
+            }
+            self._signature = signature
+        return self._settings
+
+    def _resolve(self, key: str, config_file: dict) -> Union[dict, str, None]:
+        """Resolve a single value from environment, config file and diskcache.
+
+        :param key: setting name
+        :param config_file: parsed config file
+        :returns setting value or None
+        """
+        if os.environ.get(key):
+            return os.environ[key]
+        if config_file.get(key):
+            return config_file[key]
+        if not os.path.isdir(self.cache_dir):
+            return None
+
+        try:
+            return self.cache.get(key)
+        except Exception as err:
+            LOG.debug("Unable to read %s from %s: %s", key, self.cache_dir, err)
+            return None
+
+    def _read_config_file(self) -> dict:
+        """Read the JSON config file.
+
+        :returns parsed config, empty if the file is missing or invalid
+        """
+        try:
+            with open(self.config_file, encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as err:
+            LOG.warning("Ignoring unreadable config file %s: %s", self.config_file, err)
+            return {}
+
     def set_cache(
         self, key: str, value: Union[dict, str], expire: Optional[int] = None
     ) -> None:
@@ -59,10 +147,12 @@ class Config:
             raise ConfigBaseException(
                 f"Setting {key} in cache as {value} is not supported"
             )
+        self._signature = None
         return self.cache.set(key=key, value=value, expire=expire)
 
     def clear_cache(self) -> None:
         """Clear the cache."""
+        self._signature = None
         return self.cache.clear()
 
 
@@ -14,3 +14,101 @@ SCRAPER_INTEGRATOR_SOFTWARE_ROUTING_KEY = "mdm.scraper.software.integrator"
 DEFAULT_BASE_CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".apexa")
 BASE_CONFIG_DIR = os.environ.get("APEXADIR", DEFAULT_BASE_CONFIG_DIR)
 CACHE_DIR = f"{BASE_CONFIG_DIR}/cache"
+
+SCRAPPER_ENTRY_POINT_GROUP = "apexa-library-integrator.source"
+PLUGIN_INDEX_FILE = f"{BASE_CONFIG_DIR}/plugins.json"
+
+CONFIG_FILE = os.environ.get("APEXA_CONFIG_FILE", f"{BASE_CONFIG_DIR}/config.json")
+RABBIT_SETTINGS = ["RABBIT_HOST", "RABBIT_PORT", "RABBIT_USER", "RABBIT_PASSWORD"]
+
+CASSETTE_DIR = f"{BASE_CONFIG_DIR}/cassettes"
+
+HTTP_TIMEOUT = 30  # 30 seconds
+HTTP_USER_AGENT = os.environ.get(
+    "APEXA_HTTP_USER_AGENT",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/110.0 Safari/537.36",
+)
+
+SCHEDULE_FILE = os.environ.get(
+    "APEXA_SCHEDULE_FILE", f"{BASE_CONFIG_DIR}/schedule.json"
+)
+DAEMON_DEFAULT_CRON = "0 */6 * * *"  # every 6 hours
+DAEMON_DEFAULT_JITTER = 300  # 5 minutes
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8765
+
+REVISIT_STATE_FILE = f"{BASE_CONFIG_DIR}/revisit.json"
+REVISIT_MIN_INTERVAL = 60 * 60  # 1 hour
+REVISIT_MAX_INTERVAL = 7 * 24 * 60 * 60  # 1 week
+
+# Per host politeness of page fetches
+FETCH_RATE = 1.0  # requests per second
+FETCH_BURST = 3
+FETCH_MAX_CONCURRENCY = 4
+FETCH_TARGET_LATENCY = 10  # seconds
+FETCH_MAX_RETRIES = 2
+FETCH_MAX_RETRY_AFTER = 300  # 5 minutes
+
+# Time budgets in seconds of a scraper run, "total" covers the whole run
+DEADLINE_STAGES = ["navigation", "readiness", "parse", "publish"]
+DEFAULT_DEADLINES = {"total": 15 * 60, "navigation": 2 * 60}
+
+# Long lived browser shared by CLI runs, see "apexa browser start"
+BROWSER_ADDRESS = os.environ.get("APEXA_BROWSER_ADDRESS")
+BROWSER_PORT = 9222
+BROWSER_PID_FILE = f"{BASE_CONFIG_DIR}/browser.pid"
+BROWSER_STATE_FILE = f"{BASE_CONFIG_DIR}/browser.json"
+BROWSER_PROFILE_DIR = f"{BASE_CONFIG_DIR}/chrome-profile"
+BROWSER_MAX_RSS = 1536 * 1024 * 1024  # 1.5 GiB
+BROWSER_CHECK_INTERVAL = 5  # seconds
+CHROME_BINARY = os.environ.get("CHROME_BINARY")
+
+RESULT_CACHE_DIR = f"{BASE_CONFIG_DIR}/results"
+RESULT_CACHE_TTL = 60 * 60  # 1 hour
+
+RUNS_DIR = f"{BASE_CONFIG_DIR}/runs"
+RUNS_KEPT = 20
+
+DISPATCH_JOB_QUEUE = "apexa.scrape.jobs"
+DISPATCH_RESULT_QUEUE = "apexa.scrape.results"
+DISPATCH_PREFETCH = 1
+DISPATCH_WAIT = 60 * 60  # 1 hour
+
+# Offline benchmarks of the scraper pipelines, see "apexa perf bench"
+BENCH_BASELINE_FILE = f"{BASE_CONFIG_DIR}/bench-baseline.json"
+BENCH_REPEAT = 5
+BENCH_THRESHOLD = 0.25  # 25% slower or heavier than the baseline
+BENCH_MIN_SECONDS = 0.005  # slowdowns below this are noise
+BENCH_MIN_BYTES = 256 * 1024  # so is memory growth below this
+
+# Synthetic feeds of "apexa perf load"
+LOAD_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+LOAD_EXTRA_DATES = 2
+LOAD_CARDINALITY = 1000  # distinct product names
+
+# Run metrics kept across runs, see "apexa perf report"
+HISTORY_FILE = f"{BASE_CONFIG_DIR}/history.db"
+HISTORY_RETENTION = 180 * 24 * 60 * 60  # 180 days
+HISTORY_WINDOW = 20  # earlier runs forming the baseline
+HISTORY_MIN_RUNS = 5  # fewer earlier runs are no baseline
+HISTORY_Z_SCORE = 3.0
+HISTORY_MIN_CHANGE = 0.1  # 10%
+HISTORY_MIN_SECONDS = 0.01  # slowdowns below this are noise
+
+# Files written by --test runs, see apexa.common.writers
+OUTPUT_TYPES = ["csv", "json", "jsonl", "parquet", "feather"]
+OUTPUT_CHUNK_ROWS = 10_000  # rows converted and written at a time
+
+# Formatted output of every run, see "apexa snapshots"
+SNAPSHOT_DIR = f"{BASE_CONFIG_DIR}/snapshots"
+SNAPSHOT_COMPACT_AFTER = 7 * 24 * 60 * 60  # older days are merged into one file
+FINGERPRINT_DIR = f"{BASE_CONFIG_DIR}/fingerprints"
+
+# Formatted text columns with at most this share of distinct values become
+# categoricals, see apexa.common.schema
+SCHEMA_CATEGORY_RATIO = 0.5
+
+# Read-only endpoint of "apexa lookup serve"
+LOOKUP_HOST = "127.0.0.1"
+LOOKUP_PORT = 8766
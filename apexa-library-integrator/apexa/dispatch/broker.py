@@ -0,0 +1,262 @@
+"""In-process stand-in for the parts of RabbitMQ the integrator uses.
+
+LocalBroker mimics a pika BlockingConnection closely enough to run the
+publisher, the dispatch coordinator and workers without a RabbitMQ server,
+in tests and benchmarks. Only the default exchange routes to queues, other
+exchanges record what was published to them.
+"""
+
+import itertools
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+
+
+class Delivery:
+    """Method frame of a delivered message."""
+
+    def __init__(self, delivery_tag: int, routing_key: str, redelivered: bool):
+        self.delivery_tag = delivery_tag
+        self.routing_key = routing_key
+        self.redelivered = redelivered
+        self.exchange = ""
+
+
+class LocalBroker:
+    """Queues shared by every connection made to the broker."""
+
+    def __init__(self):
+        self.queues: dict = defaultdict(deque)
+        self.published: dict = defaultdict(list)
+        self.condition = threading.Condition()
+        self._tags = itertools.count(1)
+
+    def connect(self) -> "LocalConnection":
+        """Open a connection, usable as a connection factory.
+
+        :returns connection to the broker
+        """
+        return LocalConnection(self)
+
+    def enqueue(self, queue_name: str, message: tuple, front: bool = False):
+        """Store a message and wake up waiting connections.
+
+        :param queue_name: queue name
+        :param message: (body, properties, redelivered) tuple
+        :param front: put the message back at the head of the queue
+        """
+        with self.condition:
+            if front:
+                self.queues[queue_name].appendleft(message)
+            else:
+                self.queues[queue_name].append(message)
+            self.condition.notify_all()
+
+    def next_tag(self) -> int:
+        """Return a new delivery tag."""
+        return next(self._tags)
+
+
+class LocalChannel:
+    """Channel of a local connection."""
+
+    def __init__(self, connection: "LocalConnection"):
+        self.connection = connection
+        self.broker = connection.broker
+        self.is_open = True
+        self.prefetch_count = 0
+        self.consumers: dict = {}
+        self.unacked: dict = {}
+        self._consuming = False
+
+    def queue_declare(self, queue: str, **kwargs):  # pylint: disable=W0621,W0613
+        """Create a queue if it does not exist.
+
+        :param queue: queue name
+        """
+        with self.broker.condition:
+            _ = self.broker.queues[queue]
+
+    def queue_delete(self, queue: str):  # pylint: disable=W0621
+        """Delete a queue and its messages.
+
+        :param queue: queue name
+        """
+        with self.broker.condition:
+            self.broker.queues.pop(queue, None)
+
+    def confirm_delivery(self, *args, **kwargs):
+        """Publishes are always confirmed by the local broker."""
+
+    def basic_qos(self, prefetch_count: int = 0, **kwargs):  # pylint: disable=W0613
+        """Limit unacknowledged deliveries of the channel.
+
+        :param prefetch_count: maximum unacked messages, 0 for no limit
+        """
+        self.prefetch_count = prefetch_count
+
+    def basic_publish(self, exchange: str, routing_key: str, body, properties=None):
+        """Publish a message.
+
+        :param exchange: exchange name, "" routes to the queue named routing_key
+        :param routing_key: routing key
+        :param body: message body
+        :param properties: message properties
+        """
+        # pika sends text bodies UTF-8 encoded
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        if exchange:
+            with self.broker.condition:
+                self.broker.published[exchange].append((routing_key, body))
+            return
+        with self.broker.condition:
+            # Like RabbitMQ, drop messages routed to no queue
+            if routing_key not in self.broker.queues:
+                return
+        self.broker.enqueue(routing_key, (body, properties, False))
+
+    def basic_consume(
+        self, queue: str, on_message_callback, **kwargs
+    ):  # pylint: disable=W0621,W0613
+        """Deliver messages of a queue to a callback.
+
+        :param queue: queue name
+        :param on_message_callback: called with channel, method, properties, body
+        :returns consumer tag
+        """
+        tag = f"ctag{self.broker.next_tag()}"
+        self.consumers[tag] = (queue, on_message_callback)
+        return tag
+
+    def basic_cancel(self, consumer_tag: str):
+        """Stop a consumer.
+
+        :param consumer_tag: tag returned by basic_consume
+        """
+        self.consumers.pop(consumer_tag, None)
+
+    def basic_get(self, queue: str, auto_ack: bool = False):  # pylint: disable=W0621
+        """Fetch a single message.
+
+        :param queue: queue name
+        :param auto_ack: acknowledge the message right away
+        :returns (method, properties, body), Nones if the queue is empty
+        """
+        with self.broker.condition:
+            messages = self.broker.queues[queue]
+            if not messages:
+                return None, None, None
+            body, properties, redelivered = messages.popleft()
+        method = Delivery(self.broker.next_tag(), queue, redelivered)
+        if not auto_ack:
+            self.unacked[method.delivery_tag] = (queue, body, properties)
+        return method, properties, body
+
+    def basic_ack(self, delivery_tag: int, **kwargs):  # pylint: disable=W0613
+        """Acknowledge a delivery.
+
+        :param delivery_tag: tag of the delivery
+        """
+        self.unacked.pop(delivery_tag, None)
+        with self.broker.condition:
+            self.broker.condition.notify_all()
+
+    def basic_nack(
+        self, delivery_tag: int, requeue: bool = True, **kwargs
+    ):  # pylint: disable=W0613
+        """Reject a delivery.
+
+        :param delivery_tag: tag of the delivery
+        :param requeue: put the message back for another consumer
+        """
+        queue_name, body, properties = self.unacked.pop(delivery_tag)
+        if requeue:
+            self.broker.enqueue(queue_name, (body, properties, True), front=True)
+
+    def deliver(self) -> bool:
+        """Hand waiting messages to consumers within the prefetch limit.
+
+        :returns True if anything was delivered
+        """
+        delivered = False
+        for queue_name, callback in list(self.consumers.values()):
+            while not self.prefetch_count or len(self.unacked) < self.prefetch_count:
+                method, properties, body = self.basic_get(queue_name)
+                if method is None:
+                    break
+                callback(self, method, properties, body)
+                delivered = True
+        return delivered
+
+    def start_consuming(self):
+        """Deliver messages until stop_consuming is called."""
+        self._consuming = True
+        while self._consuming and self.connection.is_open:
+            self.connection.process_data_events(time_limit=0.1)
+
+    def stop_consuming(self):
+        """Stop the start_consuming loop."""
+        self._consuming = False
+
+    def close(self):
+        """Close the channel, requeueing unacknowledged messages."""
+        for tag in list(self.unacked):
+            self.basic_nack(tag, requeue=True)
+        self.is_open = False
+
+
+class LocalConnection:
+    """Connection to a LocalBroker, mirrors pika.BlockingConnection."""
+
+    def __init__(self, broker: LocalBroker):
+        self.broker = broker
+        self.is_open = True
+        self.channels: list = []
+        self._callbacks: queue.Queue = queue.Queue()
+
+    def channel(self) -> LocalChannel:
+        """Open a channel.
+
+        :returns channel
+        """
+        channel = LocalChannel(self)
+        self.channels.append(channel)
+        return channel
+
+    def add_callback_threadsafe(self, callback):
+        """Run callback in the thread processing events of the connection.
+
+        :param callback: function without arguments
+        """
+        self._callbacks.put(callback)
+        with self.broker.condition:
+            self.broker.condition.notify_all()
+
+    def process_data_events(self, time_limit: float = 0):
+        """Run pending callbacks and deliver messages to consumers.
+
+        :param time_limit: seconds to wait for something to happen
+        """
+        deadline = time.monotonic() + (time_limit or 0)
+        while True:
+            busy = False
+            while not self._callbacks.empty():
+                self._callbacks.get()()
+                busy = True
+            for channel in list(self.channels):
+                if channel.is_open:
+                    busy = channel.deliver() or busy
+            remaining = deadline - time.monotonic()
+            if busy or remaining <= 0:
+                return
+            with self.broker.condition:
+                self.broker.condition.wait(remaining)
+
+    def close(self):
+        """Close the connection and its channels."""
+        for channel in self.channels:
+            if channel.is_open:
+                channel.close()
+        self.is_open = False
@@ -0,0 +1,121 @@
+"""Coordinator spreading scrape jobs over workers through RabbitMQ."""
+
+import time
+
+from apexa.common.plugins import scraper_plugins
+from apexa.common.publisher.publisher import init_blocking_connection
+from apexa.common.util import generate_uuid, get_logger
+from apexa.config.default import (
+    DISPATCH_JOB_QUEUE,
+    DISPATCH_RESULT_QUEUE,
+    DISPATCH_WAIT,
+)
+from apexa.dispatch.jobs import FINAL_STATUSES, decode, encode, job_properties
+
+LOG = get_logger(__name__)
+
+# Longest wait for broker events, so the collect timeout is honoured
+POLL_SECONDS = 1
+
+
+class Coordinator:
+    """Enqueues one job per scraper and gathers what workers report."""
+
+    def __init__(
+        self,
+        connection_factory=init_blocking_connection,
+        job_queue: str = DISPATCH_JOB_QUEUE,
+    ):
+        self.connection_factory = connection_factory
+        self.job_queue = job_queue
+        self.connection = None
+        self.channel = None
+
+    def _open(self):
+        """Connect on first use."""
+        if self.channel is None:
+            self.connection = self.connection_factory()
+            self.channel = self.connection.channel()
+            self.channel.confirm_delivery()
+            self.channel.queue_declare(queue=self.job_queue, durable=True)
+
+    def dispatch(
+        self, scrappers: list = None, test: bool = False, output_type: str = "csv"
+    ) -> dict:
+        """Enqueue a job for every scraper.
+
+        :param scrappers: names of scrapers, all registered ones by default
+        :param test: save results to files on the workers instead of publishing
+        :param output_type: type of output file
+        :returns dictionary of job id to job
+        """
+        self._open()
+        run_id = generate_uuid()
+        reply_to = f"{DISPATCH_RESULT_QUEUE}.{run_id}"
+        self.channel.queue_declare(queue=reply_to, durable=True)
+
+        names = scrappers or scraper_plugins.names()
+        jobs = {}
+        for name in names:
+            job = {
+                "job_id": generate_uuid(),
+                "run_id": run_id,
+                "scraper": name,
+                "test": test,
+                "output_type": output_type,
+                "reply_to": reply_to,
+            }
+            self.channel.basic_publish(
+                "", self.job_queue, body=encode(job), properties=job_properties(job)
+            )
+            jobs[job["job_id"]] = job
+        LOG.info("Dispatched %s scrape jobs for run %s", len(jobs), run_id)
+        return jobs
+
+    def collect(self, jobs: dict, timeout: float = DISPATCH_WAIT) -> dict:
+        """Wait for workers to finish the jobs of a run.
+
+        :param jobs: jobs returned by dispatch
+        :param timeout: seconds to wait for the last job
+        :returns dictionary of scraper name to its last reported status
+        """
+        self._open()
+        statuses = {job["scraper"]: {"status": "queued"} for job in jobs.values()}
+        pending = set(jobs)
+        if not pending:
+            return statuses
+        reply_to = next(iter(jobs.values()))["reply_to"]
+
+        def on_status(channel, method, properties, body):  # pylint: disable=W0613
+            status = decode(body)
+            channel.basic_ack(method.delivery_tag)
+            if status["job_id"] not in jobs:
+                return
+            statuses[status["scraper"]] = status
+            LOG.info(
+                "%s: %s on %s", status["scraper"], status["status"], status["worker"]
+            )
+            if status["status"] in FINAL_STATUSES:
+                pending.discard(status["job_id"])
+
+        consumer_tag = self.channel.basic_consume(
+            reply_to, on_message_callback=on_status
+        )
+        try:
+            deadline = time.monotonic() + timeout
+            while pending and time.monotonic() < deadline:
+                self.connection.process_data_events(time_limit=POLL_SECONDS)
+        finally:
+            # Statuses of jobs still running are dropped with the queue
+            self.channel.basic_cancel(consumer_tag)
+            self.channel.queue_delete(queue=reply_to)
+
+        if pending:
+            LOG.warning("%s jobs still running after %ss", len(pending), timeout)
+        return statuses
+
+    def close(self):
+        """Close the broker connection."""
+        if self.connection is not None:
+            self.connection.close()
+        self.connection = self.channel = None
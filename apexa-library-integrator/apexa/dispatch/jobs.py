@@ -0,0 +1,83 @@
+"""Messages exchanged by the dispatch coordinator and its workers."""
+
+import json
+
+from pika import BasicProperties
+
+from apexa.common.util import get_isoformated_date, json_dumps
+
+STARTED = "started"
+DONE = "done"
+FAILED = "failed"
+RETRYING = "retrying"
+TIMED_OUT = "timeout"
+UNAVAILABLE = "unavailable"
+# Statuses after which a job will not report again
+FINAL_STATUSES = [DONE, FAILED, TIMED_OUT, UNAVAILABLE]
+
+PERSISTENT = 2
+
+
+def encode(message: dict) -> bytes:
+    """Serialize a job or status message.
+
+    :param message: message fields
+    :returns message body
+    """
+    return json_dumps(message).encode("utf-8")
+
+
+def decode(body: bytes) -> dict:
+    """Deserialize a job or status message.
+
+    :param body: message body
+    :returns message fields
+    """
+    return json.loads(body)
+
+
+def job_properties(job: dict) -> BasicProperties:
+    """Return the AMQP properties of a job.
+
+    :param job: job fields
+    :returns persistent message properties, replies go to the run's queue
+    """
+    return BasicProperties(
+        delivery_mode=PERSISTENT,
+        correlation_id=job["job_id"],
+        reply_to=job["reply_to"],
+        content_type="application/json",
+    )
+
+
+def status_properties(job: dict) -> BasicProperties:
+    """Return the AMQP properties of a status report.
+
+    :param job: job fields
+    :returns persistent message properties
+    """
+    return BasicProperties(
+        delivery_mode=PERSISTENT,
+        correlation_id=job["job_id"],
+        content_type="application/json",
+    )
+
+
+def status_message(job: dict, status: str, worker: str, **fields) -> dict:
+    """Build the status report of a job.
+
+    :param job: job fields
+    :param status: job status
+    :param worker: id of the reporting worker
+    :param fields: extra values, e.g. rows, seconds or error
+    :returns status fields
+    """
+    return {
+        "job_id": job["job_id"],
+        "run_id": job["run_id"],
+        "scraper": job["scraper"],
+        "status": status,
+        "worker": worker,
+        "timestamp": get_isoformated_date(),
+        **fields,
+    }
@@ -0,0 +1,201 @@
+"""Worker consuming scrape jobs from the dispatch queue."""
+
+import os
+import socket
+import threading
+import time
+
+from apexa.common.browser import browser_pool
+from apexa.common.controller import scraper_controller
+from apexa.common.deadline import DeadlineExceeded
+from apexa.common.log import log_context
+from apexa.common.metrics import metrics
+from apexa.common.plugins import scraper_plugins
+from apexa.common.publisher.publisher import init_blocking_connection
+from apexa.common.result_cache import result_cache
+from apexa.common.util import generate_uuid, get_logger
+from apexa.config.default import DISPATCH_JOB_QUEUE, DISPATCH_PREFETCH
+from apexa.dispatch.jobs import (
+    DONE,
+    FAILED,
+    RETRYING,
+    STARTED,
+    TIMED_OUT,
+    UNAVAILABLE,
+    decode,
+    encode,
+    status_message,
+    status_properties,
+)
+
+LOG = get_logger(__name__)
+
+# Longest wait for broker events, so stop requests are noticed
+POLL_SECONDS = 1
+
+
+def default_worker_id() -> str:
+    """Return an id telling workers apart across nodes.
+
+    :returns host name and process id
+    """
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class Worker:
+    """Runs scrape jobs, up to prefetch of them at a time.
+
+    Jobs run in their own threads while the main thread keeps the broker
+    connection alive, acknowledgements are handed back to it through
+    add_callback_threadsafe. A failed job is requeued once for another
+    worker, a job failing again is reported failed and dropped.
+
+    Jobs publish over their own connections, the shared broker session is
+    not safe to use from several job threads at once. Every publish retries
+    its messages from a registry of its own.
+    """
+
+    def __init__(
+        self,
+        connection_factory=init_blocking_connection,
+        prefetch: int = DISPATCH_PREFETCH,
+        worker_id: str = None,
+        job_queue: str = DISPATCH_JOB_QUEUE,
+    ):
+        self.connection_factory = connection_factory
+        self.prefetch = prefetch
+        self.worker_id = worker_id or default_worker_id()
+        self.job_queue = job_queue
+        self.connection = None
+        self.in_flight = 0
+        self.processed = 0
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def run(self, max_jobs: int = None):
+        """Consume jobs until stopped.
+
+        :param max_jobs: stop after this many jobs, None to run until stopped
+        """
+        # Dispatched runs exist to see fresh data
+        result_cache.configure(enabled=False)
+        metrics.configure(enabled=True, run_id=generate_uuid())
+        browser_pool.enable(max_idle=self.prefetch)
+        self.connection = self.connection_factory()
+        channel = self.connection.channel()
+        channel.queue_declare(queue=self.job_queue, durable=True)
+        channel.basic_qos(prefetch_count=self.prefetch)
+        consumer_tag = channel.basic_consume(
+            self.job_queue, on_message_callback=self.on_job
+        )
+        LOG.info("Worker %s consuming %s", self.worker_id, self.job_queue)
+
+        try:
+            while not self._stop.is_set():
+                if max_jobs is not None and self.processed >= max_jobs:
+                    break
+                self.connection.process_data_events(time_limit=POLL_SECONDS)
+            channel.basic_cancel(consumer_tag)
+            # Let running jobs finish and acknowledge them
+            while self.in_flight:
+                self.connection.process_data_events(time_limit=POLL_SECONDS)
+        finally:
+            self.connection.close()
+            browser_pool.close()
+            LOG.info("Worker %s stopped after %s jobs", self.worker_id, self.processed)
+
+    def stop(self):
+        """Stop taking jobs, finishing the running ones."""
+        self._stop.set()
+
+    def on_job(self, channel, method, properties, body):  # pylint: disable=W0613
+        """Start a delivered job in its own thread.
+
+        :param channel: channel the job came from
+        :param method: delivery method frame
+        :param properties: message properties
+        :param body: job message
+        """
+        job = decode(body)
+        with self._lock:
+            self.in_flight += 1
+        self.report(channel, job, STARTED)
+        threading.Thread(
+            target=self.execute,
+            args=(channel, method, job),
+            name=f"job-{job['scraper']}",
+            daemon=True,
+        ).start()
+
+    def execute(self, channel, method, job: dict):
+        """Run a job, then report and acknowledge it from the connection thread.
+
+        :param channel: channel the job came from
+        :param method: delivery method frame
+        :param job: job fields
+        """
+        with log_context(run_id=job["run_id"]):
+            status, fields = self.run_job(job)
+        requeue = status == FAILED and not method.redelivered
+        if requeue:
+            status = RETRYING
+
+        def finish():
+            self.report(channel, job, status, **fields)
+            if requeue:
+                channel.basic_nack(method.delivery_tag, requeue=True)
+            else:
+                channel.basic_ack(method.delivery_tag)
+            with self._lock:
+                self.in_flight -= 1
+                self.processed += 1
+
+        self.connection.add_callback_threadsafe(finish)
+
+    def run_job(self, job: dict) -> tuple:
+        """Run the scraper of a job.
+
+        :param job: job fields
+        :returns status and extra status fields
+        """
+        name = job["scraper"]
+        entry_point = scraper_plugins.sources().get(name)
+        if entry_point is None:
+            LOG.error("Scrapper '%s' is not available on %s", name, self.worker_id)
+            return UNAVAILABLE, {}
+
+        started = time.perf_counter()
+        try:
+            eol_data = scraper_controller.run_scrapper(
+                entry_point.load(),
+                name,
+                job["test"],
+                job["output_type"],
+                run_id=job["run_id"],
+            )
+        except DeadlineExceeded as err:
+            LOG.error("Timed out: %s", err)
+            return TIMED_OUT, {"error": str(err)}
+        except Exception as err:
+            LOG.exception("Job %s of '%s' failed: %s", job["job_id"], name, err)
+            return FAILED, {"error": str(err)}
+        return DONE, {
+            "rows": len(eol_data),
+            "seconds": time.perf_counter() - started,
+        }
+
+    def report(self, channel, job: dict, status: str, **fields):
+        """Send the status of a job to its coordinator.
+
+        :param channel: channel to publish on
+        :param job: job fields
+        :param status: job status
+        :param fields: extra status fields
+        """
+        message = status_message(job, status, self.worker_id, **fields)
+        channel.basic_publish(
+            "",
+            job["reply_to"],
+            body=encode(message),
+            properties=status_properties(job),
+        )
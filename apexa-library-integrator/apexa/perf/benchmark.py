@@ -0,0 +1,289 @@
+"""Offline benchmarks of the scraper pipelines over saved pages.
+
+Every scraper with a fixture in ``fixtures/``, named after its plugin, is
+run from that page instead of the site. The stages after the fetch are
+the ones a real run takes: parsing the page into a dataframe, formatting
+it, collecting it into a record batch and encoding the feed.
+
+Results carry BASELINE_VERSION, baselines of another version measured
+different stages and are not compared against.
+"""
+
+import glob
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from html import escape
+from typing import Optional
+
+from apexa.common.cassette import REPLAY, recorder
+from apexa.common.http_driver import TEXT_PAGE_SOURCE
+from apexa.common.metrics import metrics
+from apexa.common.plugins import scraper_plugins
+from apexa.common.records import RecordBatch, dumps_records
+from apexa.common.util import (
+    generate_uuid,
+    get_isoformated_date,
+    get_logger,
+    json_dumps,
+)
+from apexa.config.default import (
+    BENCH_MIN_BYTES,
+    BENCH_MIN_SECONDS,
+    BENCH_REPEAT,
+    BENCH_THRESHOLD,
+)
+
+LOG = get_logger(__name__)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+# Stages measured by the benchmark, in pipeline order
+STAGES = ["eol_data", "format_data", "record_batch", "json_encode"]
+# Bumped whenever a stage changes what it measures
+BASELINE_VERSION = 2
+# Stages the scrapers time themselves while parsing, reported without memory
+NESTED_STAGES = ["html_parse", "read_html", "fix_dates"]
+
+
+def fixture_path(name: str) -> Optional[str]:
+    """Return the saved page of a scraper.
+
+    :param name: scraper plugin name
+    :returns fixture path, None if the scraper has none
+    """
+    matches = sorted(glob.glob(os.path.join(FIXTURES_DIR, f"{name.lower()}.*")))
+    return matches[0] if matches else None
+
+
+def load_fixture(path: str) -> str:
+    """Return the page source a browser would expose for a fixture.
+
+    :param path: fixture path, .txt fixtures are plain text documents
+    :returns page source
+    """
+    with open(path, encoding="utf-8") as file:
+        content = file.read()
+    if path.endswith(".txt"):
+        return TEXT_PAGE_SOURCE.format(escape(content, quote=False))
+    return content
+
+
+def run_stages(api_class, measure) -> int:
+    """Run the pipeline of a scraper once against its recorded page.
+
+    :param api_class: scraper class
+    :param measure: called with stage, function and arguments, returns the result
+    :returns number of records
+    """
+    scraper = api_class(generate_uuid())
+    try:
+        scraped_data = measure("eol_data", scraper.eol_data_generator)
+        formatted = measure("format_data", scraper.format_data, scraped_data)
+        records = measure("record_batch", RecordBatch, formatted)
+        measure("json_encode", dumps_records, records)
+    finally:
+        scraper.close_browser()
+    return len(records)
+
+
+def trace_peaks(api_class) -> dict:
+    """Measure the peak memory each stage allocates.
+
+    :param api_class: scraper class
+    :returns dictionary of stage to peak traced bytes
+    """
+    peaks = {}
+
+    def measure(stage, func, *args):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        result = func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks[stage] = peak - before
+        return result
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        run_stages(api_class, measure)
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    return peaks
+
+
+def time_stages(api_class, repeat: int) -> tuple:
+    """Time each stage over several runs.
+
+    :param api_class: scraper class
+    :param repeat: number of runs
+    :returns number of records and dictionary of stage to run timings
+    """
+    timings = {}
+
+    def measure(stage, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        timings.setdefault(stage, []).append(time.perf_counter() - started)
+        return result
+
+    rows = 0
+    for _ in range(repeat):
+        rows = run_stages(api_class, measure)
+    return rows, timings
+
+
+def benchmark_scraper(name: str, api_class, repeat: int = BENCH_REPEAT) -> dict:
+    """Benchmark a scraper from its fixture.
+
+    Memory is traced in a run of its own, which also warms up the
+    timed runs.
+
+    :param name: scraper plugin name
+    :param api_class: scraper class
+    :param repeat: number of timed runs
+    :returns rows and per stage median seconds and peak bytes
+    """
+    probe = api_class(generate_uuid())
+    page_url = probe.resolve_url(probe.url)
+    recorder.cassette(probe.name).save(page_url, load_fixture(fixture_path(name)))
+
+    peaks = trace_peaks(api_class)
+    with metrics.scope(name):
+        rows, timings = time_stages(api_class, repeat)
+
+    stages = {
+        stage: {
+            "seconds": statistics.median(timings[stage]),
+            "peak_bytes": peaks.get(stage),
+        }
+        for stage in STAGES
+    }
+    for stage in NESTED_STAGES:
+        stat = metrics.stats.get((name, stage))
+        if stat:
+            stages[stage] = {"seconds": stat["seconds"] / repeat, "peak_bytes": None}
+    return {"rows": rows, "stages": stages}
+
+
+def run_benchmarks(names: list = None, repeat: int = BENCH_REPEAT) -> dict:
+    """Benchmark every scraper that has a fixture.
+
+    :param names: scraper plugin names, all registered ones by default
+    :param repeat: number of timed runs per scraper
+    :returns benchmark results
+    """
+    sources = scraper_plugins.sources()
+    names = names or sorted(sources)
+    results = {
+        "version": BASELINE_VERSION,
+        "created": get_isoformated_date(),
+        "repeat": repeat,
+        "scrapers": {},
+    }
+    missing = [name for name in names if name not in sources or not fixture_path(name)]
+    if missing:
+        LOG.warning("No fixture or plugin, not benchmarking: %s", ", ".join(missing))
+
+    mode, directory = recorder.mode, recorder.directory
+    with tempfile.TemporaryDirectory() as cassette_dir:
+        recorder.configure(REPLAY, cassette_dir)
+        metrics.configure(enabled=True, run_id="benchmark")
+        try:
+            for name in names:
+                if name in missing:
+                    continue
+                LOG.info("Benchmarking '%s'", name)
+                results["scrapers"][name] = benchmark_scraper(
+                    name, sources[name].load(), repeat
+                )
+        finally:
+            metrics.configure(enabled=False)
+            recorder.configure(mode, directory)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float = BENCH_THRESHOLD) -> list:
+    """Find stages slower or heavier than in the baseline.
+
+    Differences below BENCH_MIN_SECONDS and BENCH_MIN_BYTES are noise and
+    never count as regressions.
+
+    :param results: benchmark results
+    :param baseline: earlier benchmark results
+    :param threshold: allowed growth, 0.25 for 25%
+    :returns regressions as dictionaries
+    """
+    floors = {"seconds": BENCH_MIN_SECONDS, "peak_bytes": BENCH_MIN_BYTES}
+    regressions = []
+    for name, result in results["scrapers"].items():
+        base_stages = baseline.get("scrapers", {}).get(name, {}).get("stages", {})
+        for stage, values in result["stages"].items():
+            for metric, floor in floors.items():
+                base = base_stages.get(stage, {}).get(metric)
+                current = values.get(metric)
+                if base is None or current is None:
+                    continue
+                if current > base * (1 + threshold) and current - base > floor:
+                    regressions.append(
+                        {
+                            "scraper": name,
+                            "stage": stage,
+                            "metric": metric,
+                            "baseline": base,
+                            "current": current,
+                        }
+                    )
+    return regressions
+
+
+def format_results(results: dict) -> list[str]:
+    """Render benchmark results as a table.
+
+    :param results: benchmark results
+    :returns table lines
+    """
+    lines = [f"{'scraper':<12} {'stage':<12} {'ms':>10} {'peak KiB':>10} {'rows':>6}"]
+    for name, result in results["scrapers"].items():
+        for stage, values in result["stages"].items():
+            peak = values["peak_bytes"]
+            peak = "-" if peak is None else f"{peak / 1024:.1f}"
+            lines.append(
+                f"{name:<12} {stage:<12} {values['seconds'] * 1000:>10.2f} "
+                f"{peak:>10} {result['rows']:>6}"
+            )
+    return lines
+
+
+def load_baseline(file_name: str) -> Optional[dict]:
+    """Read saved benchmark results.
+
+    :param file_name: baseline file
+    :returns baseline, None if there is none yet or it is of another version
+    """
+    try:
+        with open(file_name, encoding="utf-8") as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        return None
+    if baseline.get("version") != BASELINE_VERSION:
+        LOG.warning("Ignoring baseline %s of older stages, save a new one", file_name)
+        return None
+    return baseline
+
+
+def save_baseline(results: dict, file_name: str):
+    """Save benchmark results as the new baseline.
+
+    :param results: benchmark results
+    :param file_name: baseline file
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(file_name)), exist_ok=True)
+    tmp_file = f"{file_name}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as file:
+        file.write(json_dumps(results, indent=2))
+    os.replace(tmp_file, file_name)
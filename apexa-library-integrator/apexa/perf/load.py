@@ -0,0 +1,258 @@
+"""Synthetic EOL feeds and a scaling benchmark of format, encode and publish.
+
+Feeds are shaped like what the scrapers hand to Scraper.format_data: the
+main EOL fields, ISO date strings with gaps, extra date columns and a free
+text column, with product names drawn from a configurable number of
+distinct values. The records stage times pandas_df_to_json, the
+conversion saved and test runs still take, next to the record batch
+published feeds are encoded from. Publishing goes to an in-process broker, so the numbers
+cover the integrator and the pika API calls but not the network.
+"""
+
+import resource
+import time
+
+import numpy
+from pandas import DataFrame
+
+from apexa.common.model import Scraper
+from apexa.common.publisher import publisher
+from apexa.common.publisher.publisher import broker_session
+from apexa.common.publisher.registry import Registry
+from apexa.common.records import RecordBatch, dumps_payload
+from apexa.common.util import (
+    generate_uuid,
+    get_isoformated_date,
+    get_logger,
+    pandas_df_to_json,
+)
+from apexa.config.default import (
+    LOAD_CARDINALITY,
+    LOAD_EXTRA_DATES,
+    LOAD_SIZES,
+    SCRAPER_INTEGRATOR_DATA_EXCHANGE,
+    SCRAPER_INTEGRATOR_SOFTWARE_ROUTING_KEY,
+)
+from apexa.dispatch.broker import LocalBroker
+
+LOG = get_logger(__name__)
+
+# Column names of extra dates seen on vendor pages, numbered ones after these
+EXTRA_DATE_NAMES = [
+    "releaseDate",
+    "FULL SUPPORT Start",
+    "FULL SUPPORT End",
+    "MAINTENANCE SUPPORT Start",
+    "EXTENDED SUPPORT Start",
+]
+PRODUCT_WORDS = ["SQL", "Server", "Data", "Cloud", "Edge", "Secure", "Backup", "Suite"]
+FIRST_DAY = numpy.datetime64("2000-01-01")
+DAYS = 365 * 30
+# Share of rows without an EOL date, vendors leave current releases empty
+UNDATED_SHARE = 0.2
+
+
+class SyntheticScraper(Scraper):
+    """Scraper formatting synthetic feeds, it never fetches anything."""
+
+    url = "https://lifecycle.example.com/"
+    name = "SYNTHETIC"
+
+    def __init__(self, uuid, extra_dates: int = LOAD_EXTRA_DATES):
+        self.uuid = uuid
+        super().__init__()
+        self.extra_date_fields = extra_date_names(extra_dates)
+
+
+def extra_date_names(count: int) -> list[str]:
+    """Return names for extra date columns.
+
+    :param count: number of columns
+    :returns column names
+    """
+    names = EXTRA_DATE_NAMES[:count]
+    return names + [f"date{number}" for number in range(len(names), count)]
+
+
+def random_dates(
+    rng: numpy.random.Generator, rows: int, undated: float
+) -> numpy.ndarray:
+    """Draw ISO formatted dates, some of them empty.
+
+    :param rng: random generator
+    :param rows: number of dates
+    :param undated: share of empty dates
+    :returns array of date strings
+    """
+    days = rng.integers(0, DAYS, rows).astype("timedelta64[D]")
+    dates = numpy.datetime_as_string(FIRST_DAY + days, unit="D").astype(object)
+    dates[rng.random(rows) < undated] = ""
+    return dates
+
+
+def synthetic_frame(
+    rows: int,
+    extra_dates: int = LOAD_EXTRA_DATES,
+    cardinality: int = LOAD_CARDINALITY,
+    seed: int = 0,
+) -> DataFrame:
+    """Fabricate a scraped EOL dataframe.
+
+    :param rows: number of rows
+    :param extra_dates: number of extra date columns
+    :param cardinality: number of distinct product names
+    :param seed: random seed, equal seeds give equal frames
+    :returns dataframe as returned by eol_data_generator
+    """
+    rng = numpy.random.default_rng(seed)
+    words = numpy.array(PRODUCT_WORDS, dtype=object)
+    products = numpy.array(
+        [
+            f"{words[number % len(words)]} {words[number // len(words) % len(words)]} "
+            f"{number}"
+            for number in range(cardinality)
+        ],
+        dtype=object,
+    )
+
+    major = rng.integers(1, 30, rows).astype(str).astype(object)
+    minor = rng.integers(0, 20, rows).astype(str).astype(object)
+    data = {
+        "originalName": products[rng.integers(0, cardinality, rows)],
+        "originalVersion": major + "." + minor + ".x",
+        "originalEOLDate": random_dates(rng, rows, UNDATED_SHARE),
+        "originalExtendedEOLDate": random_dates(rng, rows, 2 * UNDATED_SHARE),
+        "originalEolSource": SyntheticScraper.url,
+    }
+    for name in extra_date_names(extra_dates):
+        data[name] = random_dates(rng, rows, UNDATED_SHARE)
+    data["notes"] = numpy.where(rng.random(rows) < 0.1, "Security fixes only", "")
+    return DataFrame(data)
+
+
+def peak_rss() -> int:
+    """Return the highest resident set size of the process so far.
+
+    :returns bytes
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def measure_size(
+    rows: int, extra_dates: int, cardinality: int, publish: bool
+) -> list[dict]:
+    """Push one synthetic feed through the pipeline.
+
+    :param rows: number of rows
+    :param extra_dates: number of extra date columns
+    :param cardinality: number of distinct product names
+    :param publish: also publish the encoded feed
+    :returns one result per stage
+    """
+    frame = synthetic_frame(rows, extra_dates, cardinality)
+    frame_bytes = int(frame.memory_usage(deep=True).sum())
+    scraper = SyntheticScraper(generate_uuid(), extra_dates)
+    request_id = generate_uuid()
+    results = []
+
+    def measure(stage, nbytes, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        seconds = time.perf_counter() - started
+        if callable(nbytes):
+            nbytes = nbytes(result)
+        results.append(
+            {
+                "rows": rows,
+                "stage": stage,
+                "seconds": seconds,
+                "rows_per_sec": rows / seconds if seconds else None,
+                "bytes": nbytes,
+                "bytes_per_sec": nbytes / seconds if seconds else None,
+                "peak_rss": peak_rss(),
+            }
+        )
+        return result
+
+    formatted = measure("format_data", frame_bytes, scraper.format_data, frame)
+    del frame
+    measure("records", frame_bytes, pandas_df_to_json, formatted)
+    records = measure("record_batch", frame_bytes, RecordBatch, formatted)
+    del formatted
+    payload = {
+        "requestId": request_id,
+        "eol_data": records,
+        "timestamp": get_isoformated_date(),
+    }
+    payload = measure("json_encode", len, dumps_payload, payload)
+    del records
+    if publish:
+        registry = Registry()
+        measure(
+            "publish",
+            len(payload),
+            publisher.publish_messages,
+            SCRAPER_INTEGRATOR_DATA_EXCHANGE,
+            SCRAPER_INTEGRATOR_SOFTWARE_ROUTING_KEY,
+            payload,
+            request_id,
+            registry,
+        )
+    return results
+
+
+def run_load(
+    sizes: list = None,
+    extra_dates: int = LOAD_EXTRA_DATES,
+    cardinality: int = LOAD_CARDINALITY,
+    publish: bool = True,
+) -> list[dict]:
+    """Measure how the pipeline scales with the size of a feed.
+
+    Sizes run smallest first, so the peak RSS reported for a size is the
+    high-water mark of that size and everything smaller.
+
+    :param sizes: row counts, LOAD_SIZES by default
+    :param extra_dates: number of extra date columns
+    :param cardinality: number of distinct product names
+    :param publish: also publish to an in-process broker
+    :returns one result per size and stage
+    """
+    broker = LocalBroker()
+    connection_factory = broker_session.connection_factory
+    if publish:
+        broker_session.open(broker.connect)
+
+    results = []
+    try:
+        for rows in sorted(sizes or LOAD_SIZES):
+            LOG.info("Measuring a feed of %s rows", rows)
+            results += measure_size(rows, extra_dates, cardinality, publish)
+            # The stand-in keeps what was published, forget it between sizes
+            broker.published.clear()
+    finally:
+        if publish:
+            broker_session.close()
+            broker_session.connection_factory = connection_factory
+    return results
+
+
+def format_load(results: list[dict]) -> list[str]:
+    """Render scaling results as a table.
+
+    :param results: results of run_load
+    :returns table lines
+    """
+    lines = [
+        f"{'rows':>9} {'stage':<12} {'seconds':>9} {'rows/s':>11} "
+        f"{'MiB/s':>9} {'peak RSS MiB':>13}"
+    ]
+    for result in results:
+        rows_per_sec = result["rows_per_sec"] or 0
+        mib_per_sec = (result["bytes_per_sec"] or 0) / 2**20
+        lines.append(
+            f"{result['rows']:>9} {result['stage']:<12} {result['seconds']:>9.3f} "
+            f"{rows_per_sec:>11.0f} {mib_per_sec:>9.1f} "
+            f"{result['peak_rss'] / 2**20:>13.1f}"
+        )
+    return lines
@@ -1,6 +1,7 @@
 """Gurobi Scraper."""
 
 from apexa.common._typings import DATAFRAME
+from apexa.common.metrics import metrics
 from apexa.common.model import Scraper
 from apexa.common.util import (
     convert_table_to_pandas_dataframe,
@@ -8,6 +9,7 @@ from apexa.common.util import (
     parse_date,
     web_driver_find_elements,
 )
+from apexa.common.versions import version_families
 
 
 class GurobiScraper(Scraper):
@@ -23,14 +25,7 @@ class GurobiScraper(Scraper):
         self.uuid = uuid
         super().__init__()
 
-    def extract_version(self, text: str) -> str:
-        """Extract the version from the text.
-
-        :param text: the text to extract version from
-        :returns extratced version
-        """
-        return f"{text}.x"
-
+    @metrics.timed("fix_dates")
     def fix_date_formats(self, dataframe: DATAFRAME):
         """Fix date formats.
 
@@ -61,6 +56,6 @@ class GurobiScraper(Scraper):
         data = self.fix_date_formats(data)
         data["originalName"] = "Gurobi"
         data["originalEolSource"] = self.url
-        data["Version"] = data["Version"].apply(self.extract_version)
+        data["Version"] = version_families(data["Version"])
 
         return data
@@ -1,14 +1,15 @@
 """IDERA Scraper."""
 
 from apexa.common._typings import DATAFRAME
+from apexa.common.metrics import metrics
 from apexa.common.model import Scraper
 from apexa.common.util import (
     convert_table_to_pandas_dataframe,
     format_date,
     pandas_concat,
-    re_search,
     web_driver_find_elements,
 )
+from apexa.common.versions import latest_per_family, version_families
 
 
 class IDERAScraper(Scraper):
@@ -28,15 +29,7 @@ class IDERAScraper(Scraper):
         self.uuid = uuid
         super().__init__()
 
-    def extract_version(self, text: str) -> str:
-        """Extract the version from the text.
-
-        :param text: the text to extract version from
-        :returns extratced version
-        """
-        match = re_search(r"(([.]*\d+)*)", text)
-        return f"{match[1]}.x"
-
+    @metrics.timed("fix_dates")
     def fix_date_formats(self, dataframe: DATAFRAME) -> DATAFRAME:
         """Fix date formats in dataframe.
 
@@ -86,9 +79,6 @@ class IDERAScraper(Scraper):
 
         eol_data_df = pandas_concat(list_of_dataframes)
 
-        eol_data_df["VERSION"] = eol_data_df["VERSION"].apply(self.extract_version)
-        eol_data_df.drop_duplicates(
-            ["originalName", "VERSION"], keep="first", inplace=True
-        )
+        eol_data_df["VERSION"] = version_families(eol_data_df["VERSION"])
 
-        return eol_data_df
+        return latest_per_family(eol_data_df, "originalName", "VERSION")
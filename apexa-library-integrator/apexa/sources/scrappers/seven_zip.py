@@ -2,11 +2,8 @@
 
 from apexa.common._typings import DATAFRAME
 from apexa.common.model import Scraper
-from apexa.common.util import (
-    list_of_dict_to_pandas_df,
-    re_search,
-    web_driver_find_elements,
-)
+from apexa.common.util import list_of_dict_to_pandas_df, web_driver_find_elements
+from apexa.common.versions import latest_per_family, version_families
 
 
 class SevenZipScraper(Scraper):
@@ -14,21 +11,13 @@ class SevenZipScraper(Scraper):
 
     url = "https://www.7-zip.org/history.txt"
     name = "7-ZIP"
+    fetch_backend = "http"
     extra_date_fields = ["releaseDate"]
 
     def __init__(self, uuid):
         self.uuid = uuid
         super().__init__()
 
-    def extract_version(self, text: str) -> str:
-        """Extract the version from the text.
-
-        :param text: the text to extract version from
-        :returns extratced version
-        """
-        match = re_search(r"(([.]*\d+)*)", text)
-        return match[1] + ".x"
-
     def start(self) -> DATAFRAME:
         """Get EOL data from txt file.
 
@@ -59,14 +48,10 @@ class SevenZipScraper(Scraper):
         data["originalEolSource"] = self.url
 
         # Cleaning up the versions and adding .x
-        data["originalVersion"] = data["originalVersion"].apply(self.extract_version)
+        data["originalVersion"] = version_families(data["originalVersion"])
 
         # Dropping all "duplicates" picking the latest entry of a version
-        data.drop_duplicates(
-            ["originalName", "originalVersion"], keep="first", inplace=True
-        )
-
-        return data
+        return latest_per_family(data, "originalName", "originalVersion")
 
     def eol_data_generator(self):
         """Collect EOL data into a dataframe, convert to json.
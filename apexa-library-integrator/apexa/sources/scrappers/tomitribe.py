@@ -1,6 +1,7 @@
 """TomiTribe Scraper."""
 
 from apexa.common._typings import DATAFRAME
+from apexa.common.metrics import metrics
 from apexa.common.model import Scraper
 from apexa.common.util import (
     convert_table_to_pandas_dataframe,
@@ -32,6 +33,7 @@ class TomitribeScraper(Scraper):
         self.uuid = uuid
         super().__init__()
 
+    @metrics.timed("fix_dates")
     def fix_date_formats(self, dataframe: DATAFRAME):
         """Fix date formats.
 
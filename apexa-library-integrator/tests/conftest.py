@@ -0,0 +1,74 @@
+from collections import Counter
+
+import pytest
+from pandas import DataFrame
+
+from apexa.common.fingerprints import fingerprint_index
+from apexa.common.history import run_history
+from apexa.common.model import Scraper
+from apexa.common.plugins import scraper_plugins
+from apexa.common.snapshots import snapshot_store
+
+
+@pytest.fixture(autouse=True)
+def isolated_history(tmp_path, monkeypatch):
+    """Keep test runs out of the user's history, snapshots and indexes."""
+    monkeypatch.setattr(scraper_plugins, "index_file", str(tmp_path / "plugins.json"))
+    monkeypatch.setattr(run_history, "file_name", str(tmp_path / "history.db"))
+    monkeypatch.setattr(run_history, "enabled", True)
+    monkeypatch.setattr(snapshot_store, "directory", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(snapshot_store, "enabled", True)
+    monkeypatch.setattr(fingerprint_index, "directory", str(tmp_path / "fingerprints"))
+    monkeypatch.setattr(fingerprint_index, "enabled", True)
+
+
+class FakeScrapers:
+    """Scraper plugins of a test, counting their fetches."""
+
+    def __init__(self):
+        self.fetches = Counter()
+        self.broken = set()
+        self.names = []
+
+    def make(self, scraper_name, rows=1):
+        """Return a scraper class giving rows versions, failing while broken."""
+        fakes = self
+
+        class FakeScraper(Scraper):
+            name = scraper_name
+
+            def __init__(self, uuid):
+                self.uuid = uuid
+                super().__init__()
+
+            def create_driver(self):
+                raise AssertionError("fake scrapers never start a browser")
+
+            def eol_data_generator(self):
+                fakes.fetches[self.name] += 1
+                if not rows or self.name in fakes.broken:
+                    raise RuntimeError("site down")
+                return DataFrame(
+                    [
+                        {"originalName": self.name, "originalVersion": f"{n}.x"}
+                        for n in range(rows)
+                    ]
+                )
+
+        return FakeScraper
+
+    def register(self, name, rows=1, plugin=None):
+        """Register a fake scraper, or the given plugin, under a name."""
+        plugin = plugin or self.make(name, rows)
+        scraper_plugins.register(name, plugin)
+        self.names.append(name)
+        return plugin
+
+
+@pytest.fixture
+def fake_scrapers():
+    """Register scrapers for a test, unregistering them afterwards."""
+    fakes = FakeScrapers()
+    yield fakes
+    for name in fakes.names:
+        scraper_plugins.unregister(name)
@@ -0,0 +1,63 @@
+import copy
+
+from apexa.common.cassette import recorder
+from apexa.common.metrics import metrics
+from apexa.perf import benchmark
+
+SCRAPERS = {
+    "7-zip": "apexa.sources.scrappers.seven_zip:SevenZipScraper",
+    "idera": "apexa.sources.scrappers.idera:IDERAScraper",
+    "tomitribe": "apexa.sources.scrappers.tomitribe:TomitribeScraper",
+    "gurobi": "apexa.sources.scrappers.gurobi:GurobiScraper",
+}
+
+
+def test_scrapers_run_offline_from_fixtures(fake_scrapers):
+    for name, plugin in SCRAPERS.items():
+        fake_scrapers.register(name, plugin=plugin)
+    results = benchmark.run_benchmarks([*SCRAPERS, "missing"], repeat=1)
+
+    assert set(results["scrapers"]) == set(SCRAPERS)
+    for result in results["scrapers"].values():
+        assert result["rows"] > 0
+        for stage in benchmark.STAGES:
+            assert result["stages"][stage]["seconds"] > 0
+            assert result["stages"][stage]["peak_bytes"] > 0
+    assert "fix_dates" in results["scrapers"]["idera"]["stages"]
+    # Global state is left as it was found
+    assert recorder.mode is None
+    assert not metrics.enabled
+
+
+def test_compare_flags_only_significant_regressions():
+    baseline = {
+        "scrapers": {
+            "7-zip": {
+                "rows": 10,
+                "stages": {
+                    "eol_data": {"seconds": 0.1, "peak_bytes": 1_000_000},
+                    "format_data": {"seconds": 0.001, "peak_bytes": 1000},
+                },
+            }
+        }
+    }
+    results = copy.deepcopy(baseline)
+    stages = results["scrapers"]["7-zip"]["stages"]
+    stages["eol_data"]["seconds"] = 0.2
+    # Twice as slow, but by less than the noise floor
+    stages["format_data"]["seconds"] = 0.002
+    stages["format_data"]["peak_bytes"] = 5000
+
+    regressions = benchmark.compare(results, baseline, threshold=0.25)
+    assert [(r["stage"], r["metric"]) for r in regressions] == [("eol_data", "seconds")]
+    assert benchmark.compare(results, baseline, threshold=1.5) == []
+
+
+def test_baselines_of_older_stages_are_ignored(tmp_path):
+    file_name = str(tmp_path / "baseline.json")
+    assert benchmark.load_baseline(file_name) is None
+    benchmark.save_baseline({"version": 1, "scrapers": {}}, file_name)
+    assert benchmark.load_baseline(file_name) is None
+    results = {"version": benchmark.BASELINE_VERSION, "scrapers": {}}
+    benchmark.save_baseline(results, file_name)
+    assert benchmark.load_baseline(file_name) == results
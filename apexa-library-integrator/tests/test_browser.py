@@ -0,0 +1,52 @@
+from apexa.common import browser
+from apexa.common.browser import FULL_PROFILE, LEAN_PROFILE, BrowserPool
+
+
+class FakeDriver:
+    window_handles = ["main"]
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.quitted = False
+
+    def get(self, url):
+        pass
+
+    def delete_all_cookies(self):
+        pass
+
+    @property
+    def switch_to(self):
+        return self
+
+    def window(self, handle):
+        pass
+
+    def quit(self):
+        self.quitted = True
+
+
+def test_lean_profile_blocks_heavy_resources():
+    urls = LEAN_PROFILE.blocked_urls()
+    assert "*.png" in urls
+    assert "*google-analytics.com*" in urls
+    assert LEAN_PROFILE.chrome_options().page_load_strategy == "eager"
+    assert FULL_PROFILE.blocked_urls() == []
+
+
+def test_pool_reuses_browsers_per_profile(monkeypatch):
+    monkeypatch.setattr(browser, "start_browser", FakeDriver)
+    pool = BrowserPool()
+    pool.enable()
+
+    lean = pool.acquire(LEAN_PROFILE)
+    pool.release(lean)
+    assert pool.idle_count == 1
+
+    full = pool.acquire(FULL_PROFILE)
+    assert full is not lean and full.profile is FULL_PROFILE
+    assert pool.acquire(LEAN_PROFILE) is lean
+
+    pool.release(full)
+    pool.close()
+    assert full.quitted and pool.idle_count == 0
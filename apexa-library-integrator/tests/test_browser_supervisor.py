@@ -0,0 +1,38 @@
+import os
+import signal
+
+from apexa.common.controller import browser_controller
+from apexa.common.controller.browser_controller import BrowserSupervisor
+
+
+def test_supervisor_restarts_crashed_and_bloated_browser(tmp_path, monkeypatch):
+    fake_chrome = tmp_path / "chrome"
+    fake_chrome.write_text("#!/bin/sh\nexec sleep 60\n")
+    fake_chrome.chmod(0o755)
+    monkeypatch.setattr(browser_controller, "find_chrome", lambda: str(fake_chrome))
+
+    supervisor = BrowserSupervisor(
+        port=9333,
+        state_file=str(tmp_path / "browser.json"),
+        pid_file=str(tmp_path / "browser.pid"),
+        profile_dir=str(tmp_path / "profile"),
+    )
+    supervisor.launch()
+    try:
+        assert supervisor.check() is None
+
+        os.kill(supervisor.process.pid, signal.SIGKILL)
+        supervisor.process.wait()
+        assert "exited" in supervisor.check()
+        supervisor.restart("crashed")
+        assert supervisor.check() is None
+
+        supervisor.max_rss = 1
+        assert "MiB" in supervisor.check()
+
+        supervisor.write_state()
+        state = browser_controller.read_state(supervisor.state_file)
+        assert state["address"] == "127.0.0.1:9333"
+        assert state["restarts"] == 1
+    finally:
+        supervisor.terminate()
@@ -0,0 +1,54 @@
+from apexa.common.cassette import REPLAY, Cassette, RecordingDriver, recorder
+from apexa.sources.scrappers.seven_zip import SevenZipScraper
+
+HISTORY = """HISTORY of the 7-Zip
+-----------------
+
+22.01          2022-07-15
+22.00          2022-06-15
+21.07          2021-12-26
+21.07 beta     2021-12-01
+"""
+
+
+class FakeDriver:
+    current_url = "https://example.com/final"
+    status_code = 200
+    headers = {"Content-Type": "text/html"}
+
+    def get(self, url):
+        self.page_source = f"<html><body>{url}</body></html>"
+
+
+def test_recording_driver_saves_page_sources(tmp_path, monkeypatch):
+    cassette = Cassette(str(tmp_path))
+    driver = RecordingDriver(FakeDriver(), cassette)
+    driver.get("https://example.com")
+
+    assert driver.page_source == "<html><body>https://example.com</body></html>"
+    recording = cassette.load("https://example.com")
+    assert recording["page_source"] == driver.page_source
+    assert recording["status"] == 200
+
+    saves = []
+    monkeypatch.setattr(cassette, "save", lambda *args: saves.append(args[0]))
+    assert driver.page_source == recording["page_source"]
+    assert saves == []
+    driver.get("https://example.com/eol")
+    driver.page_source
+    driver.page_source
+    assert saves == ["https://example.com/eol"]
+
+
+def test_replay_runs_scraper_without_browser(tmp_path):
+    recorder.configure(REPLAY, str(tmp_path))
+    try:
+        recorder.cassette("7-ZIP").save(
+            SevenZipScraper.url, f"<html><body><pre>{HISTORY}</pre></body></html>"
+        )
+        data = SevenZipScraper("uuid").fetch_scraped_data()
+    finally:
+        recorder.configure(None)
+
+    assert list(data["originalVersion"]) == ["22.01.x", "22.00.x", "21.07.x"]
+    assert list(data["originalEOLDate"])[1:] == ["2022-07-15", "2022-06-15"]
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+from apexa.config import Config, ConfigBaseException
+
+
+def test_resolution_order_and_invalidation(tmp_path, monkeypatch):
+    config_file = tmp_path / "config.json"
+    config = Config(config_file=str(config_file), cache_dir=str(tmp_path / "cache"))
+    config.set_cache("RABBIT_HOST", "disk-host")
+    config.set_cache("RABBIT_USER", "disk-user")
+    assert config.get_cache("RABBIT_HOST") == "disk-host"
+
+    config_file.write_text(json.dumps({"RABBIT_HOST": "file-host"}))
+    assert config.get_cache("RABBIT_HOST") == "file-host"
+
+    monkeypatch.setenv("RABBIT_HOST", "env-host")
+    config.set_cache("RABBIT_USER", "new-user")
+    assert config.get_cache("RABBIT_HOST") == "env-host"
+    assert config.get_cache("RABBIT_USER") == "new-user"
+
+
+def test_memoized_reads_skip_diskcache(tmp_path, monkeypatch):
+    config = Config(
+        config_file=str(tmp_path / "config.json"), cache_dir=str(tmp_path / "cache")
+    )
+    config.set_cache("RABBIT_PORT", "5672")
+    config.get_cache("RABBIT_PORT")
+
+    monkeypatch.setattr(config.cache, "get", pytest.fail)
+    assert config.get_cache("RABBIT_PORT") == "5672"
+
+
+def test_missing_cache_dir_is_not_created(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    config = Config(config_file=str(tmp_path / "none.json"), cache_dir=str(cache_dir))
+    monkeypatch.setenv("RABBIT_HOST", "env-host")
+
+    assert config.get_cache("RABBIT_HOST") == "env-host"
+    with pytest.raises(ConfigBaseException):
+        config.get_cache("RABBIT_PASSWORD")
+    assert not cache_dir.exists()
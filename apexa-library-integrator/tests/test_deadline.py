@@ -0,0 +1,77 @@
+import threading
+import time
+
+import pytest
+from click.testing import CliRunner
+
+from apexa.cli.client.commands import scrape, serve, worker
+from apexa.common import deadline as deadline_module
+from apexa.common.deadline import (
+    Deadline,
+    DeadlineExceeded,
+    checkpoint,
+    parse_budgets,
+)
+
+
+def test_parse_budgets():
+    assert parse_budgets("navigation=60, publish=5") == {
+        "navigation": 60,
+        "publish": 5,
+    }
+    assert parse_budgets(None) == {}
+    with pytest.raises(ValueError):
+        parse_budgets("download=10")
+
+    for command in (scrape, serve, worker):
+        result = CliRunner().invoke(command, ["--stage-timeouts", "download=10"])
+        assert result.exit_code == 2
+        assert "Invalid value for '--stage-timeouts'" in result.output
+
+
+def test_stuck_stage_is_cancelled(monkeypatch):
+    monkeypatch.setattr(deadline_module, "WATCHDOG_INTERVAL", 0.01)
+    released = threading.Event()
+
+    def stuck():
+        checkpoint("navigation")
+        released.wait(5)
+        checkpoint("parse")
+
+    deadline = Deadline("slow", {"navigation": 0.1, "total": 10})
+    deadline.on_cancel(released.set)
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded) as err:
+        deadline.run(stuck)
+    assert err.value.stage == "navigation"
+    assert time.monotonic() - started < 2
+
+
+def test_result_and_errors_pass_through():
+    assert Deadline("fast", {"total": 5}).run(lambda: 42) == 42
+    with pytest.raises(KeyError):
+        Deadline("broken", {"total": 5}).run({}.__getitem__, "missing")
+
+
+def test_publish_retries_stop_at_the_deadline(monkeypatch):
+    from apexa.common.publisher import publisher
+    from apexa.common.publisher.registry import registry
+
+    attempts = []
+
+    def failing_publish(exchange, routing_key, msg, request_id, **kwargs):
+        attempts.append(request_id)
+        kwargs["registry"].add(request_id, msg, exchange, routing_key, "test")
+
+    monkeypatch.setattr(publisher, "publish", failing_publish)
+    monkeypatch.setattr(publisher, "sleep_seconds", lambda seconds: time.sleep(0.05))
+
+    deadline = Deadline("slow", {"publish": 0.1})
+    deadline.enter("publish")
+    with pytest.raises(DeadlineExceeded):
+        deadline.run(publisher.publish_messages, "exchange", "key", "msg", "req-1")
+
+    assert registry.get_registry() == {}
+    assert registry.outcome("req-1")["delivered"] is False
+    assert len(attempts) < 5
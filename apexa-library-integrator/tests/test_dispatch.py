@@ -0,0 +1,108 @@
+import threading
+from collections import Counter
+
+from apexa.common.controller import scraper_controller
+from apexa.common.publisher import publisher
+from apexa.common.publisher.registry import registry
+from apexa.dispatch.broker import LocalBroker
+from apexa.dispatch.coordinator import Coordinator
+from apexa.dispatch.jobs import DONE, FAILED, UNAVAILABLE
+from apexa.dispatch.worker import Worker
+
+
+def test_workers_share_jobs_and_report_back(monkeypatch, fake_scrapers):
+    monkeypatch.setattr(scraper_controller, "save_to_file", lambda *args: None)
+    scrapers = {"first": 2, "second": 3, "broken": 0}
+    for name, rows in scrapers.items():
+        fake_scrapers.register(name, rows)
+
+    broker = LocalBroker()
+    workers = [Worker(broker.connect, worker_id=f"w{n}") for n in range(2)]
+    threads = [threading.Thread(target=worker.run) for worker in workers]
+    for thread in threads:
+        thread.start()
+
+    coordinator = Coordinator(broker.connect)
+    try:
+        jobs = coordinator.dispatch([*scrapers, "missing"], test=True)
+        statuses = coordinator.collect(jobs, timeout=30)
+    finally:
+        coordinator.close()
+        for worker in workers:
+            worker.stop()
+        for thread in threads:
+            thread.join(10)
+
+    assert {name: s["status"] for name, s in statuses.items()} == {
+        "first": DONE,
+        "second": DONE,
+        "broken": FAILED,
+        "missing": UNAVAILABLE,
+    }
+    assert statuses["first"]["rows"] == 2
+    assert statuses["second"]["rows"] == 3
+    # A failed job gets a second chance before it is given up on
+    assert fake_scrapers.fetches["broken"] == 2
+    assert sum(worker.processed for worker in workers) == 5
+    assert not any(broker.queues.values())
+
+
+def test_concurrent_jobs_retry_their_own_messages(monkeypatch, fake_scrapers):
+    both_publishing = threading.Barrier(2, timeout=10)
+    sent = []
+
+    def flaky_publish(exchange, routing_key, msg, request_id, **kwargs):
+        sent.append(request_id)
+        registry = kwargs["registry"]
+        if not kwargs.get("is_retry"):
+            both_publishing.wait()
+            registry.add(request_id, msg, exchange, routing_key, "test")
+        else:
+            registry.record_outcome(request_id, delivered=True)
+            registry.soft_delete_retry_message(request_id)
+
+    deliveries = []
+    publish_scraper_data = scraper_controller.publisher.publish_scraper_data
+
+    def record_delivery(data, routing_key):
+        deliveries.append(publish_scraper_data(data, routing_key))
+        return deliveries[-1]
+
+    monkeypatch.setattr(publisher, "publish", flaky_publish)
+    monkeypatch.setattr(publisher, "sleep_seconds", lambda seconds: None)
+    monkeypatch.setattr(
+        scraper_controller.publisher, "publish_scraper_data", record_delivery
+    )
+    for name in ("left", "right"):
+        fake_scrapers.register(name, rows=2)
+
+    broker = LocalBroker()
+    worker = Worker(broker.connect, prefetch=2, worker_id="w")
+    thread = threading.Thread(target=worker.run)
+    thread.start()
+    coordinator = Coordinator(broker.connect)
+    try:
+        statuses = coordinator.collect(coordinator.dispatch(["left", "right"]), 30)
+    finally:
+        coordinator.close()
+        worker.stop()
+        thread.join(10)
+
+    assert [status["status"] for status in statuses.values()] == [DONE, DONE]
+    assert [delivery["delivered"] for delivery in deliveries] == [True, True]
+    # Each message is sent once and retried once, by its own job only
+    assert sorted(Counter(sent).values()) == [2, 2]
+    assert registry.get_registry() == {}
+
+
+def test_reply_queue_is_deleted_while_jobs_are_pending():
+    broker = LocalBroker()
+    coordinator = Coordinator(broker.connect)
+    try:
+        jobs = coordinator.dispatch(["nobody"], test=True)
+        statuses = coordinator.collect(jobs, timeout=0)
+    finally:
+        coordinator.close()
+
+    assert statuses == {"nobody": {"status": "queued"}}
+    assert list(broker.queues) == [coordinator.job_queue]
@@ -0,0 +1,80 @@
+import numpy
+
+from apexa.common.controller import scraper_controller
+from apexa.common.fingerprints import (
+    FingerprintIndex,
+    contains,
+    fingerprint,
+    fingerprint_index,
+)
+
+
+def record(version, eol_date, scraper_id="uuid-1", **extra):
+    return {
+        "originalName": "SQL Safe Backup",
+        "originalVersion": version,
+        "originalEOLDate": eol_date,
+        "extraDates": {"releaseDate": "2019-01-01"},
+        "scraperName": "IDERA",
+        "scraperId": scraper_id,
+        **extra,
+    }
+
+
+def test_fingerprints_ignore_run_fields_and_other_records():
+    first = fingerprint([record("9.x", "2023-06-30")])
+    assert first.dtype == numpy.uint64
+    assert (first == fingerprint([record("9.x", "2023-06-30", "uuid-2")])).all()
+    # Another record gaining a field leaves this one as it was
+    both = fingerprint([record("9.x", "2023-06-30"), record("8.x", None, note="x")])
+    assert both[0] == first[0]
+    assert fingerprint([record("9.x", "2024-06-30")])[0] != first[0]
+    assert fingerprint([record("9.x", None)])[0] != first[0]
+
+
+def test_contains_searches_sorted_fingerprints():
+    stored = numpy.array([3, 7, 11], dtype=numpy.uint64)
+    candidates = numpy.array([11, 2, 7, 12], dtype=numpy.uint64)
+    assert contains(stored, candidates).tolist() == [True, False, True, False]
+    assert not contains(stored[:0], candidates).any()
+
+
+def test_runs_are_diffed_against_every_earlier_run(tmp_path):
+    index = FingerprintIndex(str(tmp_path))
+    first_run = [record("9.x", "2023-06-30"), record("10.x", "2024-06-30")]
+    assert index.record_run("idera", first_run) == {
+        "new": 2,
+        "changed": 0,
+        "unchanged": 0,
+    }
+
+    second_run = [
+        record("9.x", "2023-06-30", "uuid-2"),
+        record("10.x", "2025-06-30", "uuid-2"),
+        record("11.x", "2026-06-30", "uuid-2"),
+    ]
+    assert index.diff("idera", second_run) == {"new": 1, "changed": 1, "unchanged": 1}
+    assert index.add("idera", second_run) == 2
+    assert index.seen("idera", first_run + second_run).all()
+    assert isinstance(index.load("idera"), numpy.memmap)
+    assert index.scrapers() == ["idera"]
+
+    index.configure(enabled=False)
+    assert index.record_run("idera", second_run) is None
+
+
+def test_only_delivered_runs_are_fingerprinted(tmp_path, monkeypatch, fake_scrapers):
+    deliveries = iter([{"delivered": False}, {"delivered": True}])
+    monkeypatch.setattr(
+        scraper_controller.publisher,
+        "publish_software_scraper_data",
+        lambda data: next(deliveries),
+    )
+    fake_scrapers.register("idera", rows=2)
+    runs_dir = str(tmp_path / "runs")
+
+    scraper_controller.run_scrappers(["idera"], False, "csv", runs_dir=runs_dir)
+    assert fingerprint_index.scrapers() == []
+
+    scraper_controller.run_scrappers(["idera"], False, "csv", runs_dir=runs_dir)
+    assert len(fingerprint_index.load("idera")) == 2
@@ -0,0 +1,26 @@
+from apexa.common.governor import HostLimiter, parse_retry_after
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=1445412470) == 10
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_aimd_limit():
+    limiter = HostLimiter(rate=1000, burst=1000, max_concurrency=4, target_latency=1)
+    for _ in range(20):
+        limiter.acquire()
+        limiter.release(0.1, 200)
+    assert limiter.limit == 4
+
+    limiter.acquire()
+    limiter.release(0.1, 429, retry_after=30)
+    assert limiter.limit == 2
+    assert limiter.blocked_until > 0
+
+    limiter.blocked_until = 0
+    limiter.acquire()
+    limiter.release(5.0, 200)
+    assert limiter.limit == 1
@@ -0,0 +1,66 @@
+from contextlib import closing
+
+from apexa.common import history
+from apexa.common.controller import scraper_controller
+from apexa.common.history import RunHistory, run_history
+from apexa.common.metrics import metrics
+
+
+def test_regressions_stand_out_from_noisy_baseline(tmp_path):
+    store = RunHistory(str(tmp_path / "history.db"))
+    durations = [10.0, 10.4, 9.8, 10.1, 9.9, 10.3, 10.0, 9.7]
+    for number, seconds in enumerate(durations + [10.5]):
+        store.append(f"run-{number}", "idera", {"duration": seconds}, at=number)
+    for number, seconds in enumerate(durations + [14.0]):
+        store.append(f"run-{number}", "gurobi", {"duration": seconds}, at=number)
+    for number, rows in enumerate([100] * 8 + [400]):
+        store.append(f"run-{number}", "gurobi", {"rows": rows}, at=number)
+
+    entries = {
+        (entry["scraper"], entry["metric"]): entry
+        for entry in history.report(store, window=20)
+    }
+
+    assert entries["gurobi", "duration"]["regression"]
+    assert entries["gurobi", "duration"]["baseline"] == 10.0
+    assert not entries["idera", "duration"]["regression"]
+    # Finding more rows is not a regression
+    assert not entries["gurobi", "rows"]["regression"]
+    assert history.report(store)[0]["scraper"] == "gurobi"
+    assert len(entries["idera", "duration"]["trend"]) == 9
+
+
+def test_only_comparable_runs_are_recorded(tmp_path):
+    store = RunHistory(str(tmp_path / "history.db"))
+    before = {"fetch": {"calls": 1, "seconds": 2.0, "rows": 5, "bytes": 0}}
+    after = {
+        "fetch": {"calls": 2, "seconds": 5.0, "rows": 12, "bytes": 0},
+        "page_source": {"calls": 1, "seconds": 0.1, "rows": 0, "bytes": 2048},
+        "amqp_publish": {"calls": 1, "seconds": 0.5, "rows": 0, "bytes": 900},
+    }
+    store.record_run("run-1", "7-zip", 4.0, before, after)
+    cached = {**after, "result_cache_hit": {"calls": 0, "rows": 7}}
+    store.record_run("run-2", "7-zip", 0.1, before, cached)
+
+    series = store.series("7-zip")
+    values = {metric: samples[0][1] for (_, metric), samples in series.items()}
+    assert values["duration"] == 4.0
+    assert values["rows"] == 7
+    assert values["page_bytes"] == 2048
+    assert values["publish_latency"] == 0.5
+    assert values["stage.fetch"] == 3.0
+    assert all(len(samples) == 1 for samples in series.values())
+
+
+def test_jobs_are_recorded_under_their_run(monkeypatch, fake_scrapers):
+    monkeypatch.setattr(scraper_controller, "save_to_file", lambda *args: None)
+    metrics.configure(enabled=True, run_id="worker")
+    api_class = fake_scrapers.register("idera")
+    try:
+        scraper_controller.run_scrapper(api_class, "idera", True, "csv", run_id="job")
+    finally:
+        metrics.configure(enabled=False)
+
+    with closing(run_history.connect()) as connection:
+        run_ids = {row[0] for row in connection.execute("SELECT run_id FROM samples")}
+    assert run_ids == {"job"}
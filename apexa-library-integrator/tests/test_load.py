@@ -0,0 +1,36 @@
+from apexa.common.publisher.publisher import broker_session
+from apexa.common.publisher.registry import registry
+from apexa.perf import load
+
+
+def test_synthetic_frame_shape():
+    frame = load.synthetic_frame(500, extra_dates=7, cardinality=20, seed=3)
+
+    assert len(frame) == 500
+    assert frame["originalName"].nunique() <= 20
+    assert {"releaseDate", "EXTENDED SUPPORT Start", "date5", "date6"} <= set(
+        frame.columns
+    )
+    assert (frame["originalEOLDate"] == "").any()
+    assert frame.equals(load.synthetic_frame(500, 7, 20, seed=3))
+
+
+def test_feeds_flow_through_format_encode_and_publish():
+    results = load.run_load([300, 100], extra_dates=3)
+
+    assert [(r["rows"], r["stage"]) for r in results] == [
+        (rows, stage)
+        for rows in (100, 300)
+        for stage in (
+            "format_data",
+            "records",
+            "record_batch",
+            "json_encode",
+            "publish",
+        )
+    ]
+    encoded = [r for r in results if r["stage"] == "json_encode"]
+    assert encoded[1]["bytes"] > encoded[0]["bytes"] > 0
+    assert all(r["peak_rss"] > 0 for r in results)
+    assert not broker_session.active
+    assert not registry.outcomes
@@ -0,0 +1,80 @@
+import json
+import logging
+import queue
+import threading
+
+from apexa.common.deadline import Deadline
+from apexa.common.log import (
+    ContextQueueHandler,
+    JSONFormatter,
+    file_handler,
+    log_context,
+    set_log_context,
+)
+
+
+def test_records_carry_context_of_the_logging_thread():
+    records = queue.SimpleQueue()
+    logger = logging.getLogger("apexa.tests.log")
+    handler = ContextQueueHandler(records)
+    logger.addHandler(handler)
+    set_log_context(run_id="run-1")
+    try:
+        with log_context(scraper="idera"):
+            logger.warning("Fetched %s rows", 12)
+            worker = threading.Thread(target=logger.warning, args=("other thread",))
+            worker.start()
+            worker.join()
+        with log_context(request_id="req-1"):
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                logger.exception("Publish of %s failed", "idera")
+    finally:
+        set_log_context(run_id=None)
+        logger.removeHandler(handler)
+
+    fetched, other, failed = (records.get_nowait() for _ in range(3))
+    entry = json.loads(JSONFormatter().format(fetched))
+    assert entry["message"] == "Fetched 12 rows"
+    assert entry["run_id"] == "run-1"
+    assert entry["scraper"] == "idera"
+    assert "request_id" not in entry
+    # Thread local fields stay in their thread, global ones do not
+    assert (other.run_id, other.scraper) == ("run-1", None)
+    entry = json.loads(JSONFormatter().format(failed))
+    assert entry["request_id"] == "req-1"
+    assert "scraper" not in entry
+    assert "ValueError: boom" in entry["exception"]
+
+
+def test_file_handler_falls_back_to_a_writable_path(tmp_path):
+    blocked = tmp_path / "blocked"
+    blocked.write_text("not a directory")
+    fallback = tmp_path / "logs" / "apexa.log"
+
+    handler = file_handler(str(blocked / "apexa.log"), str(fallback))
+    try:
+        assert handler.baseFilename == str(fallback)
+        assert isinstance(handler.formatter, JSONFormatter)
+    finally:
+        handler.close()
+    assert file_handler(str(blocked / "apexa.log")) is None
+
+
+def test_context_follows_scrapers_into_their_deadline_thread():
+    records = queue.SimpleQueue()
+    logger = logging.getLogger("apexa.tests.log")
+    handler = ContextQueueHandler(records)
+    logger.addHandler(handler)
+    try:
+        with log_context(run_id="run-2", scraper="idera"):
+            Deadline("idera", {"total": 5}).run(logger.warning, "in the worker")
+        logger.warning("after the run")
+    finally:
+        logger.removeHandler(handler)
+
+    inside, after = records.get_nowait(), records.get_nowait()
+    assert inside.threadName == "scrapper-idera"
+    assert (inside.run_id, inside.scraper) == ("run-2", "idera")
+    assert (after.run_id, after.scraper) == (None, None)
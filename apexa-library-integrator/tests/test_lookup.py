@@ -0,0 +1,96 @@
+import json
+from urllib.request import urlopen
+
+import pandas
+
+from apexa.common.lookup import LookupIndex, serve_lookups
+from apexa.common.snapshots import SnapshotStore
+from apexa.common.versions import parse_version
+
+
+def record(name, version, eol, scraper="IDERA"):
+    return {
+        "originalName": name,
+        "originalVersion": version,
+        "originalEOLDate": eol,
+        "scraperName": scraper,
+    }
+
+
+RECORDS = [
+    record("SQL Diagnostic Manager", "9.x", "2020-06-30"),
+    record("SQL Diagnostic Manager", "10.x", "2023-12-31"),
+    record("SQL Diagnostic Manager", "10.0.x", "2022-12-31"),
+    record("SQL Diagnostic Manager", "10.0.3", "2021-03-31"),
+    record("SQL Diagnostic Manager", "12.x", ""),
+    record("Gurobi Optimizer", "9.5.x", "2025-11-30", "GUROBI"),
+]
+
+
+def test_most_specific_entry_covers_a_version():
+    index = LookupIndex.from_records(RECORDS)
+
+    assert parse_version("10.0.x") == ((10, 0, 0, 0), 2, True)
+    assert index.lookup("sql  diagnostic MANAGER", "10.0.3")["originalEOLDate"] == (
+        "2021-03-31"
+    )
+    assert index.lookup("SQL Diagnostic Manager", "10.0.5")["originalVersion"] == (
+        "10.0.x"
+    )
+    assert index.lookup("SQL Diagnostic Manager", "10.2")["originalVersion"] == "10.x"
+    assert index.lookup("SQL Diagnostic Manager", "11.0") is None
+    assert index.lookup("Unknown", "1.0") is None
+    assert index.is_eol("SQL Diagnostic Manager", "9.1", on="2020-07-01")
+    assert not index.is_eol("SQL Diagnostic Manager", "9.1", on="2020-06-29")
+    assert index.is_eol("SQL Diagnostic Manager", "12.1") is None
+
+
+def test_families_and_ranges():
+    index = LookupIndex.from_records(RECORDS)
+
+    def versions(pattern):
+        found = index.search("SQL Diagnostic Manager", pattern)
+        return [result["originalVersion"] for result in found]
+
+    assert versions("10.x") == ["10.x", "10.0.x", "10.0.3"]
+    assert versions("10.0.x") == ["10.0.x", "10.0.3"]
+    assert versions("10.0.3") == ["10.0.3"]
+    assert versions("9..10.x") == ["9.x", "10.x", "10.0.x", "10.0.3"]
+    assert versions("10.0.1..12") == ["10.0.3", "12.x"]
+    assert len(versions(None)) == 5
+
+
+def test_batch_lookups_agree_with_single_lookups():
+    index = LookupIndex.from_records(RECORDS)
+    names = ["SQL Diagnostic Manager"] * 5 + ["gurobi optimizer", "Unknown"]
+    versions = ["10.0.3", "10.0.7", "10.4", "9", "13.0", "9.5.2", "1.0"]
+
+    found = index.lookup_frame(names, versions, on="2022-01-01")
+
+    for row, (name, version) in enumerate(zip(names, versions)):
+        single = index.lookup(name, version, on="2022-01-01")
+        if single is None:
+            assert pandas.isna(found.loc[row, "originalVersion"])
+        else:
+            assert found.loc[row, "originalVersion"] == single["originalVersion"]
+            assert found.loc[row, "eol"] == single["eol"]
+
+
+def test_lookups_over_http_from_snapshots(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.append("idera", "run-1", RECORDS[:5])
+    server = serve_lookups(LookupIndex.from_snapshots(store), "127.0.0.1", 0)
+    address = f"http://127.0.0.1:{server.server_port}"
+    try:
+        with urlopen(f"{address}/lookup?name=SQL+Diagnostic+Manager&version=9.2") as r:
+            result = json.load(r)
+        with urlopen(
+            f"{address}/search?name=SQL+Diagnostic+Manager&versions=12.x"
+        ) as r:
+            found = json.load(r)
+    finally:
+        server.shutdown()
+    assert result["originalVersion"] == "9.x"
+    assert result["scraperName"] == "IDERA"
+    assert result["eol"] is True
+    assert [entry["originalVersion"] for entry in found] == ["12.x"]
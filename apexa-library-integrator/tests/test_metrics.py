@@ -0,0 +1,46 @@
+import json
+
+from apexa.common.metrics import NULL_SPAN, Metrics
+
+
+def test_disabled_metrics_use_null_span():
+    metrics = Metrics()
+    assert metrics.span("navigate") is NULL_SPAN
+    metrics.count("navigate", rows=1)
+    metrics.observe("amqp_confirm", 0.1)
+    assert metrics.stats == {}
+
+
+def test_spans_are_aggregated_per_scraper(tmp_path):
+    metrics = Metrics()
+    metrics.configure(enabled=True, run_id="run-1")
+    with metrics.scope("idera"):
+        for _ in range(2):
+            with metrics.span("read_html") as span:
+                span.add(rows=3, nbytes=10)
+
+    stage = metrics.report()["scrapers"]["idera"]["stages"]["read_html"]
+    assert stage["calls"] == 2
+    assert stage["rows"] == 6
+    assert stage["bytes"] == 20
+
+    metrics.write(str(tmp_path / "metrics.json"))
+    assert json.loads((tmp_path / "metrics.json").read_text())["run_id"] == "run-1"
+
+    metrics.write(str(tmp_path / "metrics.prom"), "prometheus")
+    assert (
+        'apexa_stage_rows_total{scraper="idera",stage="read_html"} 6'
+        in (tmp_path / "metrics.prom").read_text()
+    )
+
+
+def test_prometheus_label_values_are_escaped():
+    metrics = Metrics()
+    metrics.configure(enabled=True, run_id="run-1")
+    with metrics.scope('odd "name"\\\n'):
+        metrics.count("read_html", rows=1)
+
+    assert (
+        'apexa_stage_rows_total{scraper="odd \\"name\\"\\\\\\n",stage="read_html"} 1'
+        in metrics.to_prometheus()
+    )
@@ -0,0 +1,47 @@
+import json
+
+from apexa.common import plugins
+from apexa.common.plugins import PluginRegistry
+
+
+class DummyScraper:
+    pass
+
+
+def test_register_overrides_discovered(tmp_path):
+    registry = PluginRegistry(index_file=str(tmp_path / "plugins.json"))
+    registry.register("dummy", DummyScraper)
+    registry.register("idera", "apexa.sources.scrappers.idera:IDERAScraper")
+
+    assert registry.get("dummy").load() is DummyScraper
+    assert registry.get("idera").value.endswith(":IDERAScraper")
+    assert {"dummy", "idera"} <= set(registry.names())
+
+
+def test_index_is_reused_until_installation_changes(tmp_path, monkeypatch):
+    index_file = tmp_path / "plugins.json"
+    calls = []
+
+    def entry_points():
+        calls.append(1)
+        return plugins.metadata.EntryPoints([])
+
+    monkeypatch.setattr(plugins, "metadata_entry_points", entry_points)
+
+    PluginRegistry(index_file=str(index_file)).sources()
+    PluginRegistry(index_file=str(index_file)).sources()
+    assert len(calls) == 1
+
+    cached = json.loads(index_file.read_text())
+    cached["key"] = "stale"
+    index_file.write_text(json.dumps(cached))
+    PluginRegistry(index_file=str(index_file)).sources()
+    assert len(calls) == 2
+
+
+def test_installation_key_ignores_the_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(plugins.sys, "path", ["", str(tmp_path), *plugins.sys.path])
+    key = plugins.installation_key()
+    (tmp_path / "output.csv").write_text("originalName\n")
+    assert plugins.installation_key() == key
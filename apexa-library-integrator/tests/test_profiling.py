@@ -0,0 +1,20 @@
+from apexa.common.profiling import profile_scraper
+
+
+def busy():
+    return sum(i * i for i in range(20000))
+
+
+def test_cpu_profile_writes_prof_file(tmp_path):
+    with profile_scraper("idera", "cpu", str(tmp_path)):
+        busy()
+    assert (tmp_path / "idera.prof").stat().st_size > 0
+
+
+def test_memory_profile_writes_allocation_report(tmp_path):
+    with profile_scraper("idera", "memory", str(tmp_path)):
+        blocks = [bytearray(1024) for _ in range(100)]
+    report = (tmp_path / "idera.alloc.txt").read_text()
+    assert report.startswith("Peak traced memory of 'idera'")
+    assert "test_profiling.py" in report
+    del blocks
@@ -0,0 +1,75 @@
+from pandas import DataFrame
+
+from apexa.common.fingerprints import fingerprint
+from apexa.common.records import RecordBatch, dumps_payload, layout
+from apexa.common.run_manifest import FORMATTED, RunManifest
+from apexa.common.scheduler import content_hash
+from apexa.common.util import json_dumps
+from apexa.perf.load import SyntheticScraper
+
+
+def formatted_batch(uuid="uuid"):
+    scraper = SyntheticScraper(uuid, extra_dates=1)
+    scraped = DataFrame(
+        {
+            "originalName": ["Backup", "Backup", "Tomcat", "Backup"],
+            "originalVersion": [10.1, 9.0, 8.5, 7.25],
+            "originalEOLDate": [None, "", "2021-05-01", "2021-05-01"],
+            "releaseDate": ["2019-01-01", "2019-01-01", None, "2018-01-01"],
+            "notes": ["", "Zürich", "", 'a "quote"'],
+        }
+    )
+    return scraper.build_post_batch(scraped)
+
+
+def test_batches_encode_like_their_records():
+    batch = formatted_batch()
+    records = batch.to_records()
+
+    assert len(batch) == 4
+    assert records[2]["extraDates"] == {"releaseDate": None}
+    assert batch.encode() == json_dumps(records)
+    assert batch.encode_rows() == [json_dumps(record) for record in records]
+    payload = {"requestId": "id", "eol_data": batch, "timestamp": "now"}
+    assert dumps_payload(payload) == json_dumps({**payload, "eol_data": records})
+
+    assert (fingerprint(batch) == fingerprint(records)).all()
+    assert content_hash(batch) == content_hash(records)
+    # Equal records of another run, with another scraperId, hash the same
+    assert content_hash(batch) == content_hash(formatted_batch("other uuid"))
+
+
+def test_nested_columns_are_grouped_in_record_order():
+    columns = ["originalName", "extraDates.a", "extraFields.b", "extraDates.c", "x.y"]
+    assert layout(columns) == [
+        ("originalName", ["originalName"], None),
+        ("extraDates", ["extraDates.a", "extraDates.c"], ["a", "c"]),
+        ("extraFields", ["extraFields.b"], ["b"]),
+        ("x.y", ["x.y"], None),
+    ]
+    assert RecordBatch(DataFrame(index=range(2))).encode() == "[{}, {}]"
+
+
+def test_manifest_keeps_batches_as_records(tmp_path):
+    manifest = RunManifest.create("run", ["synthetic"], False, "csv", str(tmp_path))
+    batch = formatted_batch()
+    manifest.save_output("synthetic", FORMATTED, batch)
+    assert manifest.load_output("synthetic", FORMATTED) == batch.to_records()
+
+
+def test_floats_encode_like_to_json():
+    scraper = SyntheticScraper("uuid", extra_dates=1)
+    scraped = DataFrame(
+        {
+            "originalName": ["Backup"] * 4,
+            "originalVersion": [1 / 7, 2.5, float("nan"), 1e20],
+            "originalEOLDate": ["2021-05-01"] * 4,
+            "releaseDate": ["2019-01-01"] * 4,
+            "ratio": [1 / 7, float("nan"), 2 / 3, 1 / 7],
+        }
+    )
+    batch = scraper.build_post_batch(scraped)
+    records = batch.to_records()
+
+    assert records[0]["extraFields"]["ratio"] == 0.1428571429
+    assert batch.encode() == json_dumps(records)
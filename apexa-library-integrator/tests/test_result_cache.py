@@ -0,0 +1,45 @@
+from apexa.common import model
+from apexa.common.controller import scraper_controller
+from apexa.common.model import Scraper
+from apexa.common.result_cache import ResultCache, code_version
+
+
+def test_cached_run_skips_fetching(tmp_path, monkeypatch, fake_scrapers):
+    cache = ResultCache(str(tmp_path))
+    monkeypatch.setattr(model, "result_cache", cache)
+    counting = fake_scrapers.make("counting")
+
+    first = counting("a").load_scraped_data()
+    second = counting("b").load_scraped_data()
+    assert fake_scrapers.fetches["counting"] == 1
+    assert second.equals(first)
+
+    cache.configure(enabled=False)
+    counting("c").load_scraped_data()
+    assert fake_scrapers.fetches["counting"] == 2
+
+
+def test_code_version_follows_source(fake_scrapers):
+    counting = fake_scrapers.make("counting")
+    assert code_version(counting) == code_version(counting)
+    assert code_version(counting) != code_version(Scraper)
+
+
+def test_live_runs_bypass_the_cache(tmp_path, monkeypatch, fake_scrapers):
+    cache = ResultCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(model, "result_cache", cache)
+    monkeypatch.setattr(scraper_controller, "result_cache", cache)
+    monkeypatch.setattr(scraper_controller, "save_to_file", lambda *args: None)
+    monkeypatch.setattr(
+        scraper_controller.publisher,
+        "publish_software_scraper_data",
+        lambda data: {"delivered": True},
+    )
+    fake_scrapers.register("counting")
+    runs_dir = str(tmp_path / "runs")
+
+    for test in (False, False, True, True):
+        scraper_controller.run_scrappers(["counting"], test, "csv", runs_dir=runs_dir)
+
+    # Both live runs scraped, the second test run reused the first one
+    assert fake_scrapers.fetches["counting"] == 3
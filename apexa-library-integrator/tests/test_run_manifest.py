@@ -0,0 +1,41 @@
+from apexa.common.controller import scraper_controller
+from apexa.common.run_manifest import FETCHED, SAVED, RunManifest
+
+
+def test_resume_runs_only_unfinished_work(tmp_path, monkeypatch, fake_scrapers):
+    monkeypatch.chdir(tmp_path)
+    saves = []
+
+    def flaky_save(data, name, output_type):
+        saves.append(name)
+        if name == "unsaved" and saves.count(name) == 1:
+            raise OSError("disk full")
+
+    monkeypatch.setattr(scraper_controller, "save_to_file", flaky_save)
+    for name in ("ok", "down", "unsaved"):
+        fake_scrapers.register(name)
+    fake_scrapers.broken.add("down")
+    runs_dir = str(tmp_path / "runs")
+    names = ["ok", "down", "unsaved", "missing"]
+
+    run_id = scraper_controller.run_scrappers(
+        names, True, "csv", use_cache=False, runs_dir=runs_dir
+    )
+    manifest = RunManifest.load(run_id, runs_dir)
+    states = {n: e["state"] for n, e in manifest.data["scrapers"].items()}
+    assert states == {
+        "ok": SAVED,
+        "down": "failed",
+        "unsaved": "failed",
+        "missing": "unavailable",
+    }
+    assert manifest.load_output("unsaved", FETCHED) is not None
+
+    fake_scrapers.broken.clear()
+    scraper_controller.run_scrappers(
+        [], True, "csv", use_cache=False, resume=run_id, runs_dir=runs_dir
+    )
+
+    assert fake_scrapers.fetches == {"ok": 1, "down": 2, "unsaved": 1}
+    manifest = RunManifest.load(run_id, runs_dir)
+    assert manifest.unfinished() == ["missing"]
@@ -0,0 +1,44 @@
+from datetime import datetime
+
+import pytest
+
+from apexa.common.scheduler import AdaptiveRevisit, CronSchedule, ScheduleException
+
+
+@pytest.mark.parametrize(
+    "expression, now, expected",
+    [
+        ("*/15 * * * *", datetime(2023, 2, 14, 10, 7), datetime(2023, 2, 14, 10, 15)),
+        ("0 */6 * * *", datetime(2023, 2, 14, 10, 7), datetime(2023, 2, 14, 12, 0)),
+        ("30 2 * * 1", datetime(2023, 2, 14, 10, 7), datetime(2023, 2, 20, 2, 30)),
+        ("0 0 1 1 *", datetime(2023, 2, 14, 10, 7), datetime(2024, 1, 1, 0, 0)),
+        ("@daily", datetime(2023, 12, 31, 23, 59), datetime(2024, 1, 1, 0, 0)),
+    ],
+)
+def test_next_after(expression, now, expected):
+    assert CronSchedule(expression).next_after(now) == expected
+
+
+def test_invalid_expression():
+    with pytest.raises(ScheduleException):
+        CronSchedule("61 * * * *")
+
+
+def test_adaptive_revisit_backs_off_and_resets_on_change():
+    hour = 3600
+    revisit = AdaptiveRevisit(hour, 7 * 24 * hour)
+    now = 0.0
+    revisit.observe("a", now)
+
+    intervals = []
+    for _ in range(20):
+        now += revisit.interval
+        intervals.append(revisit.observe("a", now)["interval"])
+    assert intervals == sorted(intervals)
+    assert intervals[-1] > 24 * hour
+
+    now += revisit.interval
+    decision = revisit.observe("b", now)
+    assert decision["changed"]
+    assert decision["interval"] == hour
+    assert decision["change_gap"] == now
@@ -0,0 +1,51 @@
+from pandas import DataFrame
+
+from apexa.common.schema import compact_frame
+from apexa.common.util import pandas_df_to_json
+from apexa.perf.load import SyntheticScraper
+
+
+def test_formatted_frames_are_compact_and_send_the_same_records():
+    scraper = SyntheticScraper("uuid", extra_dates=1)
+    scraped = DataFrame(
+        {
+            "originalName": ["Backup", "Backup", "Backup", "Backup"],
+            "originalVersion": ["1.x", "2.x", "3.x", "4.x"],
+            "originalEOLDate": ["2021-05-01", "", None, "2021-05-01"],
+            "releaseDate": ["2019-01-01", "2019-01-01", "2020-01-01", "2020-01-01"],
+            "notes": ["", "", "LTS", ""],
+        }
+    )
+
+    formatted = scraper.format_data(scraped)
+
+    assert list(formatted.columns) == [
+        "originalName",
+        "originalVersion",
+        "originalEOLDate",
+        "extraDates.releaseDate",
+        "extraFields.notes",
+        "scraperName",
+        "scraperId",
+    ]
+    assert formatted["originalVersion"].dtype == object
+    assert formatted["scraperId"].cat.categories.tolist() == ["uuid"]
+    dates = formatted["extraDates.releaseDate"]
+    assert dates.cat.ordered and (dates < "2020-01-01").tolist() == [1, 1, 0, 0]
+
+    records = pandas_df_to_json(formatted)
+    assert records[1] == {
+        "originalName": "Backup",
+        "originalVersion": "2.x",
+        "originalEOLDate": "",
+        "extraDates": {"releaseDate": "2019-01-01"},
+        "extraFields": {"notes": ""},
+        "scraperName": "SYNTHETIC",
+        "scraperId": "uuid",
+    }
+    assert records[2]["originalEOLDate"] is None
+
+
+def test_mixed_dates_are_not_ordered():
+    frame = compact_frame(DataFrame({"originalEOLDate": ["2021-05-01", 5, 5, 5]}))
+    assert not frame["originalEOLDate"].cat.ordered
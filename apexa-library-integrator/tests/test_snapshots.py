@@ -0,0 +1,104 @@
+from apexa.common import snapshots
+from apexa.common.snapshots import SnapshotStore
+
+DAY = 24 * 60 * 60
+
+
+def feed(eol_date, release="2019-01-01"):
+    return [
+        {
+            "originalName": "SQL Diagnostic Manager",
+            "originalVersion": "12.x",
+            "originalEOLDate": eol_date,
+            "extraDates": {"releaseDate": release},
+            "scraperName": "IDERA",
+            "scraperId": "uuid",
+        },
+        {
+            "originalName": "SQL Safe Backup",
+            "originalVersion": "9.x",
+            "originalEOLDate": "2023-06-30",
+            "extraDates": {"releaseDate": release},
+            "scraperName": "IDERA",
+            "scraperId": "uuid",
+        },
+    ]
+
+
+def test_latest_snapshot_and_product_history(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.append("idera", "run-1", feed("2024-12-31"), at=0)
+    store.append("idera", "run-2", feed("2024-12-31"), at=DAY)
+    store.append("idera", "run-3", feed("2025-06-30"), at=2 * DAY)
+    store.append("gurobi", "run-3", [], at=2 * DAY)
+
+    latest = store.latest("idera")
+    assert list(latest["run_id"].unique()) == ["run-3"]
+    assert "scraperId" not in latest
+    assert latest["extraDates.releaseDate"].tolist() == ["2019-01-01"] * 2
+    assert store.scrapers() == ["gurobi", "idera"]
+    assert store.latest("gurobi").empty
+    assert store.latest("missing") is None
+
+    history = store.history("idera", "SQL Diagnostic Manager", "12.x")
+    assert history["run_id"].tolist() == ["run-1", "run-3"]
+    assert history["originalEOLDate"].tolist() == ["2024-12-31", "2025-06-30"]
+    every_run = store.history("idera", "SQL Diagnostic Manager", changes_only=False)
+    assert len(every_run) == 3
+    assert store.history("idera", "Unknown").empty
+
+
+def test_history_only_reads_indexed_partitions(tmp_path, monkeypatch):
+    store = SnapshotStore(str(tmp_path))
+    store.append("idera", "run-1", feed("2024-12-31")[1:], at=0)
+    store.append("idera", "run-2", feed("2024-12-31"), at=DAY)
+    original = snapshots.read_frame
+    read = []
+
+    def tracking_read(file_name):
+        read.append(file_name)
+        return original(file_name)
+
+    monkeypatch.setattr(snapshots, "read_frame", tracking_read)
+
+    assert len(store.history("idera", "SQL Diagnostic Manager")) == 1
+    assert [path for path in read if "date=" in path] == [
+        str(tmp_path / "idera" / store.partitions("idera")[1])
+    ]
+
+
+def test_runs_of_old_days_are_merged(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    for hour in range(3):
+        store.append("idera", f"run-{hour}", feed("2024-12-31"), at=hour * 3600)
+    assert len(store.partitions("idera")) == 3
+
+    # A week later the first day is merged on the next append
+    store.append("idera", "run-later", feed("2025-06-30"), at=8 * DAY)
+
+    partitions = store.partitions("idera")
+    assert len(partitions) == 2
+    assert partitions[0].endswith(f"run-2.{snapshots.EXTENSION}")
+    assert set(store.index("idera")["partition"]) == set(partitions)
+    assert store.compact("idera", now=8 * DAY) == 0
+    every_run = store.history("idera", "SQL Safe Backup", changes_only=False)
+    assert every_run["run_id"].tolist() == ["run-0", "run-1", "run-2", "run-later"]
+
+    # A merged day that is the newest one still gives its last run only
+    (tmp_path / "idera" / partitions[1]).unlink()
+    assert set(store.latest("idera")["run_id"]) == {"run-2"}
+
+
+def test_index_is_appended_to_and_rebuilt_when_missing(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.append("idera", "run-1", feed("2024-12-31"), at=0)
+    index_file = tmp_path / "idera" / snapshots.INDEX_FILE
+    first = index_file.read_text()
+    store.append("idera", "run-2", [{"originalVersion": "1.x"}], at=DAY)
+    assert index_file.read_text().startswith(first)
+    assert len(store.index("idera")) == 3
+
+    index_file.unlink()
+    store.append("idera", "run-3", feed("2024-12-31"), at=2 * DAY)
+    assert len(store.index("idera")) == 5
+    assert len(store.history("idera", "SQL Safe Backup", changes_only=False)) == 2
@@ -0,0 +1,46 @@
+from pandas import DataFrame, Series
+
+from apexa.common.versions import latest_per_family, version_families
+
+
+def test_version_families_keep_leading_digits_and_dots():
+    texts = Series(["23.01 beta", "9.20", "4.65 (2009-02-03)", "11.0", "x"])
+    assert version_families(texts).tolist() == [
+        "23.01.x",
+        "9.20.x",
+        "4.65.x",
+        "11.0.x",
+        ".x",
+    ]
+
+
+def test_latest_per_family_orders_numerically_and_keeps_first_row():
+    frame = DataFrame(
+        {
+            "name": ["B", "A", "A", "A", "B", "A"],
+            "version": ["1.x", "9.2.x", "10.0.x", "9.10.x", "2.x", "10.0.x"],
+            "row": range(6),
+        },
+        index=[0, 0, 1, 1, 2, 2],
+    )
+
+    latest = latest_per_family(frame, "name", "version")
+
+    assert latest["name"].tolist() == ["B", "B", "A", "A", "A"]
+    assert latest["version"].tolist() == ["2.x", "1.x", "10.0.x", "9.10.x", "9.2.x"]
+    assert latest["row"].tolist() == [4, 0, 2, 3, 1]
+    assert list(latest.columns) == ["name", "version", "row"]
+
+
+def test_versions_written_differently_are_not_collapsed():
+    frame = DataFrame(
+        {
+            "name": ["A"] * 6,
+            "version": ["1.01.x", "1.1.x", "1.01.x", "1.2.3.4.5", "1.2.3.4.6", "1.1.x"],
+        }
+    )
+
+    latest = latest_per_family(frame, "name", "version")
+
+    assert latest["version"].tolist() == ["1.2.3.4.5", "1.2.3.4.6", "1.01.x", "1.1.x"]
+    assert latest.index.tolist() == [3, 4, 0, 1]
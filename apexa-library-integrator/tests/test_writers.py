@@ -0,0 +1,91 @@
+import json
+
+import pandas
+import pytest
+from click.testing import CliRunner
+
+from apexa.cli.client.commands import scrape
+from apexa.common import writers
+from apexa.common.util import pandas_df_to_json
+from apexa.common.writers import parse_output_types, save_to_file
+
+
+def eol_frame(rows):
+    return pandas.DataFrame(
+        {
+            "originalName": [f"Product {number % 3}" for number in range(rows)],
+            "originalVersion": [f"{number}.x" for number in range(rows)],
+            "originalEOLDate": [
+                "2024-12-31" if number % 2 else "" for number in range(rows)
+            ],
+        }
+    )
+
+
+def test_formats_are_written_in_chunks_in_one_pass(tmp_path, monkeypatch):
+    monkeypatch.setattr(writers, "OUTPUT_CHUNK_ROWS", 4)
+    frame = eol_frame(10)
+
+    files = save_to_file(frame, str(tmp_path / "idera"), "CSV,jsonl,json,csv")
+
+    assert files == [str(tmp_path / f"idera.{ext}") for ext in ("csv", "jsonl", "json")]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "idera.csv",
+        "idera.json",
+        "idera.jsonl",
+    ]
+    csv = pandas.read_csv(files[0], keep_default_na=False, dtype=str)
+    assert csv.equals(frame)
+    with open(files[1], encoding="utf-8") as file:
+        lines = [json.loads(line) for line in file]
+    with open(files[2], encoding="utf-8") as file:
+        document = json.load(file)
+    assert lines == document == pandas_df_to_json(frame)
+
+
+def test_empty_data_still_gives_valid_files(tmp_path):
+    files = save_to_file(eol_frame(0), str(tmp_path / "gurobi"), "json,csv,jsonl")
+
+    with open(files[0], encoding="utf-8") as file:
+        assert json.load(file) == []
+    with open(files[1], encoding="utf-8") as file:
+        assert file.read().strip() == "originalName,originalVersion,originalEOLDate"
+    with open(files[2], encoding="utf-8") as file:
+        assert file.read() == ""
+
+
+def test_failed_writes_leave_no_files(tmp_path, monkeypatch):
+    def broken(self, chunk):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(writers.JSONWriter, "write_rows", broken)
+    with pytest.raises(OSError):
+        save_to_file(eol_frame(3), str(tmp_path / "idera"), "csv,json")
+    assert not list(tmp_path.iterdir())
+
+    monkeypatch.setattr(writers.CSVWriter, "start", broken)
+    with pytest.raises(OSError):
+        writers.CSVWriter(str(tmp_path / "idera.csv"), eol_frame(3))
+    assert not list(tmp_path.iterdir())
+
+
+def test_unknown_output_types_are_rejected():
+    with pytest.raises(ValueError, match="xml"):
+        parse_output_types("csv,xml")
+    with pytest.raises(ValueError):
+        parse_output_types(" , ")
+
+    result = CliRunner().invoke(scrape, ["--output-type", "csv,xml"])
+    assert result.exit_code == 2
+    assert "Invalid value for '--output-type'" in result.output
+
+
+def test_columnar_formats(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(writers, "OUTPUT_CHUNK_ROWS", 4)
+    frame = eol_frame(10)
+
+    files = save_to_file(frame, str(tmp_path / "idera"), "parquet,feather")
+
+    assert pandas.read_parquet(files[0]).equals(frame)
+    assert pandas.read_feather(files[1]).equals(frame)